@@ -140,6 +140,9 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_MEMORY_BUDGET', COURSE_STRUCTURE_CACHE_MEMORY_BUDGET
+)
 
 SESSION_COOKIE_DOMAIN = ENV_TOKENS.get('SESSION_COOKIE_DOMAIN')
 SESSION_COOKIE_HTTPONLY = ENV_TOKENS.get('SESSION_COOKIE_HTTPONLY', True)
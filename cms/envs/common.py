@@ -394,6 +394,10 @@ MODULESTORE = {
     }
 }
 
+# Memory budget, in bytes of pickled data, for the per-process cache of split
+# modulestore course structures kept in front of the 'course_structure_cache'.
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = 128 * 1024 * 1024
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -173,6 +173,9 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in memory across tests
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
@@ -2,15 +2,18 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
+from uuid import uuid4
 
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden
+    HttpResponse, HttpResponseNotModified, HttpResponseForbidden, StreamingHttpResponse
 )
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
@@ -23,6 +26,10 @@ from xmodule.exceptions import NotFoundError
 
 log = logging.getLogger(__name__)
 
+# Maximum number of byte ranges served in a multipart/byteranges response; requests for more
+# ranges are answered with the full content.
+MAX_BYTE_RANGES = 20
+
 
 class StaticContentServer(object):
     def process_request(self, request):
@@ -77,29 +84,29 @@ class StaticContentServer(object):
                     ):
                         return HttpResponseForbidden('Unauthorized')
 
-            # convert over the DB persistent last modified timestamp to a HTTP compatible
-            # timestamp, so we can simply compare the strings
-            last_modified_at_str = content.last_modified_at.strftime("%a, %d-%b-%Y %H:%M:%S GMT")
+            # convert over the DB persistent last modified timestamp to a HTTP compatible timestamp
+            last_modified_at = calendar.timegm(content.last_modified_at.utctimetuple())
+            last_modified_at_str = http_date(last_modified_at)
+
+            # the md5 digest computed by the content store identifies this version of the content
+            content_digest = getattr(content, 'content_digest', None)
+            etag = quote_etag(content_digest) if content_digest else None
 
             # see if the client has cached this content, if so then compare the
-            # timestamps, if they are the same then just return a 304 (Not Modified)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            # entity tags or timestamps, if they match then just return a 304 (Not Modified)
+            if is_not_modified(request, content_digest, last_modified_at):
+                response = HttpResponseNotModified()
+                set_validator_headers(response, etag, last_modified_at_str)
+                return response
 
-            # *** File streaming within a byte range ***
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
             # Request -> Range attribute structure: "Range: bytes=first-[last]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
-            if request.META.get('HTTP_RANGE'):
-                # Data from cache (StaticContent) has no easy byte management, so we use the DB instead (StaticContentStream)
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
+            if request.META.get('HTTP_RANGE') and is_range_current(request, content_digest, last_modified_at):
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -112,43 +119,147 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Serving many (possibly overlapping) ranges costs more than the full content.
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"More than %s ranges in Range header: %s for content: %s",
+                            MAX_BYTE_RANGES, header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        elif len(ranges) == 1:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            first, last = ranges[0]
+                            response = make_response(content, content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # According to Http/1.1 spec content for multiple ranges should be sent as a multipart
+                            # message. http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            response = make_multipart_byteranges_response(content, ranges)
+                        response.status_code = 206  # Partial Content
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = make_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
-            response['Last-Modified'] = last_modified_at_str
+            set_validator_headers(response, etag, last_modified_at_str)
 
             return response
 
 
+def make_response(content, data, content_type=None):
+    """
+    Returns a response with the given data of the given content, of the content's type unless a
+    content_type is given.
+
+    Content that was read into memory is returned as a regular response.  Content read from a stream is
+    returned as a streaming response, so that it is sent to the client as it is read from the content store.
+    """
+    content_type = content_type or content.content_type
+    if isinstance(content, StaticContentStream):
+        return StreamingHttpResponse(data, content_type=content_type)
+    return HttpResponse(data, content_type=content_type)
+
+
+def make_multipart_byteranges_response(content, ranges):
+    """
+    Returns a multipart/byteranges response with the given (first, last) byte ranges of the given content.
+
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        )
+        for first, last in ranges
+    ]
+    closing_boundary = '--{boundary}--\r\n'.format(boundary=boundary)
+
+    def stream_parts():
+        """
+        Yields each range of the content preceded by its part headers.
+        """
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield '\r\n'
+        yield closing_boundary
+
+    response = make_response(
+        content, stream_parts(), content_type='multipart/byteranges; boundary={}'.format(boundary)
+    )
+    response['Content-Length'] = str(
+        sum(len(part_header) + (last - first + 1) + 2 for part_header, (first, last) in zip(part_headers, ranges)) +
+        len(closing_boundary)
+    )
+    return response
+
+
+def set_validator_headers(response, etag, last_modified_at_str):
+    """
+    Sets the ETag and Last-Modified headers of the given response.
+    """
+    if etag:
+        response['ETag'] = etag
+    response['Last-Modified'] = last_modified_at_str
+
+
+def is_not_modified(request, content_digest, last_modified_at):
+    """
+    Returns whether the client's cached copy of the content is current, according to the
+    If-None-Match and If-Modified-Since headers of the request.
+
+    If-None-Match takes precedence over If-Modified-Since when both are present.
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.26
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or (content_digest is not None and content_digest in etags)
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        return if_modified_since is not None and last_modified_at <= if_modified_since
+
+    return False
+
+
+def is_range_current(request, content_digest, last_modified_at):
+    """
+    Returns whether the Range header of the request should be applied, according to its If-Range header:
+    ranges are only served if the client's partial copy of the content is still current.
+
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.27
+    """
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+
+    if_range_date = parse_http_date_safe(if_range)
+    if if_range_date is not None:
+        return last_modified_at == if_range_date
+    return content_digest is not None and parse_etags(if_range) == [content_digest]
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -10,6 +10,7 @@ from uuid import uuid4
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
+from django.utils.http import http_date, parse_http_date
 
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
@@ -17,7 +18,7 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from contentserver.middleware import parse_range_header
+from contentserver.middleware import parse_range_header, MAX_BYTE_RANGES
 from student.models import CourseEnrollment
 
 log = logging.getLogger(__name__)
@@ -146,7 +147,7 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges response with each range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
@@ -154,10 +155,63 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
             first=first_byte, last=last_byte)
         )
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        self.assertEqual(resp.content.count('--' + boundary), 3)
+        self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+            first=first_byte, last=last_byte, length=self.length_unlocked), resp.content)
+        self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+            first=self.length_unlocked - 100, last=self.length_unlocked - 1, length=self.length_unlocked), resp.content)
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a request with more than MAX_BYTE_RANGES ranges outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=' + ', '.join(['0-1'] * (MAX_BYTE_RANGES + 1)))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
+    def test_etag(self):
+        """
+        Test that the ETag is the md5 digest of the asset and that a matching If-None-Match
+        outputs 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], '"{}"'.format(self.contentstore.get_attr(self.unlocked_asset, 'md5')))
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"not-the-digest"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_modified_since(self):
+        """
+        Test that an If-Modified-Since at or after Last-Modified outputs 304 Not Modified.
+        """
+        resp = self.client.get(self.url_unlocked)
+        last_modified_at = parse_http_date(resp['Last-Modified'])
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=http_date(last_modified_at))
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=http_date(last_modified_at - 1))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_range_mismatch(self):
+        """
+        Test that a range request with an outdated If-Range outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"not-the-digest"')
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('Content-Range', resp)
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
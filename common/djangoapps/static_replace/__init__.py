@@ -1,5 +1,7 @@
 import logging
 import re
+import threading
+from collections import OrderedDict
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
@@ -13,6 +15,12 @@ from opaque_keys.edx.locator import AssetLocator
 
 log = logging.getLogger(__name__)
 
+# the number of resolved static urls to remember
+STATIC_URL_CACHE_SIZE = 10000
+
+_STATIC_URLS = OrderedDict()
+_STATIC_URLS_LOCK = threading.Lock()
+
 
 def _url_replace_regex(prefix):
     """
@@ -67,13 +75,20 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
     """
 
     def replace_jump_to_id_url(match):
-        quote = match.group('quote')
-        rest = match.group('rest')
-        return "".join([quote, jump_to_id_base_url + rest, quote])
+        return _replace_jump_to_id_url(match, jump_to_id_base_url)
 
     return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
 
 
+def _replace_jump_to_id_url(match, jump_to_id_base_url):
+    """
+    Replace a single matched /jump_to_id/ url.
+    """
+    quote = match.group('quote')
+    rest = match.group('rest')
+    return "".join([quote, jump_to_id_base_url + rest, quote])
+
+
 def replace_course_urls(text, course_key):
     """
     Replace /course/$stuff urls with /courses/$course_id/$stuff urls
@@ -84,16 +99,31 @@ def replace_course_urls(text, course_key):
     returns: text with the links replaced
     """
 
-    course_id = course_key.to_deprecated_string()
-
     def replace_course_url(match):
-        quote = match.group('quote')
-        rest = match.group('rest')
-        return "".join([quote, '/courses/' + course_id + '/', rest, quote])
+        return _replace_course_url(match, course_key)
 
     return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
 
 
+def _replace_course_url(match, course_key):
+    """
+    Replace a single matched /course/ url.
+    """
+    quote = match.group('quote')
+    rest = match.group('rest')
+    return "".join([quote, '/courses/' + course_key.to_deprecated_string() + '/', rest, quote])
+
+
+def _static_url_prefix(data_dir):
+    """
+    Match the prefix of urls in the static file directory, other than those in data_dir.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def process_static_urls(text, replacement_function, data_dir=None):
     """
     Run an arbitrary replacement function on any urls matching the static file
@@ -110,14 +140,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
         rest = match.group('rest')
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return re.sub(_url_replace_regex(_static_url_prefix(data_dir)), wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -137,6 +160,114 @@ def make_static_urls_absolute(request, html):
     )
 
 
+def clear_static_url_cache():
+    """
+    Forget all the static urls resolved by replace_static_urls.
+
+    The urls are only remembered by the current process, and the static files only
+    change when the code is deployed, which restarts it, so this is only needed by tests.
+    """
+    with _STATIC_URLS_LOCK:
+        _STATIC_URLS.clear()
+
+
+def _cached_static_url(prefix, rest, data_directory, course_id, static_asset_path):
+    """
+    Return the url _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+    resolves.
+
+    The STATIC_URL_CACHE_SIZE most recently used urls are remembered, as resolving
+    them may check the storage for the file and look up the course's modulestore.
+    Urls resolved while the storage was failing are not remembered.
+    """
+    key = (course_id, static_asset_path, data_directory, prefix, rest)
+    with _STATIC_URLS_LOCK:
+        url = _STATIC_URLS.pop(key, None)
+        if url is not None:
+            _STATIC_URLS[key] = url
+            return url
+
+    url, resolved = _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+    if not resolved:
+        return url
+
+    with _STATIC_URLS_LOCK:
+        _STATIC_URLS[key] = url
+        while len(_STATIC_URLS) > STATIC_URL_CACHE_SIZE:
+            _STATIC_URLS.popitem(last=False)
+    return url
+
+
+def _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path):
+    """
+    Return the url which the static url prefix + rest should be replaced with, and
+    whether staticfiles_storage could be checked for it (if not, a fallback url is
+    returned).
+    """
+    resolved = True
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    if (not static_asset_path) \
+            and course_id \
+            and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            resolved = False
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            url = StaticContent.convert_legacy_static_url_with_course_id(rest, course_id)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
+                url = staticfiles_storage.url(rest)
+            else:
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+            resolved = False
+
+    return url, resolved
+
+
+def _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path):
+    """
+    Replace a single matched static url.
+    """
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return original
+    elif settings.DEBUG:
+        # files may come and go, so don't remember what they resolved to
+        url, __ = _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+    else:
+        url = _cached_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+    return "".join([quote, url, quote])
+
+
 def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path=''):
     """
     Replace /static/$stuff urls either with their correct url as generated by collectstatic,
@@ -154,52 +285,38 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         """
         Replace a single matched url.
         """
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            return original
-
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) \
-                and course_id \
-                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                url = StaticContent.convert_legacy_static_url_with_course_id(rest, course_id)
+        return _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path)
 
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
 
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Replace the urls which replace_static_urls, replace_course_urls and (if given a
+    jump_to_id_base_url) replace_jump_to_id_urls would, in a single pass over text.
 
-        return "".join([quote, url, quote])
+    text: The source text to do the substitution in
+    data_directory, course_id, static_asset_path: as for replace_static_urls
+    jump_to_id_base_url: as for replace_jump_to_id_urls
+    """
+    prefixes = [u'(?P<static>{})'.format(_static_url_prefix(static_asset_path or data_directory))]
+    if course_id is not None:
+        prefixes.append(u'(?P<course>/course/)')
+    if jump_to_id_base_url is not None:
+        prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    def replace_url(match):
+        """
+        Replace a single matched url of whichever kind.
+        """
+        if match.group('static') is not None:
+            return _replace_static_url(
+                match.group(0), match.group('prefix'), match.group('quote'), match.group('rest'),
+                data_directory, course_id, static_asset_path
+            )
+        elif match.groupdict().get('course') is not None:
+            return _replace_course_url(match, course_id)
+        else:
+            return _replace_jump_to_id_url(match, jump_to_id_base_url)
+
+    return re.sub(_url_replace_regex(u'|'.join(prefixes)), replace_url, text)
@@ -1,9 +1,12 @@
 import re
 
-from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
+from nose.tools import assert_equals, assert_true, assert_false, with_setup  # pylint: disable=no-name-in-module
 from static_replace import (
+    clear_static_url_cache,
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
@@ -11,6 +14,7 @@ from static_replace import (
 from mock import patch, Mock
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.mongo import MongoModuleStore
 from xmodule.modulestore.xml import XMLModuleStore
 
@@ -19,6 +23,7 @@ COURSE_KEY = SlashSeparatedCourseKey('org', 'course', 'run')
 STATIC_SOURCE = '"/static/file.png"'
 
 
+@with_setup(clear_static_url_cache)
 def test_multi_replace():
     course_source = '"/course/file.png"'
 
@@ -63,6 +68,7 @@ def test_static_urls(mock_request):
     assert_equals(result, '\"http:///static/file.png\"')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage', autospec=True)
 def test_storage_url_exists(mock_storage):
     mock_storage.exists.return_value = True
@@ -73,6 +79,7 @@ def test_storage_url_exists(mock_storage):
     mock_storage.url.assert_called_once_with('file.png')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage', autospec=True)
 def test_storage_url_not_exists(mock_storage):
     mock_storage.exists.return_value = False
@@ -83,6 +90,7 @@ def test_storage_url_not_exists(mock_storage):
     mock_storage.url.assert_called_once_with('data_dir/file.png')
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.StaticContent', autospec=True)
 @patch('static_replace.modulestore', autospec=True)
 def test_mongo_filestore(mock_modulestore, mock_static_content):
@@ -102,6 +110,7 @@ def test_mongo_filestore(mock_modulestore, mock_static_content):
     mock_static_content.convert_legacy_static_url_with_course_id.assert_called_once_with('file.png', COURSE_KEY)
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.settings', autospec=True)
 @patch('static_replace.modulestore', autospec=True)
 @patch('static_replace.staticfiles_storage', autospec=True)
@@ -116,6 +125,68 @@ def test_data_dir_fallback(mock_storage, mock_modulestore, mock_settings):
     assert_equals('"/static/data_dir/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
 
 
+@with_setup(clear_static_url_cache)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_storage_url_cached(mock_storage, mock_modulestore):
+    mock_modulestore.return_value = Mock(XMLModuleStore)
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.png'
+
+    for __ in range(2):
+        assert_equals('"/static/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, COURSE_KEY))
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_modulestore.return_value.get_modulestore_type.assert_called_once_with(COURSE_KEY)
+
+    # a different data directory resolves the url again
+    replace_static_urls(STATIC_SOURCE, 'other_data_dir', COURSE_KEY)
+    assert_equals(mock_storage.exists.call_count, 2)
+
+    clear_static_url_cache()
+    replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, COURSE_KEY)
+    assert_equals(mock_storage.exists.call_count, 3)
+
+
+@with_setup(clear_static_url_cache)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_storage_failure_not_cached(mock_storage, mock_modulestore):
+    mock_modulestore.return_value = Mock(XMLModuleStore)
+    mock_storage.exists.side_effect = Exception
+    assert_equals('"/static/data_dir/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
+
+    # once the storage works again, the url is resolved through it
+    mock_storage.exists.side_effect = None
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.png'
+    assert_equals('"/static/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
+
+
+@with_setup(clear_static_url_cache)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls(mock_storage, mock_modulestore):
+    mock_modulestore.return_value = Mock(XMLModuleStore)
+    mock_modulestore.return_value.get_modulestore_type.return_value = ModuleStoreEnum.Type.xml
+    mock_storage.exists.return_value = False
+    mock_storage.url.return_value = '/static/data_dir/file.png'
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+    text = 'a {} b "/course/file.png" c \'/jump_to_id/block\' d "/static/file.png?raw"'.format(STATIC_SOURCE)
+
+    assert_equals(
+        replace_urls(text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url=jump_to_id_base_url),
+        replace_jump_to_id_urls(
+            replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+            COURSE_KEY,
+            jump_to_id_base_url
+        )
+    )
+    assert_equals(
+        replace_urls(text, DATA_DIRECTORY),
+        'a "/static/data_dir/file.png" b "/course/file.png" c \'/jump_to_id/block\' d "/static/file.png?raw"'
+    )
+
+
 def test_raw_static_check():
     """
     Make sure replace_static_urls leaves alone things that end in '.raw'
@@ -127,6 +198,7 @@ def test_raw_static_check():
     assert_equals(path, replace_static_urls(path, text))
 
 
+@with_setup(clear_static_url_cache)
 @patch('static_replace.staticfiles_storage', autospec=True)
 @patch('static_replace.modulestore', autospec=True)
 def test_static_url_with_query(mock_modulestore, mock_storage):
@@ -0,0 +1,175 @@
+"""
+Bulk loading of the per-enrollment data shown on the student dashboard.
+
+Loading course overviews, course modes, certificates, registration codes,
+prerequisites and verification statuses one enrollment at a time makes the
+number of queries of the dashboard grow with the number of enrollments. `DashboardData` loads them for all of a
+user's enrollments with a fixed number of queries, and is memoized in the
+request cache so that everything rendering the dashboard shares it.
+"""
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+
+import request_cache
+from bulk_email.models import CourseAuthorization
+from certificates.models import certificate_statuses_for_student
+from course_modes.models import CourseMode
+from courseware.access import has_access
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from shoppingcart.models import CourseRegistrationCode
+from student.helpers import check_verify_status_by_course
+from student.models import CourseEnrollment
+from util.milestones_helpers import get_pre_requisite_courses_not_completed
+
+
+log = logging.getLogger(__name__)
+
+REQUEST_CACHE_NAME = 'student.dashboard_data'
+
+
+def get_course_enrollments(user, org_to_include, orgs_to_exclude):
+    """
+    Given a user, return a filtered set of his or her course enrollments.
+
+    The course overviews of the enrollments are loaded in bulk.
+
+    Arguments:
+        user (User): the user in question.
+        org_to_include (str): for use in Microsites. If not None, ONLY courses
+            of this org will be returned.
+        orgs_to_exclude (list[str]): If org_to_include is not None, this
+            argument is ignored. Else, courses of this org will be excluded.
+
+    Returns:
+        generator[CourseEnrollment]: a sequence of enrollments to be displayed
+        on the user's dashboard.
+    """
+    enrollments = list(CourseEnrollment.enrollments_for_user(user))
+    course_overviews = CourseOverview.get_from_ids(enrollment.course_id for enrollment in enrollments)
+
+    for enrollment in enrollments:
+
+        # If the course is missing or broken, log an error and skip it.
+        course_overview = course_overviews.get(enrollment.course_id)
+        if not course_overview:
+            log.error(
+                "User %s enrolled in broken or non-existent course %s",
+                user.username,
+                enrollment.course_id
+            )
+            continue
+        enrollment._course_overview = course_overview  # pylint: disable=protected-access
+
+        # If we are in a Microsite, then filter out anything that is not
+        # attributed (by ORG) to that Microsite.
+        if org_to_include and course_overview.location.org != org_to_include:
+            continue
+
+        # Conversely, if we are not in a Microsite, then filter out any enrollments
+        # with courses attributed (by ORG) to Microsites.
+        elif course_overview.location.org in orgs_to_exclude:
+            continue
+
+        # Else, include the enrollment.
+        else:
+            yield enrollment
+
+
+class DashboardData(object):
+    """
+    The data the dashboard shows for each of a user's enrollments.
+
+    Attributes:
+        course_enrollments (list of CourseEnrollment): the enrollments to
+            show, most recent first, with their course overviews loaded.
+        course_modes_by_course (dict): maps course ids to a dict of their
+            unexpired course modes by slug.
+        selectable_modes_by_course (dict): like `course_modes_by_course`,
+            without the modes that aren't shown on the track selection page.
+        certificate_statuses (dict): maps course ids to the result of
+            `certificate_status_for_student`.
+        courses_with_certificates (set): ids of the courses the user has a
+            certificate for.
+        redeemed_registration_codes (dict): maps course ids to the
+            registration codes the user redeemed for them.
+        email_enabled_course_ids (set): ids of the courses that may send
+            bulk email.
+        courses_requirements_not_met (dict): maps the ids of the courses
+            whose prerequisites the user hasn't completed to the result of
+            `get_pre_requisite_courses_not_completed` for them.
+        show_courseware_links_for (frozenset): ids of the courses whose
+            courseware the user can load.
+        verify_status_by_course (dict): the result of
+            `check_verify_status_by_course`.
+    """
+    def __init__(self, user, org_to_include=None, orgs_to_exclude=()):
+        self.user = user
+
+        self.course_enrollments = list(get_course_enrollments(user, org_to_include, orgs_to_exclude))
+        self.course_enrollments.sort(key=lambda enrollment: enrollment.created, reverse=True)
+        course_ids = [enrollment.course_id for enrollment in self.course_enrollments]
+
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(course_ids)
+        self.course_modes_by_course = {
+            course_id: {mode.slug: mode for mode in modes}
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+        self.selectable_modes_by_course = {
+            course_id: {slug: mode for slug, mode in modes.iteritems() if slug not in CourseMode.CREDIT_MODES}
+            for course_id, modes in self.course_modes_by_course.iteritems()
+        }
+
+        self.certificate_statuses = certificate_statuses_for_student(
+            user, course_ids, course_modes=unexpired_course_modes
+        )
+        self.courses_with_certificates = {
+            course_id for course_id, cert_status in self.certificate_statuses.iteritems()
+            if cert_status.get('uuid') is not None
+        }
+
+        self.redeemed_registration_codes = defaultdict(list)
+        registration_codes = CourseRegistrationCode.objects.filter(
+            course_id__in=course_ids,
+            registrationcoderedemption__redeemed_by=user,
+        ).select_related('invoice_item__invoice')
+        for registration_code in registration_codes:
+            self.redeemed_registration_codes[registration_code.course_id].append(registration_code)
+
+        if settings.FEATURES['REQUIRE_COURSE_EMAIL_AUTH']:
+            self.email_enabled_course_ids = set(
+                CourseAuthorization.objects.filter(
+                    course_id__in=course_ids, email_enabled=True
+                ).values_list('course_id', flat=True)
+            )
+        else:
+            self.email_enabled_course_ids = set(course_ids)
+
+        self.courses_requirements_not_met = get_pre_requisite_courses_not_completed(user, [
+            enrollment.course_id for enrollment in self.course_enrollments
+            if enrollment.course_overview.pre_requisite_courses
+        ])
+        # This is has_access(user, 'view_courseware_with_prerequisites', ...)
+        # checked against the prerequisites loaded above, rather than with a
+        # milestones lookup per enrollment.
+        self.show_courseware_links_for = frozenset(
+            enrollment.course_id for enrollment in self.course_enrollments
+            if has_access(user, 'load', enrollment.course_overview) and (
+                enrollment.course_id not in self.courses_requirements_not_met
+                or has_access(user, 'staff', enrollment.course_overview)
+            )
+        )
+
+        self.verify_status_by_course = check_verify_status_by_course(user, self.course_enrollments)
+
+    @classmethod
+    def load(cls, user, org_to_include=None, orgs_to_exclude=()):
+        """
+        Returns the DashboardData of `user`, memoized in the request cache.
+        """
+        cache = request_cache.get_cache(REQUEST_CACHE_NAME)
+        key = (user.id, org_to_include, frozenset(orgs_to_exclude))
+        if key not in cache:
+            cache[key] = cls(user, org_to_include, orgs_to_exclude)
+        return cache[key]
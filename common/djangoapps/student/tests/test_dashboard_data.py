@@ -0,0 +1,83 @@
+"""
+Tests of the bulk loading of the student dashboard data.
+"""
+import unittest
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from certificates.models import CertificateStatuses
+from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
+from course_modes.tests.factories import CourseModeFactory
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from student.dashboard_data import DashboardData
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+class DashboardDataTest(ModuleStoreTestCase):
+    """
+    Tests of DashboardData.
+    """
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory.create()
+
+    def _enroll(self, mode='honor'):
+        """Create a course, with its overview and modes, and enroll the user in it."""
+        course = CourseFactory.create()
+        CourseOverview.get_from_id(course.id)
+        CourseModeFactory.create(course_id=course.id, mode_slug='honor')
+        CourseModeFactory.create(course_id=course.id, mode_slug='verified', min_price=10)
+        CourseEnrollmentFactory.create(user=self.user, course_id=course.id, mode=mode)
+        return course
+
+    def _count_queries(self):
+        """Returns the number of queries made to load the dashboard data."""
+        with CaptureQueriesContext(connection) as queries:
+            DashboardData(self.user)
+        return len(queries)
+
+    def test_loaded_data(self):
+        courses = [self._enroll(), self._enroll(mode='verified')]
+        GeneratedCertificateFactory.create(
+            user=self.user, course_id=courses[1].id, status=CertificateStatuses.downloadable, mode='verified'
+        )
+
+        data = DashboardData(self.user)
+
+        self.assertEqual(
+            {enrollment.course_id for enrollment in data.course_enrollments},
+            {course.id for course in courses},
+        )
+        self.assertEqual(set(data.course_modes_by_course[courses[0].id]), {'honor', 'verified'})
+        self.assertEqual(data.certificate_statuses[courses[0].id]['status'], CertificateStatuses.unavailable)
+        self.assertEqual(data.certificate_statuses[courses[1].id]['status'], CertificateStatuses.downloadable)
+        self.assertEqual(data.courses_with_certificates, {courses[1].id})
+        self.assertEqual(data.show_courseware_links_for, {course.id for course in courses})
+        self.assertEqual(data.courses_requirements_not_met, {})
+
+    def test_query_count_independent_of_enrollments(self):
+        self._enroll()
+        num_queries = self._count_queries()
+
+        for __ in range(3):
+            self._enroll()
+        self.assertEqual(self._count_queries(), num_queries)
+
+    def test_query_count_independent_of_verified_enrollments(self):
+        self._enroll(mode='verified')
+        num_queries = self._count_queries()
+
+        for __ in range(3):
+            self._enroll(mode='verified')
+        self.assertEqual(self._count_queries(), num_queries)
+
+    def test_memoized_in_request_cache(self):
+        self._enroll()
+        data = DashboardData.load(self.user)
+        with self.assertNumQueries(0):
+            self.assertIs(DashboardData.load(self.user), data)
@@ -36,7 +36,7 @@ class TestStudentDashboardUnenrollments(ModuleStoreTestCase):
         self.cert_status = None
         self.client.login(username=self.USERNAME, password=self.PASSWORD)
 
-    def mock_cert(self, _user, _course_overview, _course_mode):
+    def mock_cert(self, _user, _course_overview, _course_mode, **_kwargs):
         """ Return a preset certificate status. """
         if self.cert_status is not None:
             return {
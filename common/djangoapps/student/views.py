@@ -84,7 +84,7 @@ from external_auth.login_and_register import (
     register as external_auth_register
 )
 
-from bulk_email.models import Optout, CourseAuthorization
+from bulk_email.models import Optout
 from lang_pref import LANGUAGE_KEY
 
 import track.views
@@ -94,9 +94,6 @@ import dogstats_wrapper as dog_stats_api
 from util.db import outer_atomic
 from util.json_request import JsonResponse
 from util.bad_request_rate_limiter import BadRequestRateLimiter
-from util.milestones_helpers import (
-    get_pre_requisite_courses_not_completed,
-)
 from microsite_configuration import microsite
 
 from util.password_policy_validators import (
@@ -107,13 +104,13 @@ from util.password_policy_validators import (
 import third_party_auth
 from third_party_auth import pipeline, provider
 from student.helpers import (
-    check_verify_status_by_course,
     auth_pipeline_urls, get_next_url_for_login_page,
     DISABLE_UNENROLL_CERT_STATES,
 )
 from student.cookies import set_logged_in_cookies, delete_logged_in_cookies
+from student.dashboard_data import DashboardData, get_course_enrollments  # pylint: disable=unused-import
 from student.models import anonymous_id_for_user
-from shoppingcart.models import DonationConfiguration, CourseRegistrationCode
+from shoppingcart.models import DonationConfiguration
 
 from embargo import api as embargo_api
 
@@ -183,7 +180,7 @@ def process_survey_link(survey_link, user):
     return survey_link.format(UNIQUE_ID=unique_id_for_user(user))
 
 
-def cert_info(user, course_overview, course_mode):
+def cert_info(user, course_overview, course_mode, cert_status=None):
     """
     Get the certificate info needed to render the dashboard section for the given
     student and course.
@@ -192,6 +189,8 @@ def cert_info(user, course_overview, course_mode):
         user (User): A user.
         course_overview (CourseOverview): A course.
         course_mode (str): The enrollment mode (honor, verified, audit, etc.)
+        cert_status (dict): The result of `certificate_status_for_student` for
+            the user and course, if it was already loaded.
 
     Returns:
         dict: Empty dict if certificates are disabled or hidden, or a dictionary with keys:
@@ -206,12 +205,9 @@ def cert_info(user, course_overview, course_mode):
     """
     if not course_overview.may_certify():
         return {}
-    return _cert_info(
-        user,
-        course_overview,
-        certificate_status_for_student(user, course_overview.id),
-        course_mode
-    )
+    if cert_status is None:
+        cert_status = certificate_status_for_student(user, course_overview.id)
+    return _cert_info(user, course_overview, cert_status, course_mode)
 
 
 def reverification_info(statuses):
@@ -237,48 +233,6 @@ def reverification_info(statuses):
     return reverifications
 
 
-def get_course_enrollments(user, org_to_include, orgs_to_exclude):
-    """
-    Given a user, return a filtered set of his or her course enrollments.
-
-    Arguments:
-        user (User): the user in question.
-        org_to_include (str): for use in Microsites. If not None, ONLY courses
-            of this org will be returned.
-        orgs_to_exclude (list[str]): If org_to_include is not None, this
-            argument is ignored. Else, courses of this org will be excluded.
-
-    Returns:
-        generator[CourseEnrollment]: a sequence of enrollments to be displayed
-        on the user's dashboard.
-    """
-    for enrollment in CourseEnrollment.enrollments_for_user(user):
-
-        # If the course is missing or broken, log an error and skip it.
-        course_overview = enrollment.course_overview
-        if not course_overview:
-            log.error(
-                "User %s enrolled in broken or non-existent course %s",
-                user.username,
-                enrollment.course_id
-            )
-            continue
-
-        # If we are in a Microsite, then filter out anything that is not
-        # attributed (by ORG) to that Microsite.
-        if org_to_include and course_overview.location.org != org_to_include:
-            continue
-
-        # Conversely, if we are not in a Microsite, then filter out any enrollments
-        # with courses attributed (by ORG) to Microsites.
-        elif course_overview.location.org in orgs_to_exclude:
-            continue
-
-        # Else, include the enrollment.
-        else:
-            yield enrollment
-
-
 def _cert_info(user, course_overview, cert_status, course_mode):  # pylint: disable=unused-argument
     """
     Implements the logic for cert_info -- split out for testing.
@@ -531,24 +485,14 @@ def dashboard(request):
     if course_org_filter:
         org_filter_out_set.remove(course_org_filter)
 
-    # Build our (course, enrollment) list for the user, but ignore any courses that no
-    # longer exist (because the course IDs have changed). Still, we don't delete those
-    # enrollments, because it could have been a data push snafu.
-    course_enrollments = list(get_course_enrollments(user, course_org_filter, org_filter_out_set))
-
-    # sort the enrollment pairs by the enrollment date
-    course_enrollments.sort(key=lambda x: x.created, reverse=True)
-
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
-    course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in unexpired_course_modes.iteritems()
-    }
+    # Build our (course, enrollment) list for the user, sorted by enrollment date,
+    # but ignore any courses that no longer exist (because the course IDs have
+    # changed). Still, we don't delete those enrollments, because it could have
+    # been a data push snafu. The course modes, certificates and other
+    # per-course data are loaded for all the enrollments at once.
+    dashboard_data = DashboardData.load(user, course_org_filter, org_filter_out_set)
+    course_enrollments = dashboard_data.course_enrollments
+    course_modes_by_course = dashboard_data.course_modes_by_course
 
     # Check to see if the student has recently enrolled in a course.
     # If so, display a notification message confirming the enrollment.
@@ -573,11 +517,7 @@ def dashboard(request):
         staff_access = True
         errored_courses = modulestore().get_errored_courses()
 
-    show_courseware_links_for = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if has_access(request.user, 'load', enrollment.course_overview)
-        and has_access(request.user, 'view_courseware_with_prerequisites', enrollment.course_overview)
-    )
+    show_courseware_links_for = dashboard_data.show_courseware_links_for
 
     # Get any programs associated with courses being displayed.
     # This is passed along in the template context to allow rendering of
@@ -609,9 +549,14 @@ def dashboard(request):
     #
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
-    verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
+    verify_status_by_course = dashboard_data.verify_status_by_course
     cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview, enrollment.mode)
+        enrollment.course_id: cert_info(
+            request.user,
+            enrollment.course_overview,
+            enrollment.mode,
+            cert_status=dashboard_data.certificate_statuses[enrollment.course_id],
+        )
         for enrollment in course_enrollments
     }
 
@@ -620,7 +565,7 @@ def dashboard(request):
         enrollment.course_id for enrollment in course_enrollments if (
             settings.FEATURES['ENABLE_INSTRUCTOR_EMAIL'] and
             modulestore().get_modulestore_type(enrollment.course_id) != ModuleStoreEnum.Type.xml and
-            CourseAuthorization.instructor_email_enabled(enrollment.course_id)
+            enrollment.course_id in dashboard_data.email_enabled_course_ids
         )
     )
 
@@ -634,24 +579,21 @@ def dashboard(request):
 
     show_refund_option_for = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.refundable()
+        if enrollment.refundable(user_already_has_certs_for=dashboard_data.courses_with_certificates)
     )
 
     block_courses = frozenset(
         enrollment.course_id for enrollment in course_enrollments
         if is_course_blocked(
             request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
+            dashboard_data.redeemed_registration_codes[enrollment.course_id],
             enrollment.course_id
         )
     )
 
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
+        if enrollment.is_paid_course(modes_dict=dashboard_data.selectable_modes_by_course[enrollment.course_id])
     )
 
     # If there are *any* denied reverifications that have not been toggled off,
@@ -662,11 +604,7 @@ def dashboard(request):
     order_history_list = order_history(user, course_org_filter=course_org_filter, org_filter_out_set=org_filter_out_set)
 
     # get list of courses having pre-requisites yet to be completed
-    courses_having_prerequisites = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if enrollment.course_overview.pre_requisite_courses
-    )
-    courses_requirements_not_met = get_pre_requisite_courses_not_completed(user, courses_having_prerequisites)
+    courses_requirements_not_met = dashboard_data.courses_requirements_not_met
 
     if 'notlive' in request.GET:
         redirect_message = _("The course you are looking for does not start until {date}.").format(
@@ -0,0 +1,252 @@
+"""
+Event tracker backend that buffers events and hands them to another
+backend in batches from a background thread.
+
+Wrapping a backend keeps serialization and I/O out of the request
+thread::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {'database': 'track'},
+              },
+              'capacity': 10000,
+              'batch_size': 100,
+              'flush_interval': 1.0,
+              'overflow_policy': 'drop_oldest',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+# What to do with a new event when the buffer is full.
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that queues events into a bounded in-memory
+    buffer and sends them to the wrapped backend using `send_many`.
+
+    Pending events are flushed when the process exits.
+
+    """
+
+    def __init__(self, backend, capacity=10000, batch_size=100, flush_interval=1.0,
+                 overflow_policy=DROP_OLDEST, block_timeout=0.1, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: dict with the `ENGINE` and `OPTIONS` of the
+            backend the events are sent to
+          - `capacity`: maximum number of events held in memory
+          - `batch_size`: maximum number of events sent in one batch
+          - `flush_interval`: seconds to wait for a full batch before
+            sending whatever has been queued
+          - `overflow_policy`: one of `drop_oldest`, `drop_newest` or
+            `block`, applied when the buffer is full
+          - `block_timeout`: seconds the `block` policy waits for room
+            in the buffer before dropping the event
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy {0}'.format(overflow_policy))
+
+        # Imported here since the tracker instantiates this backend
+        # while it is being imported.
+        from track.tracker import _instantiate_backend_from_name  # pylint: disable=protected-access
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+
+        self.dropped = 0
+        self._events = deque()
+        self._in_flight = 0
+        self._flushing = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._all_sent = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = None
+        self._pid = None
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        with self._lock:
+            if self._closed:
+                self._send_batch([event])
+                return
+
+            self._ensure_thread()
+
+            if len(self._events) >= self.capacity and not self._make_room():
+                self.dropped += 1
+                return
+
+            self._events.append(event)
+            if len(self._events) >= self.batch_size:
+                self._not_empty.notify()
+
+    def _make_room(self):
+        """
+        Apply the overflow policy to a full buffer. Returns whether the
+        new event can be queued. Must be called with the lock held.
+
+        """
+        if self.overflow_policy == DROP_OLDEST:
+            self._events.popleft()
+            self.dropped += 1
+            return True
+
+        if self.overflow_policy == BLOCK:
+            deadline = time.time() + self.block_timeout
+            while len(self._events) >= self.capacity:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._not_empty.notify()
+                self._not_full.wait(remaining)
+            return True
+
+        return False
+
+    def _ensure_thread(self):
+        """
+        Start the background thread, or restart it after the process
+        forked. Must be called with the lock held.
+
+        """
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+
+        if self._pid != pid:
+            # Events queued by the parent process are its to send.
+            self._events.clear()
+            self._in_flight = 0
+
+        self._pid = pid
+        self._thread = threading.Thread(target=self._run, name='track-buffered-backend')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _ready(self):
+        """
+        Whether a batch should be sent without waiting for more events.
+        Must be called with the lock held.
+
+        """
+        if not self._events:
+            return False
+        if self._closed or self._flushing:
+            return True
+        if len(self._events) >= self.batch_size:
+            return True
+        # Senders may be blocked waiting for room in a full buffer.
+        return self.overflow_policy == BLOCK and len(self._events) >= self.capacity
+
+    def _take_batch(self):
+        """Remove and return up to `batch_size` events. Must be called with the lock held."""
+        count = min(self.batch_size, len(self._events))
+        batch = [self._events.popleft() for _ in xrange(count)]
+        self._in_flight += count
+        self._not_full.notify_all()
+        return batch
+
+    def _run(self):
+        """Background loop sending queued events in batches."""
+        while True:
+            with self._lock:
+                if not self._ready():
+                    if self._closed:
+                        return
+                    self._not_empty.wait(self.flush_interval)
+                    if not self._events:
+                        continue
+                batch = self._take_batch()
+
+            self._send_batch(batch)
+
+            with self._lock:
+                self._in_flight -= len(batch)
+                if not self._events and not self._in_flight:
+                    self._all_sent.notify_all()
+
+    def _send_batch(self, batch):
+        """Send a batch to the wrapped backend, logging rather than raising errors."""
+        if not batch:
+            return
+        try:
+            self.backend.send_many(batch)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error sending batch of %d events to %r', len(batch), self.backend)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued event has been sent, or `timeout`
+        seconds passed. Returns whether the buffer was drained.
+
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                # No background thread to send the events, do it here.
+                batch = list(self._events)
+                self._events.clear()
+                self._send_batch(batch)
+                return True
+
+            self._flushing += 1
+            try:
+                self._not_empty.notify()
+                while self._events or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._all_sent.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=5.0):
+        """Flush pending events and stop the background thread."""
+        drained = self.flush(timeout)
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        if not drained:
+            log.warning('Closed buffered tracking backend with undelivered events')
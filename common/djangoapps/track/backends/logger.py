@@ -17,7 +17,9 @@ application_log = logging.getLogger('track.backends.application_log')  # pylint:
 class LoggerBackend(BaseBackend):
     """Event tracker backend that uses a python logger.
 
-    Events are logged to the INFO level as JSON strings.
+    Events are logged to the INFO level as JSON strings.  Batches of
+    events are logged one record per event, as syslog handlers escape the
+    newlines of multi-line records and truncate them.
 
     """
 
@@ -34,6 +36,10 @@ class LoggerBackend(BaseBackend):
         self.event_logger = logging.getLogger(name)
 
     def send(self, event):
+        self.event_logger.info(self._serialize(event))
+
+    def _serialize(self, event):
+        """Serialize an event to a (possibly truncated) JSON string."""
         try:
             event_str = json.dumps(event, cls=DateTimeJSONEncoder)
         except UnicodeDecodeError:
@@ -46,6 +52,4 @@ class LoggerBackend(BaseBackend):
         # TODO: remove trucation of the serialized event, either at a
         # higher level during the emittion of the event, or by
         # providing warnings when the events exceed certain size.
-        event_str = event_str[:settings.TRACK_MAX_EVENT]
-
-        self.event_logger.info(event_str)
+        return event_str[:settings.TRACK_MAX_EVENT]
@@ -97,3 +97,17 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_many(self, events):
+        """Insert a batch of events in to the Mongo collection at once"""
+        if not events:
+            return
+        try:
+            # Unordered, so that one bad document does not stop the
+            # rest of the batch from being written. pymongo adds an _id to
+            # the documents it inserts, so insert copies rather than the
+            # events, which are shared with the other backends.
+            self.collection.insert_many([dict(event) for event in events], ordered=False)
+        except (PyMongoError, BSONError):
+            msg = 'Error inserting batch of %d events to MongoDB event tracker backend'
+            log.exception(msg, len(events))
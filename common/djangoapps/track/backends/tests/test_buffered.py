@@ -0,0 +1,94 @@
+from __future__ import absolute_import
+
+from django.test import TestCase
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class BatchRecordingBackend(BaseBackend):
+    """Backend that records the batches it is sent."""
+    def __init__(self, **kwargs):
+        super(BatchRecordingBackend, self).__init__(**kwargs)
+        self.batches = []
+
+    def send(self, event):
+        self.batches.append([event])
+
+    def send_many(self, events):
+        self.batches.append(list(events))
+
+    @property
+    def events(self):
+        """All the events received, in order."""
+        return [event for batch in self.batches for event in batch]
+
+
+WRAPPED_BACKEND = {'ENGINE': 'track.backends.tests.test_buffered.BatchRecordingBackend'}
+
+
+class TestBufferedBackend(TestCase):
+    def make_backend(self, **kwargs):
+        """Create a buffered backend that is closed at the end of the test."""
+        # A long flush interval keeps the background thread from sending
+        # anything that is not a full batch until the test flushes.
+        kwargs.setdefault('flush_interval', 60)
+        backend = BufferedBackend(backend=WRAPPED_BACKEND, **kwargs)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_events_sent_in_batches(self):
+        backend = self.make_backend(batch_size=3)
+        events = [{'test': i} for i in range(7)]
+
+        for event in events:
+            backend.send(event)
+
+        self.assertTrue(backend.flush(timeout=5))
+        self.assertEqual(backend.backend.events, events)
+        self.assertTrue(all(len(batch) <= 3 for batch in backend.backend.batches))
+        self.assertEqual(backend.dropped, 0)
+
+    def test_drop_oldest(self):
+        backend = self.make_backend(capacity=2, batch_size=10, overflow_policy='drop_oldest')
+
+        for i in range(4):
+            backend.send({'test': i})
+
+        backend.flush(timeout=5)
+        self.assertEqual(backend.backend.events, [{'test': 2}, {'test': 3}])
+        self.assertEqual(backend.dropped, 2)
+
+    def test_drop_newest(self):
+        backend = self.make_backend(capacity=2, batch_size=10, overflow_policy='drop_newest')
+
+        for i in range(4):
+            backend.send({'test': i})
+
+        backend.flush(timeout=5)
+        self.assertEqual(backend.backend.events, [{'test': 0}, {'test': 1}])
+        self.assertEqual(backend.dropped, 2)
+
+    def test_block_waits_for_room(self):
+        backend = self.make_backend(capacity=2, batch_size=10, overflow_policy='block', block_timeout=5)
+
+        for i in range(5):
+            backend.send({'test': i})
+
+        backend.flush(timeout=5)
+        self.assertEqual(backend.backend.events, [{'test': i} for i in range(5)])
+        self.assertEqual(backend.dropped, 0)
+
+    def test_send_after_close(self):
+        backend = self.make_backend()
+        backend.send({'test': 1})
+        backend.close()
+
+        self.assertEqual(backend.backend.events, [{'test': 1}])
+
+        backend.send({'test': 2})
+        self.assertEqual(backend.backend.events, [{'test': 1}, {'test': 2}])
+
+    def test_invalid_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            BufferedBackend(backend=WRAPPED_BACKEND, overflow_policy='ignore')
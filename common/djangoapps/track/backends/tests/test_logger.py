@@ -47,6 +47,17 @@ class TestLoggerBackend(TestCase):
         self.assertEqual(saved_events[0], unpacked_event)
         self.assertEqual(saved_events[1], unpacked_event)
 
+    def test_logger_backend_send_many(self):
+        self.handler.reset()
+
+        # Each event in a batch is logged as its own record.
+
+        self.backend.send_many([{'test': 1}, {'test': 2}])
+
+        self.assertEqual(len(self.handler.messages['info']), 2)
+        saved_events = [json.loads(e) for e in self.handler.messages['info']]
+        self.assertEqual(saved_events, [{'test': 1}, {'test': 2}])
+
 
 class MockLoggingHandler(logging.Handler):
     """
@@ -0,0 +1,105 @@
+"""
+Caching of the student views of XBlocks which render the same for many users.
+
+A block opts in by having a true `student_view_cacheable` attribute, which it
+should only do while its student view depends on nothing but its own content,
+the user's groups in its partitions, the language and whether the user is
+staff. The view (before the runtime's wrappers, which are request specific) is
+cached under those, the time the block was last edited, and a version of the
+course's fragments which is replaced whenever the course is published.
+"""
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+
+
+def _course_version_key(course_key):
+    """
+    The cache key of the version of the course's cached fragments.
+    """
+    return u'xblock_fragments.version.{}'.format(course_key)
+
+
+def course_fragments_version(course_key, request_cache_dict):
+    """
+    Return the current version of the course's cached fragments, remembering
+    it for the rest of the request in request_cache_dict.
+    """
+    versions = request_cache_dict.setdefault('xblock_fragments.versions', {})
+    if course_key not in versions:
+        version = cache.get(_course_version_key(course_key))
+        if version is None:
+            version = uuid4().hex
+            cache.set(_course_version_key(course_key), version, None)
+        versions[course_key] = version
+    return versions[course_key]
+
+
+def _edited_on(block):
+    """
+    When block was last edited, if its runtime knows.
+    """
+    # XModules take their edit info from their descriptors
+    return getattr(getattr(block, 'descriptor', block), 'edited_on', None)
+
+
+def is_cacheable(block, view_name):
+    """
+    Whether the given view of block may be cached.
+    """
+    return (
+        settings.FEATURES.get('ENABLE_XBLOCK_FRAGMENT_CACHE', False) and
+        view_name == 'student_view' and
+        block.scope_ids.block_type in settings.XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES and
+        not block.has_children and
+        getattr(block, 'student_view_cacheable', False) and
+        _edited_on(block) is not None
+    )
+
+
+def fragment_cache_key(block, view_name, version, group_ids, user_is_staff):
+    """
+    Return the key to cache the given (cacheable) view of block under.
+
+    Arguments:
+        block: the block (or XModule) being rendered
+        view_name: the name of the view being rendered
+        version: the version of the course's cached fragments
+        group_ids: the ids of the user's groups in the partitions of the block's
+            group_access
+        user_is_staff: whether the user has staff access to the block
+    """
+    key = u'/'.join([
+        version,
+        unicode(block.scope_ids.usage_id),
+        view_name,
+        _edited_on(block).isoformat(),
+        u','.join(unicode(group_id) for group_id in sorted(group_ids)),
+        translation.get_language() or u'',
+        unicode(bool(user_is_staff)),
+    ])
+    return 'xblock_fragments.{}'.format(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def get_cached_fragment(key):
+    """
+    Return the fragment cached under key, or None.
+    """
+    return cache.get(key)
+
+
+def cache_fragment(key, fragment):
+    """
+    Cache fragment under key.
+    """
+    cache.set(key, fragment, settings.XBLOCK_FRAGMENT_CACHE_TIMEOUT)
+
+
+def clear_course_fragments(course_key):
+    """
+    Abandon the course's cached fragments.
+    """
+    cache.delete(_course_version_key(course_key))
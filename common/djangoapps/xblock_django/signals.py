@@ -0,0 +1,16 @@
+"""
+Signal handler for abandoning the cached student views of a course's XBlocks
+"""
+from django.dispatch.dispatcher import receiver
+
+from xblock_django.fragment_cache import clear_course_fragments
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Catches the signal that a course has been published in the module
+    store and abandons the course's cached fragments.
+    """
+    clear_course_fragments(course_key)
@@ -0,0 +1,6 @@
+"""Code run at server start up to initialize the xblock_django app."""
+
+# Importing signals is necessary to activate signal handler, which abandons the
+# cached XBlock fragments of a course every time it is published, in Studio as
+# well as in the LMS.
+import xblock_django.signals  # pylint: disable=unused-import
@@ -4,9 +4,11 @@ Parser and evaluator for FormulaResponse and NumericalResponse
 Uses pyparsing to parse. Main function as of now is evaluator().
 """
 
+from collections import OrderedDict
 import math
 import operator
 import numbers
+import threading
 import numpy
 import scipy.constants
 import functions
@@ -73,6 +75,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of compiled expressions kept by `compile_expression`.
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -200,6 +206,79 @@ def eval_product(parse_result):
     return prod
 
 
+# The following functions are the counterparts of the evaluation actions
+# above for vectorized evaluation, where the numbers may be NumPy arrays. They
+# tell operands from operators by type, rather than by `numbers.Number`.
+
+def is_operator(token):
+    """
+    Return whether the token is an operator or parenthesis, not an operand.
+    """
+    return isinstance(token, basestring)
+
+
+def eval_atom_vectorized(parse_result):
+    """
+    Return the value wrapped by the atom, which may be an array.
+    """
+    return next(k for k in parse_result if not is_operator(k))
+
+
+def eval_power_vectorized(parse_result):
+    """
+    Exponentiate the operands, right to left, element-wise.
+    """
+    parse_result = reversed([k for k in parse_result if not is_operator(k)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def eval_parallel_vectorized(parse_result):
+    """
+    Compute the parallel resistors operator element-wise.
+
+    NaN where there is a zero among the inputs.
+    """
+    operands = [numpy.asarray(k) for k in parse_result if not is_operator(k)]
+    if len(operands) == 1:
+        return operands[0]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        result = 1. / sum(1. / k for k in operands)
+    has_zero = reduce(numpy.logical_or, [k == 0 for k in operands])
+    return numpy.where(has_zero, float('nan'), result)
+
+
+def eval_sum_vectorized(parse_result):
+    """
+    Add the operands element-wise, keeping in mind their sign.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if not is_operator(token):
+            total = current_op(total, token)
+        elif token == '+':
+            current_op = operator.add
+        elif token == '-':
+            current_op = operator.sub
+    return total
+
+
+def eval_product_vectorized(parse_result):
+    """
+    Multiply the operands element-wise.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if not is_operator(token):
+            prod = current_op(prod, token)
+        elif token == '*':
+            current_op = operator.mul
+        elif token == '/':
+            current_op = operator.truediv
+    return prod
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -228,34 +307,130 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+def vectorized_evaluator(variables, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression for many samples of its variables at once.
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+    Like `evaluator`, but the values of the variables may be NumPy arrays
+    (of the same shape, or broadcastable), and the result is the array of the
+    expression's values for each sample. Functions must accept and return
+    arrays, as the default NumPy functions do.
+    """
+    # No need to go further.
+    if math_expr.strip() == "":
+        return float('nan')
+
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions, vectorized=True)
+
+
+_COMPILED_EXPRESSIONS = OrderedDict()
+_COMPILED_EXPRESSIONS_LOCK = threading.Lock()
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return the `CompiledExpression` for the given math expression string.
+
+    Compiled expressions are memoized by (math_expr, case_sensitive), keeping
+    the COMPILED_EXPRESSION_CACHE_SIZE most recently used ones, so repeated
+    evaluations of an expression don't parse it again. Expressions that fail
+    to parse are not memoized.
+    """
+    key = (math_expr, case_sensitive)
+    with _COMPILED_EXPRESSIONS_LOCK:
+        compiled = _COMPILED_EXPRESSIONS.pop(key, None)
+        if compiled is not None:
+            _COMPILED_EXPRESSIONS[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+
+    with _COMPILED_EXPRESSIONS_LOCK:
+        _COMPILED_EXPRESSIONS[key] = compiled
+        while len(_COMPILED_EXPRESSIONS) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _COMPILED_EXPRESSIONS.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    A math expression, parsed once and compiled into a tree of closures that
+    can be evaluated for any values of its variables.
+
+    Evaluating the compiled expression gives the same result as reducing its
+    parse tree with `ParseAugmenter.reduce_tree`, without parsing it again or
+    walking the `pyparsing.ParseResults`.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+
+        # Parse the tree.
+        self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        self.math_interpreter.parse_algebra()
+        self.evaluate_tree = self.compile_node(self.math_interpreter.tree)
+
+    @classmethod
+    def compile_node(cls, node):
+        """
+        Return a function of the evaluation actions that evaluates the node.
+
+        Terminal nodes evaluate to themselves, and numbers are converted once,
+        here. Other nodes call their action on the values of their children.
+        """
+        if not isinstance(node, ParseResults):
+            return lambda actions: node
+
+        node_name = node.getName()
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda actions: value
+
+        kids = [cls.compile_node(k) for k in node]
+        return lambda actions: actions[node_name]([kid(actions) for kid in kids])
+
+    def evaluate(self, variables, functions, vectorized=False):
+        """
+        Evaluate the expression with the given variables and functions.
+
+        See `evaluator`, or `vectorized_evaluator` if `vectorized` is true.
+        """
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+
+        # ...and check them
+        self.math_interpreter.check_variables(all_variables, all_functions)
+
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        evaluate_actions = {
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+        }
+        if vectorized:
+            evaluate_actions.update({
+                'atom': eval_atom_vectorized,
+                'power': eval_power_vectorized,
+                'parallel': eval_parallel_vectorized,
+                'product': eval_product_vectorized,
+                'sum': eval_sum_vectorized
+            })
+        else:
+            evaluate_actions.update({
+                'atom': eval_atom,
+                'power': eval_power,
+                'parallel': eval_parallel,
+                'product': eval_product,
+                'sum': eval_sum
+            })
+
+        return self.evaluate_tree(evaluate_actions)
 
 
 class ParseAugmenter(object):
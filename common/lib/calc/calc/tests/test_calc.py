@@ -3,6 +3,7 @@ Unit tests for calc.py
 """
 
 import unittest
+import mock
 import numpy
 import calc
 from pyparsing import ParseException
@@ -559,3 +560,57 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+    def test_compiled_expression_cache(self):
+        """
+        Check that an expression is parsed once per case sensitivity, and that
+        its compiled form is evaluated with the given variables
+        """
+        with mock.patch.object(calc.ParseAugmenter, 'parse_algebra', autospec=True,
+                               side_effect=calc.ParseAugmenter.parse_algebra) as mock_parse:
+            self.assertEqual(calc.evaluator({'x': 1.0}, {}, 'x*2 + 0.125'), 2.125)
+            self.assertEqual(calc.evaluator({'x': 3.0}, {}, 'x*2 + 0.125'), 6.125)
+            self.assertEqual(mock_parse.call_count, 1)
+            self.assertEqual(calc.evaluator({'x': 3.0}, {}, 'x*2 + 0.125', case_sensitive=True), 6.125)
+            self.assertEqual(mock_parse.call_count, 2)
+
+
+class VectorizedEvaluatorTest(unittest.TestCase):
+    """
+    Run tests for calc.vectorized_evaluator
+    """
+    def assert_matches_evaluator(self, math_expr, variables, functions=None):
+        """
+        Check that the vectorized evaluation of the expression over arrays of
+        samples of the variables matches evaluating it for each sample.
+        """
+        functions = functions or {}
+        results = calc.vectorized_evaluator(
+            {name: numpy.array(values) for name, values in variables.iteritems()}, functions, math_expr
+        )
+        for index, result in enumerate(results):
+            sample = {name: values[index] for name, values in variables.iteritems()}
+            expected = calc.evaluator(sample, functions, math_expr)
+            if numpy.isnan(expected):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(result, expected)
+
+    def test_arithmetic(self):
+        self.assert_matches_evaluator(
+            "-x + 2*y - x/y + x^y^2 + 3k", {'x': [1.0, 2.0, 0.5], 'y': [2.0, 1.5, 3.0]}
+        )
+
+    def test_functions_and_constants(self):
+        self.assert_matches_evaluator("sin(x)^2 + cos(x)^2 + sqrt(x)*pi - e^x", {'x': [0.1, 1.0, 2.5]})
+
+    def test_parallel_resistors(self):
+        self.assert_matches_evaluator("x || y || 2", {'x': [1.0, 0.0, 3.0], 'y': [2.0, 4.0, 0.0]})
+
+    def test_scalar_variables(self):
+        results = calc.vectorized_evaluator({'x': numpy.array([1.0, 2.0]), 'y': 3.0}, {}, "x*y")
+        self.assertEqual(list(results), [3.0, 6.0])
+
+    def test_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.vectorized_evaluator({'x': numpy.array([1.0])}, {}, "x+y")
@@ -13,11 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
 from lxml import etree
 from pytz import UTC
@@ -29,7 +32,7 @@ import capa.customrender as customrender
 import capa.responsetypes as responsetypes
 from capa.util import contextualize_text, convert_files_to_filenames
 import capa.xqueue_interface as xqueue_interface
-from capa.safe_exec import safe_exec
+from capa.safe_exec import safe_exec, safe_exec_many
 
 
 # extra things displayed after "show answers" is pressed
@@ -56,8 +59,14 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# Number of processed problems `LoncapaProblem` keeps, see `LoncapaProblem._get_processed_problem`
+PROCESSED_PROBLEM_CACHE_SIZE = 200
+
 log = logging.getLogger(__name__)
 
+_PROCESSED_PROBLEMS = OrderedDict()
+_PROCESSED_PROBLEMS_LOCK = threading.Lock()
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -161,22 +170,17 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, handle any <include file="foo"> tags,
+        # and add ID's to the responses, input fields and solutions
+        self.tree, responses = self._get_processed_problem(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self._preprocess_problem(self.tree)
+        # Create the dict (self.responders) of Response instances for each question in
+        # the problem. The dict has keys = xml subtree of Response, values = Response instance.
+        # Responses may perform some in-place transformations of the XML tree.
+        self._preprocess_problem(responses)
 
         if not self.student_answers:  # True when student_answers is an empty dict
             self.set_initial_display()
@@ -195,6 +199,58 @@ class LoncapaProblem(object):
 
         self.extracted_tree = self._extract_html(self.tree)
 
+    def _get_processed_problem(self, problem_text):
+        """
+        Return a new element tree of the problem XML, made xml compatible, with its includes
+        inserted and ID's added, and the list of its responses that `_assign_ids` returns.
+
+        None of this depends on the seed or the student's state, so every student's problem
+        starts from the same tree.  The processed trees of the PROCESSED_PROBLEM_CACHE_SIZE
+        most recently used problems are kept, keyed by the problem id and a digest of the
+        problem text, which changes with every new version of the problem definition.  Each
+        problem gets a copy, with its responses found by their position in the tree rather
+        than queried again.
+
+        Problems with includes are not kept, as the included files can change without the
+        problem text changing, and neither are problem texts that fail to parse.
+        """
+        if isinstance(problem_text, unicode):
+            digest = hashlib.md5(problem_text.encode('utf-8')).hexdigest()
+        else:
+            digest = hashlib.md5(problem_text).hexdigest()
+        key = (self.problem_id, digest)
+        with _PROCESSED_PROBLEMS_LOCK:
+            processed = _PROCESSED_PROBLEMS.pop(key, None)
+            if processed is not None:
+                _PROCESSED_PROBLEMS[key] = processed
+
+        if processed is None:
+            tree = etree.XML(problem_text)
+            self.make_xml_compatible(tree)
+            if tree.find('.//include') is not None:
+                self._process_includes(tree)
+                return tree, self._assign_ids(tree)
+
+            responses = self._assign_ids(tree)
+            positions = dict((element, position) for position, element in enumerate(tree.iter()))
+            processed = (tree, [
+                (positions[response], [positions[entry] for entry in inputfields], responsetype_cls)
+                for response, inputfields, responsetype_cls in responses
+            ])
+            with _PROCESSED_PROBLEMS_LOCK:
+                _PROCESSED_PROBLEMS[key] = processed
+                while len(_PROCESSED_PROBLEMS) > PROCESSED_PROBLEM_CACHE_SIZE:
+                    _PROCESSED_PROBLEMS.popitem(last=False)
+
+        tree, response_positions = processed
+        tree = deepcopy(tree)
+        elements = list(tree.iter())
+        responses = [
+            (elements[response], [elements[entry] for entry in inputfields], responsetype_cls)
+            for response, inputfields, responsetype_cls in response_positions
+        ]
+        return tree, responses
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -576,12 +632,12 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
-    def _process_includes(self):
+    def _process_includes(self, tree):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
-        into our XML tree.  Fail gracefully if debugging.
+        into the XML tree.  Fail gracefully if debugging.
         """
-        includes = self.tree.findall('.//include')
+        includes = tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
@@ -723,6 +779,33 @@ class LoncapaProblem(object):
         context['extra_files'] = extra_files or None
         return context
 
+    def warm_context_cache(self, students):
+        """
+        Run this problem's script for other students ahead of time, so that
+        their problems find the resulting context in the cache rather than
+        each running a sandbox.
+
+        `students` is a list of (seed, anonymous_student_id) pairs.  The script
+        is run for as many of them as fit in each sandbox (see safe_exec_many).
+        Errors are cached like any other result, and raised when the student's
+        problem is made.  Nothing is run if there is no script or no cache.
+        """
+        all_code = self.context['script_code']
+        if not all_code or not self.capa_system.cache:
+            return
+        items = [
+            (all_code, {'seed': seed, 'anonymous_student_id': anonymous_student_id}, seed)
+            for seed, anonymous_student_id in students
+        ]
+        safe_exec_many(
+            items,
+            python_path=self.context['python_path'],
+            extra_files=self.context['extra_files'],
+            cache=self.capa_system.cache,
+            slug=self.problem_id,
+            unsafely=self.capa_system.can_execute_unsafe_code(),
+        )
+
     def _extract_html(self, problemtree):  # private
         """
         Main (private) function which converts Problem XML tree to HTML.
@@ -824,19 +907,20 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree):  # private
+    def _assign_ids(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
         Annoted correctness and value
+        Assign IDs to all the solutions
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns a list of (response, inputfields, responsetype_cls) tuples, one for each
+        response in the tree, with the list of its input and solution entries and the
+        capa Response class for it.
         """
         response_id = 1
-        self.responders = {}
+        responses = []
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             response_id_str = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -857,8 +941,29 @@ class LoncapaProblem(object):
                 entry.attrib['id'] = "%s_%i_%i" % (self.problem_id, response_id, answer_id)
                 answer_id = answer_id + 1
 
-            # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
+            responses.append((response, inputfields, responsetype_cls))
+
+        # <solution>...</solution> may not be associated with any specific response; give
+        # IDs for those separately
+        # TODO: We should make the namespaces consistent and unique (e.g. %s_problem_%i).
+        solution_id = 1
+        for solution in tree.findall('.//solution'):
+            solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
+            solution_id += 1
+
+        return responses
+
+    def _preprocess_problem(self, responses):  # private
+        """
+        Create capa Response instances for each of the `responses` that `_assign_ids`
+        returned, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        self.responders = {}
+        for response, inputfields, responsetype_cls in responses:
+            # instantiate capa Response
             responder = responsetype_cls(response, inputfields, self.context, self.capa_system, self.capa_module)
             # save in list in self
             self.responders[response] = responder
@@ -873,11 +978,3 @@ class LoncapaProblem(object):
                 log.debug('responder %s failed to properly return get_answers()',
                           self.responders[response])  # FIXME
                 raise
-
-        # <solution>...</solution> may not be associated with any specific response; give
-        # IDs for those separately
-        # TODO: We should make the namespaces consistent and unique (e.g. %s_problem_%i).
-        solution_id = 1
-        for solution in tree.findall('.//solution'):
-            solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
-            solution_id += 1
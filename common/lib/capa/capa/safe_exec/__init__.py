@@ -1,3 +1,4 @@
 """Capa's specialized use of codejail.safe_exec."""
 
-from .safe_exec import safe_exec, update_hash
+from .local_cache import LocalCache
+from .safe_exec import safe_exec, safe_exec_many, update_hash
@@ -0,0 +1,149 @@
+"""A disk-backed local cache tier for safe_exec results."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+log = logging.getLogger(__name__)
+
+
+class LocalCache(object):
+    """
+    A cache of safe_exec results stored in files under a local directory.
+
+    It provides the .get(key) and .set(key, value, timeout=None) methods that
+    safe_exec expects of a cache.  If a `backend` cache is given, it is used as
+    the next tier: misses are looked up in the backend, and its hits are copied
+    to the local directory, and values set are stored in both.
+
+    At most `max_entries` values are kept.  When a value set takes the
+    directory over that, the least recently used values are removed until two
+    thirds of `max_entries` remain.  The number of values is counted once and
+    then kept as a running count, so the directory is only listed again when
+    it needs culling.  Other processes sharing the directory aren't counted
+    until then, so it can briefly hold more than `max_entries` values.  Values
+    set with a `timeout` are dropped once it has passed.
+
+    Values are stored as JSON, so only the JSON-safe results that safe_exec
+    caches are supported.  Failures to read or write the directory are logged
+    and treated as cache misses.
+
+    """
+    def __init__(self, root, backend=None, max_entries=10000):
+        self.root = root
+        self.backend = backend
+        self.max_entries = max_entries
+        # The number of values in the directory, or None until it is counted.
+        self._entries = None
+
+    def _path(self, key):
+        """Return the path of the file that stores the value for `key`."""
+        digest = hashlib.md5(key).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, key):
+        """Return the value cached for `key`, or None."""
+        path = self._path(key)
+        try:
+            with open(path) as value_file:
+                expires, value = json.load(value_file)
+            if expires is None or expires > time.time():
+                # Files are evicted in order of modification time, so touch
+                # this one to keep it as recently used.
+                os.utime(path, None)
+                return value
+            os.remove(path)
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        if value is not None:
+            self._store(key, value, None)
+        return value
+
+    def set(self, key, value, timeout=None):
+        """Cache `value` for `key`, for `timeout` seconds if given."""
+        self._store(key, value, timeout)
+        if self.backend is not None:
+            if timeout is None:
+                self.backend.set(key, value)
+            else:
+                self.backend.set(key, value, timeout)
+
+    def _store(self, key, value, timeout):
+        """
+        Write `value` to the file for `key`.  The file is written under a
+        temporary name and renamed into place, so readers never see a
+        partially written value.
+        """
+        expires = time.time() + timeout if timeout is not None else None
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        temp_path = None
+        try:
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another process may have created it first.
+                if not os.path.isdir(directory):
+                    raise
+            temp_fd, temp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(temp_fd, 'w') as temp_file:
+                json.dump([expires, value], temp_file)
+            is_new = not os.path.exists(path)
+            os.rename(temp_path, path)
+        except (IOError, OSError, TypeError, ValueError):
+            log.warning("Couldn't write safe_exec result to local cache %s", self.root, exc_info=True)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        if self._entries is None:
+            self._entries = len(self._list())
+        elif is_new:
+            self._entries += 1
+        if self._entries > self.max_entries:
+            self._cull()
+
+    def _list(self):
+        """Return the paths of all the values in the directory."""
+        paths = []
+        for directory, __, filenames in os.walk(self.root):
+            # Skip the temporary files of values being written.
+            paths.extend(
+                os.path.join(directory, filename)
+                for filename in filenames
+                if not filename.startswith(tempfile.template)
+            )
+        return paths
+
+    def _cull(self):
+        """
+        Remove the least recently used values if there are more than
+        `max_entries` of them, and recount the values left.
+        """
+        paths = self._list()
+        self._entries = len(paths)
+        if self._entries <= self.max_entries:
+            return
+
+        used = []
+        for path in paths:
+            try:
+                used.append((os.path.getmtime(path), path))
+            except OSError:
+                # Removed by another process.
+                pass
+        used.sort()
+        for __, path in used[:len(used) - self.max_entries * 2 // 3]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            else:
+                self._entries -= 1
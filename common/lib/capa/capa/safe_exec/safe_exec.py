@@ -46,6 +46,49 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The number of items that safe_exec_many runs in a single sandbox.  The
+# sandbox limits (CPU time, memory) apply to a whole batch, so this should
+# stay small enough for a batch to fit within them.
+SAFE_EXEC_BATCH_SIZE = 20
+
+# The code run in the sandbox by safe_exec_many.  `batch_items` is a list of
+# [code, globals_dict, random_seed] items; each is run as safe_exec would run
+# it, and `batch_results` is set to a list of [exception message or None,
+# resulting JSON-safe globals] pairs.
+BATCH_CODE = """\
+import json as _json
+import random as _random_module
+import sys as _sys
+import traceback as _traceback
+
+_JSON_SAFE_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+
+
+def _json_safe(globals_dict):
+    cleaned = {}
+    for key, value in globals_dict.iteritems():
+        if key == '__builtins__' or not isinstance(value, _JSON_SAFE_TYPES):
+            continue
+        try:
+            cleaned[key] = _json.loads(_json.dumps(value))
+        except Exception:
+            continue
+    return cleaned
+
+
+batch_results = []
+for _code, _globals, _random_seed in batch_items:
+    try:
+        exec compile(%(code_prolog)r %% _random_seed + %(lazy_imports)r + _code, "jailed_code", "exec") in _globals
+    except Exception:
+        batch_results.append(["Couldn't execute jailed code: " + _traceback.format_exc(), _json_safe(_globals)])
+    else:
+        batch_results.append([None, _json_safe(_globals)])
+    finally:
+        # Undo the seeded stand-in for the random module installed by the prolog.
+        _sys.modules['random'] = _random_module
+""" % {'code_prolog': CODE_PROLOG, 'lazy_imports': LAZY_IMPORTS}
+
 
 def update_hash(hasher, obj):
     """
@@ -70,6 +113,18 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _cache_key(code, globals_dict, random_seed):
+    """
+    Returns the key under which the result of executing `code` with `globals_dict` and
+    `random_seed` is cached.
+    """
+    safe_globals = json_safe(globals_dict)
+    md5er = hashlib.md5()
+    md5er.update(repr(code))
+    update_hash(md5er, safe_globals)
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -109,11 +164,7 @@ def safe_exec(
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+        key = _cache_key(code, globals_dict, random_seed)
         cached = cache.get(key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
@@ -153,3 +204,101 @@ def safe_exec(
     # If an exception happened, raise it now.
     if emsg:
         raise e
+
+
+@dog_stats_api.timed('capa.safe_exec.batch_time')
+def safe_exec_many(
+    items,
+    python_path=None,
+    extra_files=None,
+    cache=None,
+    slug=None,
+    unsafely=False,
+    batch_size=SAFE_EXEC_BATCH_SIZE,
+):
+    """
+    Execute many pieces of python code safely, running up to `batch_size` of them in
+    each sandbox.
+
+    `items` is a list of (code, globals_dict, random_seed) tuples.  Each code is
+    executed as `safe_exec` would execute it with its globals and random seed, and
+    any changes it makes to those globals are visible in its `globals_dict` when this
+    function returns.
+
+    `python_path`, `extra_files`, `cache`, `slug` and `unsafely` are as for
+    `safe_exec`, and apply to all the items.  Results are cached under the same keys
+    as `safe_exec` uses, so the two share cached results.
+
+    Returns a list with, for each item, the SafeExecException its code raised, or
+    None if it ran successfully.  Exceptions are returned rather than raised so that
+    one failing item does not prevent the results of the others being used.
+
+    If a whole batch fails, for instance by exceeding the sandbox limits, its items
+    are run again one at a time with `safe_exec`.
+
+    """
+    errors = [None] * len(items)
+
+    # Check the cache for previous results.
+    pending = []
+    for index, (code, globals_dict, random_seed) in enumerate(items):
+        key = None
+        if cache:
+            key = _cache_key(code, globals_dict, random_seed)
+            cached = cache.get(key)
+            if cached is not None:
+                emsg, cleaned_results = cached
+                globals_dict.update(cleaned_results)
+                if emsg:
+                    errors[index] = SafeExecException(emsg)
+                continue
+        pending.append((index, key))
+
+    # Decide which code executor to use.
+    if unsafely:
+        exec_fn = codejail_not_safe_exec
+    else:
+        exec_fn = codejail_safe_exec
+
+    for start in xrange(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        batch_globals = {
+            'batch_items': [
+                [items[index][0], json_safe(items[index][1]), items[index][2]]
+                for index, __ in batch
+            ],
+        }
+        try:
+            exec_fn(
+                BATCH_CODE, batch_globals,
+                python_path=python_path, extra_files=extra_files, slug=slug,
+            )
+            batch_results = batch_globals['batch_results']
+        except SafeExecException:
+            batch_results = None
+
+        for position, (index, key) in enumerate(batch):
+            code, globals_dict, random_seed = items[index]
+
+            if batch_results is None:
+                try:
+                    safe_exec(
+                        code, globals_dict, random_seed=random_seed,
+                        python_path=python_path, extra_files=extra_files,
+                        cache=cache, slug=slug, unsafely=unsafely,
+                    )
+                except SafeExecException as e:
+                    errors[index] = e
+                continue
+
+            emsg, cleaned_results = batch_results[position]
+            globals_dict.update(cleaned_results)
+
+            # Put the result in the cache, as safe_exec would.
+            if cache:
+                cache.set(key, (emsg, json_safe(globals_dict)))
+
+            if emsg:
+                errors[index] = SafeExecException(emsg)
+
+    return errors
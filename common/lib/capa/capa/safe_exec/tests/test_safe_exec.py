@@ -1,18 +1,26 @@
 """Test safe_exec.py"""
 
 import hashlib
+import importlib
 import os
 import os.path
 import random
+import shutil
+import tempfile
 import textwrap
 import unittest
 
+from mock import patch
+
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import LocalCache, safe_exec, safe_exec_many, update_hash
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
+# The capa.safe_exec package exports the safe_exec function under the name of its module.
+SAFE_EXEC_MODULE = importlib.import_module('capa.safe_exec.safe_exec')
+
 
 class TestSafeExec(unittest.TestCase):
     def test_set_values(self):
@@ -177,6 +185,128 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class TestSafeExecMany(unittest.TestCase):
+    """Test safe_exec_many."""
+
+    def test_results_and_exceptions(self):
+        items = [
+            ("a = 1/2", {}, None),
+            ("b = x + 1", {'x': 41}, None),
+            ("1/0", {}, None),
+            ("rnums = [random.randint(0, 999) for _ in xrange(10)]", {}, 17),
+        ]
+        errors = safe_exec_many(items)
+
+        self.assertEqual(items[0][1]['a'], 0.5)
+        self.assertEqual(items[1][1]['b'], 42)
+        r = random.Random(17)
+        self.assertEqual(items[3][1]['rnums'], [r.randint(0, 999) for _ in xrange(10)])
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[2], SafeExecException)
+        self.assertIn("ZeroDivisionError", errors[2].message)
+        self.assertIsNone(errors[3])
+
+    def test_one_sandbox_per_batch(self):
+        items = [("a = %d" % i, {}, i) for i in xrange(5)]
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            mock_exec.side_effect = lambda code, globals_dict, **kwargs: globals_dict.update(
+                batch_results=[[None, {'a': item[2]}] for item in globals_dict['batch_items']]
+            )
+            safe_exec_many(items, batch_size=2)
+        self.assertEqual(mock_exec.call_count, 3)
+        self.assertEqual([item[1]['a'] for item in items], range(5))
+
+    def test_shares_cache_with_safe_exec(self):
+        cache = {}
+        items = [("a = int(math.pi)", {}, 1), ("1/0", {}, 2)]
+        errors = safe_exec_many(items, cache=DictCache(cache))
+        self.assertEqual(len(cache), 2)
+
+        g = {}
+        safe_exec("a = int(math.pi)", g, random_seed=1, cache=DictCache(cache))
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(len(cache), 2)
+
+        # Results cached by safe_exec are used by safe_exec_many.
+        cache[cache.keys()[0]] = (None, {'a': 17})
+        cache[cache.keys()[1]] = (None, {'a': 17})
+        items = [("a = int(math.pi)", {}, 1), ("1/0", {}, 2)]
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            errors = safe_exec_many(items, cache=DictCache(cache))
+        self.assertFalse(mock_exec.called)
+        self.assertEqual(errors, [None, None])
+        self.assertEqual([item[1]['a'] for item in items], [17, 17])
+
+
+class TestLocalCache(unittest.TestCase):
+    """Test the disk-backed LocalCache."""
+
+    def setUp(self):
+        super(TestLocalCache, self).setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_get_and_set(self):
+        cache = LocalCache(self.root)
+        self.assertIsNone(cache.get("safe_exec.1.abc"))
+        cache.set("safe_exec.1.abc", (None, {'a': 3}))
+        self.assertEqual(LocalCache(self.root).get("safe_exec.1.abc"), [None, {'a': 3}])
+
+    def test_backend(self):
+        backend = {}
+        cache = LocalCache(self.root, backend=DictCache(backend))
+        cache.set("safe_exec.1.abc", (None, {'a': 3}))
+        self.assertEqual(backend, {"safe_exec.1.abc": (None, {'a': 3})})
+
+        # A miss in a new local directory is filled from the backend.
+        other_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_root)
+        self.assertEqual(LocalCache(other_root, backend=DictCache(backend)).get("safe_exec.1.abc"), (None, {'a': 3}))
+        self.assertEqual(LocalCache(other_root).get("safe_exec.1.abc"), [None, {'a': 3}])
+
+    def test_timeout(self):
+        cache = LocalCache(self.root)
+        cache.set("safe_exec.1.abc", (None, {'a': 3}), 60)
+        self.assertEqual(cache.get("safe_exec.1.abc"), [None, {'a': 3}])
+        cache.set("safe_exec.1.abc", (None, {'a': 3}), -1)
+        self.assertIsNone(cache.get("safe_exec.1.abc"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalCache(self.root, max_entries=3)
+        for name in "abc":
+            cache.set(name, name)
+        # Make "a" the oldest, then use it.
+        for age, name in enumerate("abc"):
+            os.utime(cache._path(name), (age, age))  # pylint: disable=protected-access
+        self.assertEqual(cache.get("a"), "a")
+        cache.set("d", "d")
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.get("a"), "a")
+        self.assertEqual(cache.get("d"), "d")
+
+    def test_counts_entries_once(self):
+        cache = LocalCache(self.root, max_entries=3)
+        with patch.object(cache, '_list', wraps=cache._list) as mock_list:  # pylint: disable=protected-access
+            for name in "abc":
+                cache.set(name, name)
+            cache.set("a", "a")
+            self.assertEqual(mock_list.call_count, 1)
+            # Going over max_entries lists the directory again to cull it.
+            cache.set("d", "d")
+            self.assertEqual(mock_list.call_count, 2)
+
+    def test_safe_exec(self):
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=LocalCache(self.root))
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            g = {}
+            safe_exec("a = int(math.pi)", g, cache=LocalCache(self.root))
+        self.assertFalse(mock_exec.called)
+        self.assertEqual(g['a'], 3)
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
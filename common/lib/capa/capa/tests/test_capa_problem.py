@@ -0,0 +1,116 @@
+"""
+Tests of the parsing of problems by LoncapaProblem.
+"""
+import hashlib
+import random
+import textwrap
+import unittest
+
+from lxml import etree
+from mock import Mock, patch
+
+from capa import capa_problem
+from capa.capa_problem import LoncapaProblem
+from capa.tests import new_loncapa_problem, test_capa_system
+
+
+class ProcessedProblemCacheTest(unittest.TestCase):
+    """
+    Tests of keeping the processed trees of problems.
+    """
+    xml = textwrap.dedent("""
+        <problem>
+            <stringresponse answer="Michigan">
+                <additional_answer>Mich</additional_answer>
+                <textline size="20"/>
+            </stringresponse>
+            <solution><p>Michigan</p></solution>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(ProcessedProblemCacheTest, self).setUp()
+        patcher = patch.dict(capa_problem._PROCESSED_PROBLEMS, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_processed_once(self):
+        assign_ids = LoncapaProblem._assign_ids  # pylint: disable=protected-access
+        with patch.object(LoncapaProblem, 'make_xml_compatible', autospec=True,
+                          side_effect=LoncapaProblem.make_xml_compatible) as mock_make_xml_compatible:
+            with patch.object(LoncapaProblem, '_assign_ids', autospec=True, side_effect=assign_ids) as mock_assign_ids:
+                problems = [new_loncapa_problem(self.xml, seed=seed) for seed in (1, 2)]
+        self.assertEqual(mock_make_xml_compatible.call_count, 1)
+        self.assertEqual(mock_assign_ids.call_count, 1)
+
+        # Each problem has its own tree, made xml compatible and with ID's, and its own responders.
+        self.assertIsNot(problems[0].tree, problems[1].tree)
+        for problem in problems:
+            self.assertEqual(problem.tree.find('.//additional_answer').get('answer'), 'Mich')
+            self.assertEqual(problem.tree.find('.//solution').get('id'), '1_solution_1')
+            self.assertEqual(etree.tostring(problem.tree), etree.tostring(problems[0].tree))
+
+            elements = list(problem.tree.iter())
+            self.assertEqual(len(problem.responders), 1)
+            response, responder = problem.responders.items()[0]
+            self.assertIn(response, elements)
+            self.assertIs(responder.xml, response)
+            self.assertEqual(responder.answer_ids, ['1_2_1'])
+            self.assertIn(responder.inputfields[0], elements)
+
+    def test_includes_not_kept(self):
+        xml = self.xml.replace('<solution>', '<include file="missing.xml"/><solution>')
+        new_loncapa_problem(xml)
+        self.assertEqual(len(capa_problem._PROCESSED_PROBLEMS), 0)  # pylint: disable=protected-access
+
+    def test_cache_size(self):
+        with patch.object(capa_problem, 'PROCESSED_PROBLEM_CACHE_SIZE', 1):
+            new_loncapa_problem(self.xml)
+            new_loncapa_problem(self.xml.replace('Michigan', 'Ohio'))
+        processed_problems = capa_problem._PROCESSED_PROBLEMS  # pylint: disable=protected-access
+        self.assertEqual(
+            processed_problems.keys(),
+            [('1', hashlib.md5(self.xml.replace('Michigan', 'Ohio')).hexdigest())]
+        )
+
+
+class WarmContextCacheTest(unittest.TestCase):
+    """
+    Tests of running a problem's script for other students ahead of time.
+    """
+    xml = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+        x = random.randint(0, 999)
+        name = anonymous_student_id
+            </script>
+            <p>$x</p>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(WarmContextCacheTest, self).setUp()
+        self.cached = {}
+        self.capa_system = test_capa_system()
+        self.capa_system.cache = Mock(get=self.cached.get, set=self.cached.__setitem__)
+
+    def test_warm_context_cache(self):
+        problem = new_loncapa_problem(self.xml, capa_system=self.capa_system, seed=1)
+        problem.warm_context_cache([(2, 'other'), (3, 'another')])
+        self.assertEqual(len(self.cached), 3)
+
+        # The problems made for the other students use the cached results.
+        with patch('capa.safe_exec.safe_exec.codejail_safe_exec') as mock_exec:
+            for seed, anonymous_student_id in [(2, 'other'), (3, 'another')]:
+                self.capa_system.anonymous_student_id = anonymous_student_id
+                problem = new_loncapa_problem(self.xml, capa_system=self.capa_system, seed=seed)
+                self.assertEqual(problem.context['x'], random.Random(seed).randint(0, 999))
+                self.assertEqual(problem.context['name'], anonymous_student_id)
+        self.assertFalse(mock_exec.called)
+
+    def test_without_cache(self):
+        self.capa_system.cache = None
+        problem = new_loncapa_problem(self.xml, capa_system=self.capa_system, seed=1)
+        with patch.object(capa_problem, 'safe_exec_many') as mock_safe_exec_many:
+            problem.warm_context_cache([(2, 'other')])
+        self.assertFalse(mock_safe_exec_many.called)
@@ -299,7 +299,7 @@ class CapaMixin(CapaFields):
         capa_system = LoncapaSystem(
             ajax_url=self.runtime.ajax_url,
             anonymous_student_id=self.runtime.anonymous_student_id,
-            cache=self.runtime.cache,
+            cache=self.runtime.safe_exec_cache,
             can_execute_unsafe_code=self.runtime.can_execute_unsafe_code,
             get_python_lib_zip=self.runtime.get_python_lib_zip,
             DEBUG=self.runtime.DEBUG,
@@ -4,7 +4,9 @@ from gridfs.errors import NoFile
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
 
+import hashlib
 import logging
+from multiprocessing.pool import ThreadPool
 
 from .content import StaticContent, ContentStore, StaticContentStream
 from xmodule.exceptions import NotFoundError
@@ -16,6 +18,11 @@ from opaque_keys.edx.keys import AssetKey
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 
+# Number of assets `export_all_for_course` copies at the same time
+EXPORT_WORKERS = 4
+# Number of bytes read at a time when comparing an exported file to its asset
+EXPORT_COMPARE_CHUNK_SIZE = 256 * 1024
+
 
 class MongoContentStore(ContentStore):
 
@@ -107,7 +114,8 @@ class MongoContentStore(ContentStore):
                     location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False)
+                    length=fp.length, locked=getattr(fp, 'locked', False),
+                    content_digest=getattr(fp, 'md5', None)
                 )
             else:
                 with self.fs.get(content_id) as fp:
@@ -121,7 +129,8 @@ class MongoContentStore(ContentStore):
                         location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
-                        length=fp.length, locked=getattr(fp, 'locked', False)
+                        length=fp.length, locked=getattr(fp, 'locked', False),
+                        content_digest=getattr(fp, 'md5', None)
                     )
         except NoFile:
             if throw_on_not_found:
@@ -130,38 +139,46 @@ class MongoContentStore(ContentStore):
                 return None
 
     def export(self, location, output_directory):
-        content = self.find(location)
-
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
-        if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
-
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
-        disk_fs = OSFS(output_directory)
-
-        with disk_fs.open(export_name, 'wb') as asset_file:
-            asset_file.write(content.data)
-
-    def export_all_for_course(self, course_key, output_directory, assets_policy_file):
+        content = self.find(location, as_stream=True)
+        try:
+            export_directory, export_name = _asset_export_path(output_directory, content.name, content.import_path)
+            try:
+                os.makedirs(export_directory)
+            except OSError:
+                # assets are exported concurrently, so another one may have just created the directory
+                if not os.path.isdir(export_directory):
+                    raise
+
+            disk_fs = OSFS(export_directory)
+
+            with disk_fs.open(export_name, 'wb') as asset_file:
+                for chunk in content.stream_data():
+                    asset_file.write(chunk)
+        finally:
+            content.close()
+
+    def export_all_for_course(self, course_key, output_directory, assets_policy_file, num_workers=EXPORT_WORKERS):
         """
         Export all of this course's assets to the output_directory. Export all of the assets'
         attributes to the policy file.
 
+        Assets whose file in output_directory already has the same content, for instance because
+        it was written by a previous export to the same directory, are not copied again.
+
         Args:
             course_key (CourseKey): the :class:`CourseKey` identifying the course
             output_directory: the directory under which to put all the asset files
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
+            num_workers (int): the number of assets to copy at the same time
         """
         policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
-        for asset in assets:
+        def export_asset(asset_key):
+            """
+            Export the asset identified by asset_key to output_directory.
+            """
             # TODO: On 6/19/14, I had to put a try/except around this
             # to export a course. The course failed on JSON files in
             # the /static/ directory placed in it with an import.
@@ -170,7 +187,23 @@ class MongoContentStore(ContentStore):
             #
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
+            self.export(asset_key, output_directory)
+
+        changed_asset_keys = [
+            asset['asset_key'] for asset in assets if not _asset_exported(asset, output_directory)
+        ]
+        if num_workers > 1 and len(changed_asset_keys) > 1:
+            pool = ThreadPool(min(num_workers, len(changed_asset_keys)))
+            try:
+                pool.map(export_asset, changed_asset_keys)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for asset_key in changed_asset_keys:
+                export_asset(asset_key)
+
+        for asset in assets:
             for attr, value in asset.iteritems():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
@@ -260,6 +293,15 @@ class MongoContentStore(ContentStore):
         """
         self.set_attrs(asset_key, {attr: value})
 
+    def set_thumbnail_location(self, asset_key, thumbnail_location):
+        """
+        Set the location of the thumbnail of the asset at asset_key, stored
+        the same way `save` stores it.
+
+        Raises NotFoundError if no such item exists
+        """
+        self.set_attr(asset_key, 'thumbnail_location', thumbnail_location.to_deprecated_list_repr())
+
     def get_attr(self, location, attr, default=None):
         """
         Get the value of attr set on location. If attr is unset, it returns default. Unlike set, this accessor
@@ -491,3 +533,37 @@ def query_for_course(course_key, category=None):
     else:
         dbkey['{}.run'.format(prefix)] = course_key.run
     return dbkey
+
+
+def _asset_export_path(output_directory, name, import_path):
+    """
+    Returns the directory and the name of the file an asset named `name` is exported to.
+    """
+    if import_path is not None:
+        output_directory = output_directory + '/' + os.path.dirname(import_path)
+    # Escape invalid char from filename.
+    return output_directory, escape_invalid_characters(name=name, invalid_char_list=['/', '\\'])
+
+
+def _asset_exported(asset, output_directory):
+    """
+    Whether the file `asset` is exported to already has its content, going by its length and md5.
+
+    Args:
+        asset (dict): an asset, as returned by `get_all_content_for_course`
+        output_directory: the directory under which the asset files are exported
+    """
+    if any(asset.get(attr) is None for attr in ('displayname', 'md5', 'length')):
+        return False
+    export_directory, export_name = _asset_export_path(
+        output_directory, asset['displayname'], asset.get('import_path')
+    )
+    filepath = os.path.join(export_directory, export_name)
+    if not os.path.isfile(filepath) or os.path.getsize(filepath) != asset['length']:
+        return False
+
+    digest = hashlib.md5()
+    with open(filepath, 'rb') as exported_file:
+        for chunk in iter(lambda: exported_file.read(EXPORT_COMPARE_CHUNK_SIZE), ''):
+            digest.update(chunk)
+    return digest.hexdigest() == asset['md5']
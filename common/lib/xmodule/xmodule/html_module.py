@@ -84,6 +84,14 @@ class HtmlBlock(object):
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
         return self.data
 
+    @property
+    def student_view_cacheable(self):
+        """
+        Whether the student view is the same for every user, so may be cached
+        (see xblock_django.fragment_cache).
+        """
+        return "%%USER_ID%%" not in self.data
+
 
 class HtmlModuleMixin(HtmlBlock, XModule):
     """
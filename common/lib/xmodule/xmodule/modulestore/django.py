@@ -158,6 +158,11 @@ def create_modulestore_instance(
 
     if issubclass(class_, MixedModuleStore):
         _options['create_modulestore_instance'] = create_modulestore_instance
+        # Courses are routed to their store through the 'course_routing' cache, when one is configured
+        try:
+            _options['routing_cache'] = caches['course_routing']
+        except InvalidCacheBackendError:
+            pass
 
     if issubclass(class_, BranchSettingMixin):
         _options['branch_setting_func'] = _get_modulestore_branch_setting
@@ -5,6 +5,7 @@ In this way, courses can be served up both - say - XMLModuleStore or MongoModule
 
 """
 
+import hashlib
 import logging
 from contextlib import contextmanager
 import itertools
@@ -99,6 +100,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
     """
     ModuleStore knows how to route requests to the right persistence ms
     """
+    # Seconds the routing cache remembers which store has a course, and that no store has it
+    ROUTING_CACHE_TIMEOUT = 60 * 60 * 24
+    NEGATIVE_ROUTING_CACHE_TIMEOUT = 60
+
     def __init__(
             self,
             contentstore,
@@ -109,11 +114,15 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             user_service=None,
             create_modulestore_instance=None,
             signal_handler=None,
+            routing_cache=None,
             **kwargs
     ):
         """
         Initialize a MixedModuleStore. Here we look into our passed in kwargs which should be a
         collection of other modulestore configuration information
+
+        :param routing_cache: an optional django cache shared between processes, remembering which
+            store has each course (or that none does) so that routing a course does not query the stores
         """
         super(MixedModuleStore, self).__init__(contentstore, **kwargs)
 
@@ -122,6 +131,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
 
         self.modulestores = []
         self.mappings = {}
+        self.routing_cache = routing_cache
+        self._modulestores_by_name = {}
+        self._modulestore_names = {}
 
         for course_id, store_name in mappings.iteritems():
             try:
@@ -159,6 +171,13 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 if store_name == key:
                     self.mappings[course_key] = store
             self.modulestores.append(store)
+            self._modulestores_by_name[key] = store
+            self._modulestore_names[store] = key
+
+        # Routes are cached for this list of stores only, since the same course key may be in several of them
+        self._routing_cache_prefix = u'mixed_modulestore.routing.{}'.format(
+            hashlib.md5(u'|'.join(store_settings['NAME'] for store_settings in stores).encode('utf-8')).hexdigest()
+        )
 
     def _clean_locator_for_mapping(self, locator):
         """
@@ -173,10 +192,38 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             locator = locator.replace(branch=None)
         return locator
 
+    def _routing_cache_key(self, locator):
+        """
+        Returns the key of the routing cache entry of the (cleaned) locator.
+        """
+        return u'{}.{}'.format(self._routing_cache_prefix, unicode(locator))
+
+    def _cache_route(self, locator, store):
+        """
+        Remember in the routing cache that `store` has the course or library at `locator`,
+        or that none of the stores has it if `store` is None.
+        """
+        if self.routing_cache is None:
+            return
+        if store is None:
+            self.routing_cache.set(self._routing_cache_key(locator), '', self.NEGATIVE_ROUTING_CACHE_TIMEOUT)
+        else:
+            self.routing_cache.set(
+                self._routing_cache_key(locator), self._modulestore_names[store], self.ROUTING_CACHE_TIMEOUT
+            )
+
+    def _forget_route(self, locator):
+        """
+        Forget in the routing cache which store has the course or library at `locator`,
+        so it is looked up again next time.
+        """
+        if self.routing_cache is not None:
+            self.routing_cache.delete(self._routing_cache_key(self._clean_locator_for_mapping(locator)))
+
     def _get_modulestore_for_courselike(self, locator=None):
         """
         For a given locator, look in the mapping table and see if it has been pinned
-        to a particular modulestore
+        to a particular modulestore, then in the routing cache
 
         If locator is None, returns the first (ordered) store as the default
         """
@@ -185,15 +232,27 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             mapping = self.mappings.get(locator, None)
             if mapping is not None:
                 return mapping
+
+            store_name = self.routing_cache.get(self._routing_cache_key(locator)) if self.routing_cache else None
+            if store_name is not None:
+                store = self._modulestores_by_name.get(store_name)
+                if store is not None:
+                    self.mappings[locator] = store
+                    return store
+                elif store_name == '':
+                    # none of the stores has it
+                    return self.default_modulestore
+
+            if isinstance(locator, LibraryLocator):
+                has_locator = lambda store: hasattr(store, 'has_library') and store.has_library(locator)
             else:
-                if isinstance(locator, LibraryLocator):
-                    has_locator = lambda store: hasattr(store, 'has_library') and store.has_library(locator)
-                else:
-                    has_locator = lambda store: store.has_course(locator)
-                for store in self.modulestores:
-                    if has_locator(store):
-                        self.mappings[locator] = store
-                        return store
+                has_locator = lambda store: store.has_course(locator)
+            for store in self.modulestores:
+                if has_locator(store):
+                    self.mappings[locator] = store
+                    self._cache_route(locator, store)
+                    return store
+            self._cache_route(locator, None)
 
         # return the default store
         return self.default_modulestore
@@ -377,7 +436,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         """
         assert isinstance(course_key, CourseKey)
         store = self._get_modulestore_for_courselike(course_key)
-        return store.delete_course(course_key, user_id)
+        try:
+            return store.delete_course(course_key, user_id)
+        finally:
+            self._forget_route(course_key)
 
     @contract(asset_metadata='AssetMetadata', user_id='int|long', import_only=bool)
     def save_asset_metadata(self, asset_metadata, user_id, import_only=False):
@@ -604,6 +666,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
 
         # add new course to the mapping
         self.mappings[course_key] = store
+        self._cache_route(course_key, store)
 
         return course
 
@@ -632,6 +695,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
 
         # add new library to the mapping
         self.mappings[lib_key] = store
+        self._cache_route(lib_key, store)
 
         return library
 
@@ -651,20 +715,24 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # for a temporary period of time, we may want to hardcode dest_modulestore as split if there's a split
         # to have only course re-runs go to split. This code, however, uses the config'd priority
         dest_modulestore = self._get_modulestore_for_courselike(dest_course_id)
-        if source_modulestore == dest_modulestore:
-            return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+        try:
+            if source_modulestore == dest_modulestore:
+                return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
 
-        if dest_modulestore.get_modulestore_type() == ModuleStoreEnum.Type.split:
-            split_migrator = SplitMigrator(dest_modulestore, source_modulestore)
-            split_migrator.migrate_mongo_course(source_course_id, user_id, dest_course_id.org,
-                                                dest_course_id.course, dest_course_id.run, fields, **kwargs)
+            if dest_modulestore.get_modulestore_type() == ModuleStoreEnum.Type.split:
+                split_migrator = SplitMigrator(dest_modulestore, source_modulestore)
+                split_migrator.migrate_mongo_course(source_course_id, user_id, dest_course_id.org,
+                                                    dest_course_id.course, dest_course_id.run, fields, **kwargs)
 
-            # the super handles assets and any other necessities
-            super(MixedModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
-        else:
-            raise NotImplementedError("No code for cloning from {} to {}".format(
-                source_modulestore, dest_modulestore
-            ))
+                # the super handles assets and any other necessities
+                super(MixedModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            else:
+                raise NotImplementedError("No code for cloning from {} to {}".format(
+                    source_modulestore, dest_modulestore
+                ))
+        finally:
+            # the destination course exists now, even if it was routed to no store before
+            self._forget_route(dest_course_id)
 
     @strip_key
     def create_item(self, user_id, course_key, block_type, block_id=None, fields=None, **kwargs):
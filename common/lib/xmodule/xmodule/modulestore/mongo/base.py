@@ -15,7 +15,7 @@ structure:
 import pymongo
 import sys
 import logging
-import copy
+import collections
 import re
 from uuid import uuid4
 
@@ -526,6 +526,102 @@ class ParentLocationCache(dict):
             del self[key]
 
 
+class MetadataInheritanceTree(collections.Mapping):
+    """
+    The inherited metadata and parent of every block in a course, as computed by
+    MongoModuleStore._compute_metadata_inheritance_tree.
+
+    Only each container's children and own inheritable metadata are stored (and pickled);
+    the parents and the metadata each block inherits are resolved from those on first use
+    rather than copied out for every block. Maps each block's url to a new dict of the
+    metadata it inherits, plus a 'parent' entry of {branch: parent url}.
+    """
+    def __init__(self, branch, root, containers):
+        """
+        branch: the branch setting the tree was computed for
+        root: the url of the course
+        containers: a dict mapping the url of each container to a tuple of its children's
+            urls and a dict of its own inheritable metadata
+        """
+        self.branch = branch
+        self.root = root
+        self.containers = containers
+        self._parents = None
+        self._inherited = None
+
+    def __getstate__(self):
+        return {
+            'branch': self.branch,
+            'root': self.root,
+            'containers': self.containers,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _resolve(self):
+        """
+        Walk down from the root, finding the parent of each block and the metadata
+        which each container passes on to its children.
+        """
+        parents = {}
+        inherited = {}
+
+        def _walk(url):
+            """
+            Resolve the children of the container at url
+            """
+            children, __ = self.containers[url]
+            for child in children:
+                parents[child] = url
+                if child in self.containers and child not in inherited:
+                    inherited[child] = dict(inherited[url], **self.containers[child][1])
+                    _walk(child)
+
+        if self.root in self.containers:
+            inherited[self.root] = dict(self.containers[self.root][1])
+            _walk(self.root)
+        self._parents = parents
+        self._inherited = inherited
+
+    @property
+    def parents(self):
+        """
+        A dict mapping the url of each block to the url of its parent
+        """
+        if self._parents is None:
+            self._resolve()
+        return self._parents
+
+    def __getitem__(self, url):
+        parent = self.parents[url]
+        # containers pass their own metadata on; everything else inherits its parent's
+        metadata = dict(self._inherited.get(url, self._inherited[parent]))
+        # WARNING: 'parent' is not part of inherited metadata, but we're piggybacking on
+        # this lookup to provide the block's parent, as a performance optimization.
+        metadata['parent'] = {self.branch: parent}
+        return metadata
+
+    def __iter__(self):
+        return iter(self.parents)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def replace_container(self, url, children, metadata):
+        """
+        Return a new tree in which the container at url has the given children and own
+        inheritable metadata, or is removed if children is None. The other containers
+        are shared with this tree.
+        """
+        containers = dict(self.containers)
+        if children is None:
+            containers.pop(url, None)
+        else:
+            containers[url] = (children, metadata)
+        return MetadataInheritanceTree(self.branch, self.root, containers)
+
+
 class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, MongoBulkOpsMixin):
     """
     A Mongodb backed ModuleStore
@@ -676,18 +772,24 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             return ParentLocationCache()
 
-    def _compute_metadata_inheritance_tree(self, course_id):
-        '''
-        Find all inheritable fields from all xblocks in the course which may define inheritable data
-        '''
+    def _find_inheritance_containers(self, course_id, usage_key=None):
+        """
+        Find the children and inheritable metadata of all xblocks in the course which may
+        define inheritable data (or of just the one at usage_key).
+
+        Returns the url of the course (if found) and a dict mapping each container's url
+        to a tuple of its children's urls and its own inheritable metadata.
+        """
         # get all collections in the course, this query should not return any leaf nodes
-        course_id = self.fill_in_run(course_id)
         query = SON([
             ('_id.tag', 'i4x'),
             ('_id.org', course_id.org),
             ('_id.course', course_id.course),
             ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
         ])
+        if usage_key is not None:
+            query['_id.category'] = usage_key.category
+            query['_id.name'] = usage_key.name
         # if we're only dealing in the published branch, then only get published containers
         if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only:
             query['_id.revision'] = None
@@ -704,65 +806,62 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
-        results_by_url = {}
+        containers = {}
         root = None
 
         # now go through the results and order them by the location url
         for result in resultset:
             # manually pick it apart b/c the db has tag and we want as_published revision regardless
             location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
+            if location.category not in BLOCK_TYPES_WITH_CHILDREN:
+                # leaves (only found when asking for one block) don't pass anything on
+                continue
 
             location_url = unicode(location)
-            if location_url in results_by_url:
+            children = result.get('definition', {}).get('children', [])
+            if location_url in containers:
                 # found either draft or live to complement the other revision
                 # FIXME this is wrong. If the child was moved in draft from one parent to the other, it will
                 # show up under both in this logic: https://openedx.atlassian.net/browse/TNL-1075
-                existing_children = results_by_url[location_url].get('definition', {}).get('children', [])
-                additional_children = result.get('definition', {}).get('children', [])
-                total_children = existing_children + additional_children
+                existing_children, metadata = containers[location_url]
                 # use set to get rid of duplicates. We don't care about order; so, it shouldn't matter.
-                results_by_url[location_url].setdefault('definition', {})['children'] = set(total_children)
+                containers[location_url] = (tuple(set(existing_children + tuple(children))), metadata)
             else:
-                results_by_url[location_url] = result
+                containers[location_url] = (tuple(children), result.get('metadata', {}))
             if location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
-
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+        return root, containers
 
-        if root is not None:
-            _compute_inherited_metadata(root)
+    def _compute_metadata_inheritance_tree(self, course_id):
+        '''
+        Find all inheritable fields from all xblocks in the course which may define inheritable data
+        '''
+        course_id = self.fill_in_run(course_id)
+        root, containers = self._find_inheritance_containers(course_id)
+        return MetadataInheritanceTree(self.get_branch_setting(), root, containers)
 
-        return metadata_to_inherit
+    def _update_metadata_inheritance_tree(self, course_id, tree, usage_key):
+        """
+        Return a copy of tree with the children and inheritable metadata of the block at
+        usage_key reread from the db.
+        """
+        url = unicode(as_published(usage_key))
+        __, containers = self._find_inheritance_containers(course_id, usage_key)
+        if url not in containers and url not in tree.containers:
+            # leaves don't change what anything inherits
+            return tree
+        return tree.replace_container(url, *containers.get(url, (None, None)))
 
-    def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
+    def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False, usage_key=None):
         '''
         Compute the metadata inheritance for the course.
+
+        On a force_refresh after a change to the block at usage_key, a tree from the caches is
+        updated with just that block rather than recomputed. The updated tree is only kept in
+        the request cache: the tree in the caching subsystem is removed instead of being
+        replaced, since other processes may be updating it at the same time, so the next
+        process which needs it computes it in full.
         '''
         tree = {}
 
@@ -780,6 +879,20 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                     'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
                     OK in localdev and testing environment. Not OK in production.'
                 )
+        elif usage_key is not None:
+            cached_tree = None
+            if self.request_cache is not None:
+                cached_tree = self.request_cache.data.get('metadata_inheritance', {}).get(unicode(course_id))
+            if cached_tree is None and self.metadata_inheritance_cache_subsystem is not None:
+                cached_tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id))
+            if (
+                    isinstance(cached_tree, MetadataInheritanceTree) and
+                    cached_tree.branch == self.get_branch_setting() and
+                    cached_tree.root is not None
+            ):
+                tree = self._update_metadata_inheritance_tree(course_id, cached_tree, usage_key)
+                if tree and self.metadata_inheritance_cache_subsystem is not None:
+                    self.metadata_inheritance_cache_subsystem.delete(unicode(course_id))
 
         if not tree:
             # if not in subsystem, or we are on force refresh, then we have to compute
@@ -801,18 +914,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, usage_key=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the usage_key of the only block whose children or inheritable metadata changed,
+        it rereads just that block into the cached tree when it can.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
             # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = self._get_cached_metadata_inheritance_tree(
+                course_id, force_refresh=True, usage_key=usage_key
+            )
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -943,7 +1061,8 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             system = using_descriptor_system
             system.module_data.update(data_cache)
-            system.cached_metadata.update(cached_metadata)
+            if cached_metadata:
+                system.cached_metadata = cached_metadata
 
         return system.load_item(location, for_parent=for_parent)
 
@@ -1481,7 +1600,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, xblock.scope_ids.usage_id
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
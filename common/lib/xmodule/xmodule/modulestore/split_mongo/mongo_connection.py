@@ -8,6 +8,8 @@ import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +17,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -222,28 +225,114 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class StructureLRUCache(object):
+    """
+    A per-process, least recently used cache of deserialized course structures.
+
+    Entries are sized by the length of their pickled data, and the least
+    recently used ones are evicted to keep the total within the memory budget
+    given when adding an entry.  Since structures are immutable and keyed by
+    their version id, entries never need to be invalidated.  Callers share the
+    cached structures, so they must not modify them (see
+    `SplitMongoModuleStore.version_structure`).
+    """
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the structure cached for `key`, or None, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            return entry[0]
+
+    def set(self, key, structure, size, budget):
+        """
+        Cache `structure`, whose pickled data is `size` bytes, evicting the
+        least recently used entries to keep within `budget` bytes.
+
+        Returns the number of entries evicted.
+        """
+        if size > budget:
+            return 0
+
+        evictions = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            while self._entries and self._size + size > budget:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                evictions += 1
+            self._entries[key] = (structure, size)
+            self._size += size
+        return evictions
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+STRUCTURE_LRU_CACHE = StructureLRUCache()
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Deserialized structures are also kept in the per-process
+    STRUCTURE_LRU_CACHE, up to COURSE_STRUCTURE_CACHE_MEMORY_BUDGET bytes of
+    pickled data, so that hot courses don't pay to decompress and unpickle
+    them on every request.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.memory_budget = 0
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+            else:
+                self.memory_budget = getattr(settings, 'COURSE_STRUCTURE_CACHE_MEMORY_BUDGET', 0)
+
+    def _remember(self, key, structure, size, tagger):
+        """Keep `structure` in the per-process cache, if it has a memory budget."""
+        if self.memory_budget:
+            evictions = STRUCTURE_LRU_CACHE.set(key, structure, size, self.memory_budget)
+            if evictions:
+                tagger.measure('memory_evictions', evictions)
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """
+        Return the struct data from the per-process cache, or else pull the
+        compressed, pickled struct data from cache and deserialize.
+        """
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.memory_budget:
+                structure = STRUCTURE_LRU_CACHE.get(key)
+                tagger.tag(from_memory=str(structure is not None).lower())
+                if structure is not None:
+                    tagger.tag(from_cache='true')
+                    return structure
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -257,7 +346,9 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+            self._remember(key, structure, len(pickled_data), tagger)
+            return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
@@ -275,6 +366,8 @@ class CourseStructureCache(object):
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
 
+            self._remember(key, structure, len(pickled_data), tagger)
+
 
 class MongoConnection(object):
     """
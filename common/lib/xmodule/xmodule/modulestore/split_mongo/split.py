@@ -57,6 +57,7 @@ import copy
 import datetime
 import hashlib
 import logging
+import threading
 from contracts import contract, new_contract
 from importlib import import_module
 from mongodb_proxy import autoretry_read
@@ -83,7 +84,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from types import NoneType
 from xmodule.assetstore import AssetMetadata
 
@@ -111,12 +112,78 @@ log = logging.getLogger(__name__)
 # When blacklists are this, all children should be excluded
 EXCLUDE_ALL = '*'
 
+# Number of structures whose StructureIndex is kept, see `SplitMongoModuleStore._get_structure_index`
+STRUCTURE_INDEX_CACHE_SIZE = 20
+
 
 new_contract('BlockUsageLocator', BlockUsageLocator)
 new_contract('BlockKey', BlockKey)
 new_contract('XBlock', XBlock)
 
 
+class StructureIndex(object):
+    """
+    Index of the blocks of a structure by type and id, of their parents, and of which of them
+    have a path to a root.
+    """
+    ROOT_BLOCK_TYPES = ('course', 'library')
+
+    def __init__(self, structure):
+        self._children = {}
+        self._parents = defaultdict(list)
+        self._blocks_by_type = defaultdict(list)
+        self._blocks_by_id = defaultdict(list)
+        for block_key, block_data in structure['blocks'].iteritems():
+            self._blocks_by_type[block_key.type].append(block_key)
+            self._blocks_by_id[block_key.id].append(block_key)
+            children = self._children[block_key] = [BlockKey(*child) for child in block_data.fields.get('children', [])]
+            for child in children:
+                parents = self._parents[child]
+                # a block listing the same child twice is still one of its parents
+                if not parents or parents[-1] != block_key:
+                    parents.append(block_key)
+        self._blocks_with_path_to_root = None
+
+    def get_blocks_of_type(self, block_type):
+        """
+        Returns the BlockKeys of the blocks of type block_type, in the order of the blocks of the structure.
+        """
+        return list(self._blocks_by_type.get(block_type, []))
+
+    def get_blocks_with_id(self, block_id):
+        """
+        Returns the BlockKeys of the blocks whose id is block_id, in the order of the blocks of the structure.
+        """
+        return list(self._blocks_by_id.get(block_id, []))
+
+    def get_parents(self, block_key):
+        """
+        Returns the BlockKeys of the parents of block_key, in the order of the blocks of the structure.
+        """
+        return list(self._parents.get(block_key, []))
+
+    def has_path_to_root(self, block_key):
+        """
+        Whether block_key is a root, that is a course or library without parents, or a descendant of one.
+        """
+        if self._blocks_with_path_to_root is None:
+            roots = [
+                root for root in self._children
+                if root.type in self.ROOT_BLOCK_TYPES and root not in self._parents
+            ]
+            reached = set(roots)
+            while roots:
+                for child in self._children.get(roots.pop(), []):
+                    if child not in reached:
+                        reached.add(child)
+                        roots.append(child)
+            self._blocks_with_path_to_root = reached
+
+        if block_key in self._blocks_with_path_to_root:
+            return True
+        return block_key.type in self.ROOT_BLOCK_TYPES and block_key not in self._parents
+
+
 class SplitBulkWriteRecord(BulkOpsRecord):
     def __init__(self):
         super(SplitBulkWriteRecord, self).__init__()
@@ -430,8 +497,10 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if len(ids):
             # Query the db for the definitions.
             defs_from_db = self.db_connection.get_definitions(list(ids), course_key)
-            # Add the retrieved definitions to the cache.
-            bulk_write_record.definitions.update({d.get('_id'): d for d in defs_from_db})
+            if bulk_write_record.active:
+                # Add the retrieved definitions to the cache, noting that they don't need to be saved.
+                bulk_write_record.definitions.update({d.get('_id'): d for d in defs_from_db})
+                bulk_write_record.definitions_in_db.update(d.get('_id') for d in defs_from_db)
             definitions.extend(defs_from_db)
         return definitions
 
@@ -675,6 +744,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self.signal_handler = signal_handler
 
+        self._structure_indexes = OrderedDict()
+        self._structure_indexes_lock = threading.Lock()
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -736,12 +808,17 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 definitions = {definition['_id']: definition
                                for definition in descendent_definitions}
 
-                for block in new_module_data.itervalues():
+                for block_key, block in new_module_data.items():
                     if block.definition in definitions:
                         definition = definitions[block.definition]
+                        # The structure's blocks may be shared through the course structure
+                        # cache, so merge the definition's fields into a copy of the block.
+                        block = copy.copy(block)
+                        block.fields = dict(block.fields)
                         # convert_fields gets done later in the runtime's xblock_from_json
                         block.fields.update(definition.get('fields'))
                         block.definition_loaded = True
+                        new_module_data[block_key] = block
 
             system.module_data.update(new_module_data)
             return system.module_data
@@ -1085,33 +1162,51 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             return []
 
         course = self._lookup_course(course_locator)
-        items = []
         qualifiers = qualifiers.copy() if qualifiers else {}  # copy the qualifiers (destructively manipulated here)
 
-        def _block_matches_all(block_data):
+        def _blocks_matching_all(block_keys):
             """
-            Check that the block matches all the criteria
+            Return the keys of the blocks which match all the criteria
             """
+            blocks = course.structure['blocks']
             # do the checks which don't require loading any additional data
-            if (  # pylint: disable=bad-continuation
-                self._block_matches(block_data, qualifiers) and
-                self._block_matches(block_data.fields, settings)
-            ):
-                if content:
-                    definition_block = self.get_definition(course_locator, block_data.definition)
-                    return self._block_matches(definition_block['fields'], content)
-                else:
-                    return True
+            block_keys = [
+                block_key for block_key in block_keys
+                if (  # pylint: disable=bad-continuation
+                    self._block_matches(blocks[block_key], qualifiers) and
+                    self._block_matches(blocks[block_key].fields, settings)
+                )
+            ]
+            if content and block_keys:
+                definitions = {
+                    definition['_id']: definition
+                    for definition in self.get_definitions(
+                        course_locator, [blocks[block_key].definition for block_key in block_keys]
+                    )
+                }
+                block_keys = [
+                    block_key for block_key in block_keys
+                    if blocks[block_key].definition in definitions and
+                    self._block_matches(definitions[blocks[block_key].definition]['fields'], content)
+                ]
+            return block_keys
+
+        def _candidates(attribute, value, lookup):
+            """
+            Return the keys of the blocks which may match, using the structure index when the qualifier
+            on attribute is a plain value
+            """
+            # indexing the structure being edited costs more than scanning it
+            if not isinstance(value, basestring) or not self._is_structure_saved(course):
+                return [block_key for block_key in course.structure['blocks'] if getattr(block_key, attribute) == value]
+            return lookup(self._get_structure_index(course), value)
 
         if settings is None:
             settings = {}
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
-            block_ids = []
-            for block_id, block in course.structure['blocks'].iteritems():
-                if block_name == block_id.id and _block_matches_all(block):
-                    block_ids.append(block_id)
+            block_ids = _blocks_matching_all(_candidates('id', block_name, StructureIndex.get_blocks_with_id))
 
             return self._load_items(course, block_ids, **kwargs)
 
@@ -1121,9 +1216,13 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # don't expect caller to know that children are in fields
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
-                items.append(block_id)
+
+        block_type = qualifiers.get('block_type')
+        if isinstance(block_type, basestring):
+            # the block_type qualifier is also checked on the candidates, which is cheap
+            items = _blocks_matching_all(_candidates('type', block_type, StructureIndex.get_blocks_of_type))
+        else:
+            items = _blocks_matching_all(course.structure['blocks'].keys())
 
         if len(items) > 0:
             return self._load_items(course, items, depth=0, **kwargs)
@@ -1140,12 +1239,40 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         :return Bool: whether or not component has path to the root
         """
 
-        xblock_parents = self._get_parents_from_structure(block_key, course.structure)
-        if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
-            # Found, xblock has the path to the root
-            return True
+        return self._get_structure_index(course).has_path_to_root(block_key)
+
+    def _is_structure_saved(self, course):
+        """
+        Whether the structure of course (a CourseEnvelope) is saved, rather than being edited in a
+        bulk operation.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        return not bulk_write_record.active or course.structure['_id'] in bulk_write_record.structures_in_db
+
+    def _get_structure_index(self, course):
+        """
+        Returns the StructureIndex of the structure of course (a CourseEnvelope).
+
+        Structures never change once saved, so the indexes of the STRUCTURE_INDEX_CACHE_SIZE most
+        recently used ones are kept by version. The structure being edited in a bulk operation
+        isn't saved yet, so its index is built again every time.
+        """
+        structure = course.structure
+        if not self._is_structure_saved(course):
+            return StructureIndex(structure)
+
+        with self._structure_indexes_lock:
+            structure_index = self._structure_indexes.pop(structure['_id'], None)
+            if structure_index is not None:
+                self._structure_indexes[structure['_id']] = structure_index
+                return structure_index
 
-        return any(self.has_path_to_root(xblock_parent, course) for xblock_parent in xblock_parents)
+        structure_index = StructureIndex(structure)
+        with self._structure_indexes_lock:
+            self._structure_indexes[structure['_id']] = structure_index
+            while len(self._structure_indexes) > STRUCTURE_INDEX_CACHE_SIZE:
+                self._structure_indexes.popitem(last=False)
+        return structure_index
 
     def get_parent_location(self, locator, **kwargs):
         """
@@ -1160,14 +1287,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        structure_index = self._get_structure_index(course)
+        all_parent_ids = structure_index.get_parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if structure_index.has_path_to_root(valid_parent)
         ]
 
         if len(parent_ids) == 0:
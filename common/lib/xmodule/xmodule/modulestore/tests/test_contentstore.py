@@ -16,6 +16,7 @@ from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from mock import patch
 from __builtin__ import delattr
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
@@ -146,6 +147,27 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_incremental(self, deprecated):
+        """
+        Test that exporting to a previous export only copies the assets which changed
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        self.addCleanup(shutil.rmtree, root_dir)
+        self.contentstore.export_all_for_course(self.course1_key, root_dir, path.Path(root_dir / "policy.json"))
+
+        changed_file = self.course1_files[0]
+        with open(root_dir / changed_file, 'wb') as f:
+            f.write('changed since the last export')
+        with patch.object(self.contentstore, 'export', wraps=self.contentstore.export) as mock_export:
+            self.contentstore.export_all_for_course(self.course1_key, root_dir, path.Path(root_dir / "policy.json"))
+
+        mock_export.assert_called_once_with(self.course1_key.make_asset_key('asset', changed_file), root_dir)
+        with open(root_dir / changed_file, 'rb') as exported, \
+                open("{}/static/{}".format(DATA_DIR, changed_file), 'rb') as original:
+            self.assertEqual(exported.read(), original.read())
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
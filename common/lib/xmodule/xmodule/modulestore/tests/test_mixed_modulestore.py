@@ -15,6 +15,7 @@ from mock import patch, Mock, call
 # before importing the module
 # TODO remove this import and the configuration -- xmodule should not depend on django!
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 # This import breaks this test file when run separately. Needs to be fixed! (PLAT-449)
 from nose.plugins.attrib import attr
 import pymongo
@@ -352,6 +353,56 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             with self.assertRaises(DuplicateCourseError):
                 self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_routing_cache(self, default_ms):
+        """
+        Make sure courses are routed to their store through the routing cache
+        """
+        routing_cache = LocMemCache(uuid4().hex, {})
+
+        def create_store():
+            """Create a MixedModuleStore sharing `routing_cache`."""
+            store = MixedModuleStore(
+                None,
+                create_modulestore_instance=create_modulestore_instance,
+                mappings={},
+                routing_cache=routing_cache,
+                **self.options
+            )
+            self.addCleanup(store.close_all_connections)
+            return store
+
+        self.store = create_store()
+        with self.store.default_store(default_ms):
+            course_key = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id).id
+        missing_course_key = course_key.replace(run='missing')
+        # pylint: disable=protected-access
+        self.store._get_modulestore_for_courselike(missing_course_key)
+
+        def mock_has_course(store):
+            """Spy on the has_course calls of the stores of `store`."""
+            for modulestore in store.modulestores:
+                modulestore.has_course = Mock(wraps=modulestore.has_course)
+            return store
+
+        def has_course_called(store):
+            """Whether any of the stores of `store` was asked if it has a course."""
+            return any(modulestore.has_course.called for modulestore in store.modulestores)
+
+        # Another instance routes both courses without asking the stores
+        other_store = mock_has_course(create_store())
+        self.assertEqual(other_store._get_modulestore_for_courselike(course_key).get_modulestore_type(), default_ms)
+        self.assertEqual(
+            other_store._get_modulestore_for_courselike(missing_course_key), other_store.default_modulestore
+        )
+        self.assertFalse(has_course_called(other_store))
+
+        # Deleting the course forgets its route
+        other_store.delete_course(course_key, self.user_id)
+        new_store = mock_has_course(create_store())
+        new_store._get_modulestore_for_courselike(course_key)
+        self.assertTrue(has_course_called(new_store))
+
     # Draft:
     #    problem: One lookup to locate an item that exists
     #    fake: one w/ wildcard version
@@ -8,6 +8,7 @@ from nose.tools import assert_equals, assert_raises, \
     assert_not_equals, assert_false, assert_true, assert_greater, assert_is_instance, assert_is_none
 # pylint: enable=E0611
 from path import Path as path
+import pickle
 import pymongo
 import logging
 import shutil
@@ -27,6 +28,7 @@ from xmodule.tests import DATA_DIR
 from opaque_keys.edx.locations import Location
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.mongo import MongoKeyValueStore
+from xmodule.modulestore.mongo.base import MetadataInheritanceTree
 from xmodule.modulestore.draft import DraftModuleStore
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
 from opaque_keys.edx.locator import LibraryLocator, CourseLocator
@@ -39,9 +41,9 @@ from nose.tools import assert_in
 from xmodule.exceptions import NotFoundError
 from git.test.lib.asserts import assert_not_none
 from xmodule.x_module import XModuleMixin
-from xmodule.modulestore.mongo.base import as_draft
+from xmodule.modulestore.mongo.base import as_draft, as_published
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
-from xmodule.modulestore.tests.utils import LocationMixin, mock_tab_from_json
+from xmodule.modulestore.tests.utils import LocationMixin, MemoryCache, mock_tab_from_json
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -590,6 +592,36 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         self.assertTrue(path(root_dir / 'test_export/static/just_a_test.jpg').isfile())
         self.assertFalse(path(root_dir / 'test_export/static/images/course_image.jpg').isfile())
 
+    def test_export_incremental(self):
+        """
+        Test that exporting to a previous export only writes the blocks which changed
+        """
+        course = self.draft_store.create_course("TestX", "ExportTest", "1234_A1", self.dummy_user)
+        self.addCleanup(self.draft_store.delete_course, course.id, self.dummy_user)
+        changed_chapter = self.draft_store.create_child(self.dummy_user, course.location, 'chapter')
+        chapter = self.draft_store.create_child(self.dummy_user, course.location, 'chapter')
+        sequential = self.draft_store.create_child(self.dummy_user, chapter.location, 'sequential')
+
+        root_dir = path(mkdtemp())
+        self.addCleanup(shutil.rmtree, root_dir)
+        export_course_to_xml(self.draft_store, self.content_store, course.id, root_dir, 'test_export')
+        self.assertTrue(path(root_dir / '.test_export.export.json').isfile())
+
+        sequential_file = path(root_dir / 'test_export/sequential/{}.xml'.format(sequential.location.name))
+        sequential_file.write_text(u'<sequential kept="true"/>')
+        changed_chapter.display_name = u'Changed'
+        self.draft_store.update_item(changed_chapter, self.dummy_user)
+        export_course_to_xml(self.draft_store, self.content_store, course.id, root_dir, 'test_export')
+
+        # the unchanged sequential's file is kept, and the changed chapter's one is rewritten
+        self.assertEqual(sequential_file.text(), u'<sequential kept="true"/>')
+        self.assertIn(
+            'display_name="Changed"',
+            path(root_dir / 'test_export/chapter/{}.xml'.format(changed_chapter.location.name)).text()
+        )
+        chapter_xml = path(root_dir / 'test_export/chapter/{}.xml'.format(chapter.location.name)).text()
+        self.assertIn('url_name="{}"'.format(sequential.location.name), chapter_xml)
+
     def test_course_without_image(self):
         """
         Make sure we elegantly passover our code when there isn't a static
@@ -758,6 +790,36 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         # Clean up the data so we don't break other tests which apparently expect a particular state
         self.draft_store.delete_course(course.id, self.dummy_user)
 
+    def test_refresh_inheritance_tree_for_one_block(self):
+        """
+        Test that updating a block rereads just that block into the cached inheritance tree, and
+        drops the shared copy of the tree rather than overwriting it
+        """
+        course = self.draft_store.create_course("TestX", "InheritanceTest", "1234_A1", self.dummy_user)
+        self.addCleanup(self.draft_store.delete_course, course.id, self.dummy_user)
+        chapter = self.draft_store.create_child(self.dummy_user, course.location, 'chapter')
+        sequential = self.draft_store.create_child(self.dummy_user, chapter.location, 'sequential')
+        problem = self.draft_store.create_child(self.dummy_user, sequential.location, 'problem')
+
+        shared_cache = MemoryCache()
+        with patch.object(self.draft_store, 'metadata_inheritance_cache_subsystem', shared_cache):
+            self.draft_store.refresh_cached_metadata_inheritance_tree(course.id)
+            sequential = self.draft_store.get_item(sequential.location)
+            sequential.due = datetime(2015, 1, 1, tzinfo=UTC)
+            with patch.object(self.draft_store, '_compute_metadata_inheritance_tree') as mock_compute:
+                self.draft_store.update_item(sequential, self.dummy_user)
+            self.assertFalse(mock_compute.called)
+            self.assertIsNone(shared_cache.get(unicode(course.id)))
+
+            tree = self.draft_store._get_cached_metadata_inheritance_tree(course.id)  # pylint: disable=protected-access
+        self.assertEqual(
+            tree[unicode(as_published(problem.location))],
+            {
+                'due': sequential.fields['due'].to_json(sequential.due),
+                'parent': {ModuleStoreEnum.Branch.draft_preferred: unicode(sequential.location)},
+            }
+        )
+
     def test_make_course_usage_key(self):
         """Test that we get back the appropriate usage key for the root of a course key."""
         course_key = CourseLocator(org="edX", course="101", run="2015")
@@ -870,6 +932,57 @@ class TestMongoKeyValueStore(unittest.TestCase):
                 self.kvs.delete(KeyValueStore.Key(scope, None, None, 'foo'))
 
 
+class TestMetadataInheritanceTree(unittest.TestCase):
+    """
+    Tests for MetadataInheritanceTree.
+    """
+
+    def setUp(self):
+        super(TestMetadataInheritanceTree, self).setUp()
+        self.tree = MetadataInheritanceTree(ModuleStoreEnum.Branch.draft_preferred, 'course', {
+            'course': (('chapter', 'about'), {'graded': True, 'due': 'course_due'}),
+            'chapter': (('sequential',), {'due': 'chapter_due'}),
+            'sequential': (('problem',), {}),
+        })
+
+    def assert_inherits(self, tree, url, parent, metadata):
+        """
+        Assert that the block at url has the given parent and inherited metadata in tree
+        """
+        metadata['parent'] = {ModuleStoreEnum.Branch.draft_preferred: parent}
+        self.assertEqual(tree[url], metadata)
+
+    def test_lookup(self):
+        self.assertItemsEqual(self.tree.keys(), ['chapter', 'about', 'sequential', 'problem'])
+        self.assertNotIn('course', self.tree)
+        self.assert_inherits(self.tree, 'about', 'course', {'graded': True, 'due': 'course_due'})
+        self.assert_inherits(self.tree, 'chapter', 'course', {'graded': True, 'due': 'chapter_due'})
+        self.assert_inherits(self.tree, 'problem', 'sequential', {'graded': True, 'due': 'chapter_due'})
+
+        # lookups don't share their dicts
+        self.tree['problem']['due'] = 'changed'
+        self.assertEqual(self.tree['problem']['due'], 'chapter_due')
+
+    def test_replace_container(self):
+        tree = self.tree.replace_container('chapter', ('sequential', 'html'), {'graded': False})
+        self.assert_inherits(tree, 'problem', 'sequential', {'graded': False, 'due': 'course_due'})
+        self.assert_inherits(tree, 'html', 'chapter', {'graded': False, 'due': 'course_due'})
+        self.assert_inherits(self.tree, 'problem', 'sequential', {'graded': True, 'due': 'chapter_due'})
+
+        tree = self.tree.replace_container('sequential', None, None)
+        self.assert_inherits(tree, 'sequential', 'chapter', {'graded': True, 'due': 'chapter_due'})
+        self.assertNotIn('problem', tree)
+
+    def test_pickle(self):
+        self.tree.get('problem')
+        pickled = pickle.dumps(self.tree, pickle.HIGHEST_PROTOCOL)
+        self.assertEqual(pickled, pickle.dumps(
+            MetadataInheritanceTree(self.tree.branch, self.tree.root, self.tree.containers),
+            pickle.HIGHEST_PROTOCOL
+        ))
+        self.assertEqual(dict(pickle.loads(pickled)), dict(self.tree))
+
+
 def _build_requested_filter(requested_filter):
     """
     Returns requested filter_params string.
@@ -14,11 +14,12 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 from xmodule.course_module import CourseDescriptor
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.exceptions import (
     ItemNotFoundError, VersionConflictError,
     DuplicateItemError, DuplicateCourseError,
@@ -29,9 +30,10 @@ from ccx_keys.locator import CCXBlockUsageLocator
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
-from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
+from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore, StructureIndex
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_LRU_CACHE, StructureLRUCache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -938,8 +940,10 @@ class TestCourseStructureCache(SplitModuleTest):
 
         # make sure we clear the cache before every test...
         self.cache.clear()
+        STRUCTURE_LRU_CACHE.clear()
         # ... and after
         self.addCleanup(self.cache.clear)
+        self.addCleanup(STRUCTURE_LRU_CACHE.clear)
 
         # make a new course:
         self.user = random.getrandbits(32)
@@ -992,6 +996,40 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_CACHE_MEMORY_BUDGET=16 * 1024 * 1024)
+    def test_memory_cache(self):
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Even though the shared cache is a dummy cache, the structure is
+        # kept in memory by this process
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertIs(cached_structure, not_cached_structure)
+        self.assertEqual(len(STRUCTURE_LRU_CACHE), 1)
+
+    @override_settings(COURSE_STRUCTURE_CACHE_MEMORY_BUDGET=1)
+    def test_memory_cache_budget(self):
+        # A structure larger than the memory budget isn't kept in memory
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+        self.assertEqual(len(STRUCTURE_LRU_CACHE), 0)
+
+    def test_lru_eviction(self):
+        lru_cache = StructureLRUCache()
+        self.assertEqual(lru_cache.set('a', {'_id': 'a'}, 4, budget=10), 0)
+        self.assertEqual(lru_cache.set('b', {'_id': 'b'}, 4, budget=10), 0)
+        # Using 'a' makes 'b' the least recently used entry
+        self.assertEqual(lru_cache.get('a'), {'_id': 'a'})
+        self.assertEqual(lru_cache.set('c', {'_id': 'c'}, 4, budget=10), 1)
+
+        self.assertIsNone(lru_cache.get('b'))
+        self.assertEqual(lru_cache.get('a'), {'_id': 'a'})
+        self.assertEqual(lru_cache.get('c'), {'_id': 'c'})
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1001,6 +1039,50 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+class StructureIndexTest(unittest.TestCase):
+    """
+    Test the index of the blocks of a structure
+    """
+    def setUp(self):
+        super(StructureIndexTest, self).setUp()
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'chapter')
+        self.shared = BlockKey('html', 'shared')
+        self.orphan = BlockKey('vertical', 'orphan')
+        self.orphan_child = BlockKey('html', 'orphan_child')
+        blocks = {
+            self.course: [self.chapter],
+            self.chapter: [self.shared, self.shared],
+            self.orphan: [self.shared, self.orphan_child],
+            self.shared: [],
+            self.orphan_child: [],
+        }
+        self.structure_index = StructureIndex({
+            'blocks': {
+                block_key: BlockData(block_type=block_key.type, fields={'children': children})
+                for block_key, children in blocks.iteritems()
+            }
+        })
+
+    def test_get_parents(self):
+        self.assertEqual(self.structure_index.get_parents(self.course), [])
+        self.assertEqual(self.structure_index.get_parents(self.chapter), [self.course])
+        self.assertItemsEqual(self.structure_index.get_parents(self.shared), [self.chapter, self.orphan])
+        self.assertEqual(self.structure_index.get_parents(BlockKey('html', 'nosuchblock')), [])
+
+    def test_get_blocks(self):
+        self.assertItemsEqual(self.structure_index.get_blocks_of_type('html'), [self.shared, self.orphan_child])
+        self.assertEqual(self.structure_index.get_blocks_of_type('problem'), [])
+        self.assertEqual(self.structure_index.get_blocks_with_id('chapter'), [self.chapter])
+        self.assertEqual(self.structure_index.get_blocks_with_id('nosuchblock'), [])
+
+    def test_has_path_to_root(self):
+        for block_key in (self.course, self.chapter, self.shared):
+            self.assertTrue(self.structure_index.has_path_to_root(block_key))
+        for block_key in (self.orphan, self.orphan_child, BlockKey('html', 'nosuchblock')):
+            self.assertFalse(self.structure_index.has_path_to_root(block_key))
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
@@ -1208,6 +1290,22 @@ class SplitModuleItemTests(SplitModuleTest):
         self.assertEqual(len(matches), 1)
         matches = modulestore().get_items(locator, settings={'group_access': {'$exists': False}})
         self.assertEqual(len(matches), 6)
+        matches = modulestore().get_items(locator, qualifiers={'name': 'chapter1'})
+        self.assertEqual([match.location.block_id for match in matches], ['chapter1'])
+        matches = modulestore().get_items(locator, qualifiers={'category': {'$in': ['chapter', 'garbage']}})
+        self.assertEqual(len(matches), 3)
+
+        # the definitions of the blocks are loaded together to match their content
+        with patch.object(
+            modulestore(), 'get_definitions', wraps=modulestore().get_definitions
+        ) as mock_get_definitions:
+            matches = modulestore().get_items(
+                locator,
+                qualifiers={'category': 'chapter'},
+                content={'data': {'$exists': False}},
+            )
+        self.assertEqual(len(matches), 3)
+        self.assertEqual(mock_get_definitions.call_count, 1)
 
     def test_get_parents(self):
         '''
@@ -1415,6 +1513,23 @@ class TestItemCrud(SplitModuleTest):
         chapter = modulestore().get_item(chapter_locator)
         self.assertIn(problem_locator, version_agnostic(chapter.children))
 
+    def test_get_parent_location_bulk_operations(self):
+        """
+        Test get_parent_location while the structure is being edited in a bulk operation
+        """
+        user = random.getrandbits(32)
+        course_key = CourseLocator('test_org', 'test_parents', 'test_run')
+        with modulestore().bulk_operations(course_key):
+            new_course = modulestore().create_course('test_org', 'test_parents', 'test_run', user, BRANCH_NAME_DRAFT)
+            chapter = modulestore().create_child(user, new_course.location, 'chapter')
+            self.assertEqual(modulestore().get_parent_location(chapter.location).block_id, new_course.location.block_id)
+            sequential = modulestore().create_child(user, chapter.location, 'sequential')
+            self.assertEqual(modulestore().get_parent_location(sequential.location).block_id, chapter.location.block_id)
+
+        for __ in range(2):
+            parent = modulestore().get_parent_location(sequential.location.version_agnostic())
+            self.assertEqual(parent.block_id, chapter.location.block_id)
+
     def test_create_bulk_operations(self):
         """
         Test create_item using bulk_operations
@@ -208,6 +208,15 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk._end_bulk_operation(self.course_key)
         self.assertConnCalls(call.insert_definition(self.definition, self.course_key))
 
+    def test_no_write_of_read_definitions_on_close(self):
+        self.conn.get_course_index.return_value = None
+        self.bulk._begin_bulk_operation(self.course_key)
+        self.conn.get_definitions.return_value = [self.definition]
+        self.bulk.get_definitions(self.course_key, [self.definition['_id']])
+        self.conn.reset_mock()
+        self.bulk._end_bulk_operation(self.course_key)
+        self.assertConnCalls()
+
     def test_write_multiple_definitions_on_close(self):
         self.conn.get_course_index.return_value = None
         self.bulk._begin_bulk_operation(self.course_key)
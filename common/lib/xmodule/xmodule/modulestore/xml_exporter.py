@@ -2,6 +2,7 @@
 Methods for exporting course data to XML
 """
 
+import hashlib
 import logging
 from abc import abstractmethod
 import lxml.etree
@@ -20,6 +21,7 @@ import os
 from path import Path as path
 import shutil
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
+from xmodule.xml_module import XmlParserMixin, name_to_pathname
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 
 DRAFT_DIR = "drafts"
@@ -29,6 +31,11 @@ EXPORT_VERSION_KEY = "export_format"
 
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
+# Name, in the export's root directory, of the manifest of the blocks exported to a target directory
+EXPORT_MANIFEST_FILENAME = ".{target_dir}.export.json"
+# Increase this when a change to the exported XML must rewrite the files of unchanged blocks
+EXPORT_MANIFEST_VERSION = 1
+
 
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
@@ -102,6 +109,95 @@ def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
                 draft_node.module.add_xml_to_node(node)
 
 
+class ExportManifest(object):
+    """
+    The content hashes of the blocks exported to a directory, which let the next export to
+    the same directory keep the files of the blocks that haven't changed.
+
+    A block's hash covers the fields it exports and the hashes of its children, so it changes
+    whenever anything in its subtree does.  The manifest is kept in the export's root directory,
+    next to the target directory, so it isn't exported with the course.
+    """
+    def __init__(self, root_fs, target_dir, courselike_key):
+        """
+        `root_fs`: An `OSFS` of the export's root directory
+        `target_dir`: The name of the directory inside it that the blocks are exported to
+        `courselike_key`: The xml centric key the block references are mapped into
+        """
+        self.root_fs = root_fs
+        self.filename = EXPORT_MANIFEST_FILENAME.format(target_dir=target_dir)
+        self.courselike_key = unicode(courselike_key)
+        self.previous_hashes = self._load()
+        self.hashes = {}
+
+    def _load(self):
+        """
+        Return the block hashes of the last export, or an empty dict if there are none that apply.
+        """
+        if not self.root_fs.exists(self.filename):
+            return {}
+        try:
+            with self.root_fs.open(self.filename) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, ValueError):
+            logging.warning('Ignoring unreadable export manifest %s', self.filename, exc_info=True)
+            return {}
+        if manifest.get('version') != EXPORT_MANIFEST_VERSION or manifest.get('key') != self.courselike_key:
+            return {}
+        return manifest.get('blocks', {})
+
+    def mark_unchanged_blocks(self, root, export_fs):
+        """
+        Hash `root` and every block below it, and mark the ones whose subtree is unchanged
+        since the last export, and whose file that export wrote to `export_fs` is still there.
+        Their `add_xml_to_node` then only adds a pointer to that file (see `XmlParserMixin`).
+
+        Only blocks exported to a file of their own are marked, and never `root` itself.
+        Returns the set of marked locations, which should be cleared once the blocks are
+        exported, as it is shared with their runtimes.
+        """
+        unchanged = set()
+        self._hash_subtree(root, export_fs, unchanged)
+        unchanged.discard(root.location)
+        return unchanged
+
+    def _hash_subtree(self, block, export_fs, unchanged):
+        """
+        Record and return the hash of `block`, marking it in `unchanged` if the hash is the same as in
+        the last export.
+        """
+        block.runtime.export_unchanged = unchanged
+        fields = {}
+        for field_name, field in block.fields.iteritems():
+            if field.scope in (Scope.content, Scope.settings) and field.is_set_on(block):
+                fields[field_name] = field.to_json(field.read_from(block))
+        md5 = hashlib.md5()
+        md5.update(dumps(fields, cls=EdxJSONEncoder, sort_keys=True))
+        for child in block.get_children():
+            md5.update(self._hash_subtree(child, export_fs, unchanged))
+        digest = md5.hexdigest()
+
+        block_id = u'{}/{}'.format(block.location.block_type, block.location.block_id)
+        self.hashes[block_id] = digest
+        if (
+                self.previous_hashes.get(block_id) == digest and
+                isinstance(block, XmlParserMixin) and block.export_to_file() and
+                export_fs.exists(block._format_filepath(  # pylint: disable=protected-access
+                    block.category, name_to_pathname(block.url_name)
+                ))
+        ):
+            unchanged.add(block.location)
+        return digest
+
+    def save(self):
+        """
+        Write the block hashes of this export, for the next one.
+        """
+        manifest = {'version': EXPORT_MANIFEST_VERSION, 'key': self.courselike_key, 'blocks': self.hashes}
+        with self.root_fs.open(self.filename, 'w') as manifest_file:
+            manifest_file.write(dumps(manifest, sort_keys=True))
+
+
 class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
@@ -167,7 +263,14 @@ class ExportManager(object):
                 # change all of the references inside the course to use the xml expected key type w/o version & branch
                 xml_centric_courselike_key = self.get_key()
                 adapt_references(courselike, xml_centric_courselike_key, export_fs)
-                courselike.add_xml_to_node(root)
+
+                # keep the files of the blocks that haven't changed since the last export to this directory
+                manifest = ExportManifest(fsm, self.target_dir, xml_centric_courselike_key)
+                unchanged = manifest.mark_unchanged_blocks(courselike, export_fs)
+                try:
+                    courselike.add_xml_to_node(root)
+                finally:
+                    unchanged.clear()
 
             # Make any needed adjustments to the root node.
             self.process_root(root, export_fs)
@@ -179,6 +282,8 @@ class ExportManager(object):
             # Any last pass adjustments
             self.post_process(root, export_fs)
 
+            manifest.save()
+
 
 class CourseExportManager(ExportManager):
     """
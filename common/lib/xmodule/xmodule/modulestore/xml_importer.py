@@ -20,8 +20,10 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, a)   |  (a, a) | (x, a) | (x, x) | (x, y) | (a, x)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
+import hashlib
 import logging
 from abc import abstractmethod
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -54,10 +56,64 @@ from xmodule.util.misc import escape_invalid_characters
 log = logging.getLogger(__name__)
 
 
+# Number of threads importing static assets at once.
+STATIC_IMPORT_WORKERS = 4
+
+# Static assets larger than this many bytes are streamed into the content
+# store in chunks of STATIC_IMPORT_CHUNK_SIZE bytes, rather than read into memory.
+STATIC_IMPORT_STREAM_THRESHOLD = 1024 * 1024
+STATIC_IMPORT_CHUNK_SIZE = 256 * 1024
+
+
+def _read_in_chunks(content_path):
+    """
+    Yield the contents of the file at `content_path` in chunks of
+    STATIC_IMPORT_CHUNK_SIZE bytes.
+    """
+    with open(content_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STATIC_IMPORT_CHUNK_SIZE), ''):
+            yield chunk
+
+
+def _stored_asset_unchanged(stored_asset, content, content_path, data):
+    """
+    Return whether `stored_asset`, the content store's description of an
+    asset, already holds `content`, read from `content_path`.
+
+    `data` is the content of the file if it was read into memory, else None.
+    """
+    if stored_asset is None:
+        return False
+    if (
+            stored_asset.get('displayname') != content.name or
+            stored_asset.get('contentType') != content.content_type or
+            stored_asset.get('import_path') != content.import_path or
+            stored_asset.get('locked', False) != content.locked
+    ):
+        return False
+    # Thumbnails of images are generated when they are saved
+    is_image = content.content_type is not None and content.content_type.split('/')[0] == 'image'
+    if is_image and not stored_asset.get('thumbnail_location'):
+        return False
+
+    digest = hashlib.md5()
+    for chunk in ([data] if data is not None else _read_in_chunks(content_path)):
+        digest.update(chunk)
+    return stored_asset.get('md5') == digest.hexdigest()
+
+
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
+        target_id, subpath='static', verbose=False, num_workers=STATIC_IMPORT_WORKERS):
+    """
+    Import the files of `course_data_path`/`subpath` into `static_content_store`
+    as assets of `target_id`, and return a dict mapping the imported paths to
+    their asset keys.
 
+    Assets are imported by `num_workers` threads. Assets the content store
+    already holds with the same contents and metadata are not saved again,
+    and thumbnails are generated once all of the assets were saved.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -65,7 +121,7 @@ def import_static_content(
     try:
         with open(course_data_path / 'policies/assets.json') as f:
             policy = json.load(f)
-    except (IOError, ValueError) as err:
+    except (IOError, ValueError):
         # xml backed courses won't have this file, only exported courses;
         # so, its absence is not really an exception.
         policy = {}
@@ -76,71 +132,116 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
-
-            content_path = os.path.join(dirname, filename)
+    stored_assets, __ = static_content_store.get_all_content_for_course(target_id)
+    stored_assets = {stored_asset['asset_key']: stored_asset for stored_asset in stored_assets}
 
-            if re.match(ASSET_IGNORE_REGEX, filename):
-                if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
-
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+    def import_file(content_path):
+        """
+        Import the file at `content_path`. Returns the path of the file within
+        the static directory, its asset key, and the StaticContent saved, or
+        None if the content store already had it.
+        """
+        filename = os.path.basename(content_path)
+        if verbose:
+            log.debug('importing static content %s...', content_path)
 
-            try:
+        try:
+            if os.path.getsize(content_path) > STATIC_IMPORT_STREAM_THRESHOLD:
+                data = None
+            else:
                 with open(content_path, 'rb') as f:
                     data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+        except (IOError, OSError):
+            if filename.startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+
+        # During export display name is used to create files, strip away slashes from name
+        displayname = escape_invalid_characters(
+            name=policy_ele.get('displayname', filename),
+            invalid_char_list=['/', '\\']
+        )
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+        content = StaticContent(
+            asset_key, displayname, mime_type, data if data is not None else _read_in_chunks(content_path),
+            import_path=fullname_with_subpath, locked=locked
+        )
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+        if _stored_asset_unchanged(stored_assets.get(asset_key), content, content_path, data):
+            if verbose:
+                log.debug('static content %s is unchanged', content_path)
+            return fullname_with_subpath, asset_key, None
 
-            policy_ele = policy.get(asset_key.path, {})
+        # commit the content, its thumbnail is generated once all assets are saved
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
+            return fullname_with_subpath, asset_key, None
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        return fullname_with_subpath, asset_key, content
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+    def import_thumbnail(saved_content):
+        """
+        Generate and save the thumbnail of a (content path, StaticContent)
+        tuple of a saved asset.
+        """
+        content_path, content = saved_content
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(
+            content, tempfile_path=content_path
+        )
+        if thumbnail_content is not None:
+            static_content_store.set_thumbnail_location(content.location, thumbnail_location)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    content_paths = []
+    for dirname, _, filenames in os.walk(static_dir):
+        for filename in filenames:
+            content_path = os.path.join(dirname, filename)
+            if re.match(ASSET_IGNORE_REGEX, filename):
+                if verbose:
+                    log.debug('skipping static content %s...', content_path)
+                continue
+            content_paths.append(content_path)
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    pool = ThreadPool(num_workers) if num_workers > 1 else None
+    map_ = pool.map if pool is not None else map
+    try:
+        imported = map_(import_file, content_paths)
 
+        saved = []
+        for content_path, result in zip(content_paths, imported):
+            if result is None:
+                continue
+            fullname_with_subpath, asset_key, content = result
             # store the remapping information which will be needed
             # to subsitute in the module data
             remap_dict[fullname_with_subpath] = asset_key
+            if content is not None:
+                saved.append((content_path, content))
+
+        map_(import_thumbnail, saved)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     return remap_dict
 
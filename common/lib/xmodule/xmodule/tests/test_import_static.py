@@ -1,8 +1,10 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import hashlib
 import unittest
-from mock import Mock
+from mock import Mock, patch
+from xmodule.contentstore.content import StaticContent
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -15,6 +17,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -30,6 +33,7 @@ class IgnoredFilesTestCase(unittest.TestCase):
         course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
         content_store = Mock()
         content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = ([], 0)
         import_static_content(course_dir, content_store, course_id)
         saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
         name_val = {sc.name: sc.data for sc in saved_static_content}
@@ -39,3 +43,45 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+
+class ImportStaticContentTestCase(unittest.TestCase):
+    "Tests for importing static content into the content store"
+    def setUp(self):
+        super(ImportStaticContentTestCase, self).setUp()
+        self.course_dir = DATA_DIR / "tilde"
+        self.course_id = SlashSeparatedCourseKey("edX", "tilde", "Fall_2012")
+        self.asset_key = StaticContent.compute_location(self.course_id, "example.txt")
+        self.content_store = Mock()
+        self.content_store.generate_thumbnail.return_value = ("content", "location")
+        self.content_store.get_all_content_for_course.return_value = ([], 0)
+
+    def test_large_files_streamed(self):
+        with patch('xmodule.modulestore.xml_importer.STATIC_IMPORT_STREAM_THRESHOLD', 0):
+            import_static_content(self.course_dir, self.content_store, self.course_id)
+        saved_content = self.content_store.save.call_args[0][0]
+        self.assertNotIsInstance(saved_content.data, str)
+        self.assertIn("GREEN", "".join(saved_content.data))
+
+    def test_thumbnails_set_after_save(self):
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertEqual(remap_dict, {"example.txt": self.asset_key})
+        self.content_store.set_thumbnail_location.assert_called_once_with(self.asset_key, "location")
+
+    def test_unchanged_files_not_saved(self):
+        stored_asset = {
+            'asset_key': self.asset_key,
+            'displayname': 'example.txt',
+            'contentType': 'text/plain',
+            'import_path': 'example.txt',
+            'md5': hashlib.md5((self.course_dir / "static" / "example.txt").bytes()).hexdigest(),
+        }
+        self.content_store.get_all_content_for_course.return_value = ([stored_asset], 1)
+
+        remap_dict = import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertEqual(remap_dict, {"example.txt": self.asset_key})
+        self.assertFalse(self.content_store.save.called)
+
+        stored_asset['md5'] = 'changed'
+        import_static_content(self.course_dir, self.content_store, self.course_id)
+        self.assertTrue(self.content_store.save.called)
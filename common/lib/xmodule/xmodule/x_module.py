@@ -1587,7 +1587,7 @@ class ModuleSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):
             cache=None, can_execute_unsafe_code=None, replace_course_urls=None,
             replace_jump_to_id_urls=None, error_descriptor_class=None, get_real_user=None,
             field_data=None, get_user_role=None, rebind_noauth_module_to_user=None,
-            user_location=None, get_python_lib_zip=None, **kwargs):
+            user_location=None, get_python_lib_zip=None, safe_exec_cache=None, **kwargs):
         """
         Create a closure around the system environment.
 
@@ -1633,6 +1633,9 @@ class ModuleSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):
             .get(key) returns an object from the cache or None.
             .set(key, value, timeout_secs=None) stores a value in the cache with a timeout.
 
+        safe_exec_cache - A cache object like `cache`, used for the results of
+            sandboxed code.  Defaults to `cache`.
+
         can_execute_unsafe_code - A function returning a boolean, whether or
             not to allow the execution of unsafe, unsandboxed code.
 
@@ -1682,6 +1685,7 @@ class ModuleSystem(MetricsMixin, ConfigurableFragmentWrapper, Runtime):
         self.s3_interface = s3_interface
 
         self.cache = cache or DoNothingCache()
+        self.safe_exec_cache = safe_exec_cache or self.cache
         self.can_execute_unsafe_code = can_execute_unsafe_code or (lambda: False)
         self.get_python_lib_zip = get_python_lib_zip or (lambda: None)
         self.replace_course_urls = replace_course_urls
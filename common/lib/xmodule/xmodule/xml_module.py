@@ -408,6 +408,13 @@ class XmlParserMixin(object):
         """
         For exporting, set data on `node` from ourselves.
         """
+        if self.location in getattr(self.runtime, 'export_unchanged', ()):
+            # Nothing in this subtree changed since the last export to the same directory,
+            # so its files are kept and only the pointer is needed (see xml_exporter.ExportManifest).
+            node.tag = self.category
+            node.set('url_name', self.url_name)
+            return
+
         # Get the definition
         xml_object = self.definition_to_xml(self.runtime.export_fs)
         self.clean_metadata_from_xml(xml_object)
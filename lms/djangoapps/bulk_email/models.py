@@ -12,6 +12,7 @@ file and check it in at the same time as your model changes. To do that,
 
 """
 import logging
+import string
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models, transaction
@@ -20,7 +21,7 @@ from openedx.core.lib.html_to_text import html_to_text
 from openedx.core.lib.mail_utils import wrap_message
 
 from xmodule_django.models import CourseKeyField
-from util.keyword_substitution import substitute_keywords_with_data
+from util.keyword_substitution import anonymous_id_from_user_id, substitute_keywords_with_data
 
 log = logging.getLogger(__name__)
 
@@ -217,6 +218,117 @@ class CourseEmailTemplate(models.Model):
         """
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Create a plain text message to be rendered for many recipients.
+
+        Returns a CompiledEmailMessage of the plain text body (`plaintext`) in
+        the stored plain template, with the values of `context` that are the
+        same for all recipients.
+        """
+        return CompiledEmailMessage(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Create an HTML text message to be rendered for many recipients.
+
+        Returns a CompiledEmailMessage of the HTML text body (`htmltext`) in
+        the stored HTML template, with the values of `context` that are the
+        same for all recipients.
+        """
+        return CompiledEmailMessage(self.html_template, htmltext, context)
+
+
+# Context keys whose values differ between the recipients of a course email.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id')
+
+
+def _placeholder(key):
+    """Returns the text standing for the recipient value `key` in a CompiledEmailMessage."""
+    return u'\x00{}\x00'.format(key)
+
+
+class CompiledEmailMessage(object):
+    """
+    A course email message rendered with its template once for all of its
+    recipients.
+
+    The template is formatted, the message body is inserted, and the lines
+    that don't depend on the recipient are wrapped when the message is
+    created. `render` then only substitutes the values of each recipient in
+    the remaining lines, and returns the same text as
+    `CourseEmailTemplate._render` would with the full context.
+    """
+    def __init__(self, format_string, message_body, context):
+        """
+        Compile `message_body` in the template `format_string`, using the
+        `context` values that are the same for all recipients.
+        """
+        self.format_string = format_string
+        self.message_body = message_body
+        self.context = context
+        self.lines = None
+
+        # Recipient values with a format spec or conversion are only known
+        # once formatted, so those templates are rendered for each recipient.
+        for __, field_name, format_spec, conversion in string.Formatter().parse(format_string):
+            if field_name is None:
+                continue
+            key = field_name.split('.', 1)[0].split('[', 1)[0]
+            if key in RECIPIENT_CONTEXT_KEYS and (field_name != key or format_spec or conversion):
+                return
+            if '{' in format_spec:
+                return
+
+        placeholder_context = dict(context)
+        placeholder_context.update((key, _placeholder(key)) for key in RECIPIENT_CONTEXT_KEYS)
+
+        # Substitute all %%-encoded keywords in the message body, like `_render` does
+        if 'course_id' in context:
+            message_body = message_body.replace('%%USER_ID%%', _placeholder('anonymous_user_id'))
+            message_body = substitute_keywords_with_data(message_body, placeholder_context)
+
+        result = format_string.format(**placeholder_context)
+        result = result.replace(COURSE_EMAIL_MESSAGE_BODY_TAG.format(), message_body, 1)
+
+        # Lines are kept as wrapped text if they are the same for every recipient,
+        # or as a list of the lines to substitute the recipient values in.
+        self.lines = []
+        for line in result.split('\n'):
+            if u'\x00' in line:
+                if not self.lines or isinstance(self.lines[-1], basestring):
+                    self.lines.append([])
+                self.lines[-1].append(line)
+            else:
+                self.lines.append(wrap_message(line))
+
+    def render(self, recipient_context):
+        """
+        Returns the message for the recipient with the values of
+        `recipient_context`, which must have all of RECIPIENT_CONTEXT_KEYS.
+        """
+        if self.lines is None:
+            context = dict(self.context)
+            context.update(recipient_context)
+            render = CourseEmailTemplate._render  # pylint: disable=protected-access
+            return render(self.format_string, self.message_body, context)
+
+        values = [(_placeholder(key), u'{}'.format(recipient_context[key])) for key in RECIPIENT_CONTEXT_KEYS]
+        anonymous_user_id = _placeholder('anonymous_user_id')
+
+        lines = []
+        for line in self.lines:
+            if isinstance(line, basestring):
+                lines.append(line)
+                continue
+            text = u'\n'.join(line)
+            if anonymous_user_id in text:
+                text = text.replace(anonymous_user_id, anonymous_id_from_user_id(recipient_context['user_id']))
+            for placeholder, value in values:
+                text = text.replace(placeholder, value)
+            lines.append(wrap_message(text))
+        return u'\n'.join(lines)
+
 
 class CourseAuthorization(models.Model):
     """
@@ -6,7 +6,7 @@ to a course.
 import re
 import random
 import json
-from time import sleep
+from time import sleep, time
 from collections import Counter
 import logging
 
@@ -411,6 +411,58 @@ def _get_source_address(course_id, course_title):
     return from_addr
 
 
+class BulkEmailMessage(EmailMultiAlternatives):
+    """
+    An email message that records whether the email backend serialized it.
+
+    Email backends serialize each message right before sending it, so when
+    sending several messages in one call fails, the last message serialized
+    is the one that failed, and the ones before it were sent.
+    """
+    serialized = False
+
+    def message(self):
+        self.serialized = True
+        return super(BulkEmailMessage, self).message()
+
+
+def _send_messages(connection, email_msgs):
+    """
+    Sends `email_msgs` over `connection` in a single call.
+
+    Returns a tuple of the number of messages that were sent and the exception
+    raised while sending the next one, which is None if all of them were sent.
+    """
+    try:
+        connection.send_messages(email_msgs)
+    except Exception as exc:  # pylint: disable=broad-except
+        num_serialized = sum(1 for email_msg in email_msgs if email_msg.serialized)
+        return max(num_serialized - 1, 0), exc
+    return len(email_msgs), None
+
+
+class SendRateLimiter(object):
+    """
+    Spaces out sending emails so that at most `max_sends_per_second` emails
+    are sent per second, or sends them as fast as possible if it is 0.
+
+    Unlike sleeping for a fixed delay before each send, the time spent
+    rendering and sending emails counts towards the delay.
+    """
+    def __init__(self, max_sends_per_second):
+        self.delay_between_sends = 1.0 / max_sends_per_second if max_sends_per_second else 0
+        self.next_send_time = time()
+
+    def wait(self, num_emails=1):
+        """Sleep until `num_emails` emails can be sent."""
+        if not self.delay_between_sends:
+            return
+        now = time()
+        if self.next_send_time > now:
+            sleep(self.next_send_time - now)
+        self.next_send_time = max(now, self.next_send_time) + num_emails * self.delay_between_sends
+
+
 def _send_course_email(entry_id, email_id, to_list, global_email_context, subtask_status):
     """
     Performs the email sending task.
@@ -492,59 +544,91 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         # Define context values to use in all course emails:
         email_context = {'name': '', 'email': ''}
         email_context.update(global_email_context)
+        email_context['course_id'] = course_email.course_id
+
+        # Construct message content using templates and context, leaving out the user-specific values:
+        plaintext_msg = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_msg = course_email_template.compile_htmltext(course_email.html_message, email_context)
+
+        # Throttle if we have gotten the rate limiter.  If a task has been retried for
+        # rate-limiting reasons, then we space out all emails within this task.  Choice of
+        # the value depends on the number of workers that might be sending email in
+        # parallel, and what the SES throttle rate is.
+        max_sends_per_second = settings.BULK_EMAIL_MAX_SENDS_PER_SECOND
+        if subtask_status.retried_nomax > 0 and settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS:
+            throttled_sends_per_second = 1.0 / settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
+            max_sends_per_second = min(max_sends_per_second or throttled_sends_per_second, throttled_sends_per_second)
+        rate_limiter = SendRateLimiter(max_sends_per_second)
+        batch_size = max(settings.BULK_EMAIL_SEND_BATCH_SIZE, 1)
+        if subtask_status.retried_nomax > 0:
+            # Send one email at a time, so that each one waits for the rate limiter.
+            batch_size = 1
 
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
+            # Build emails for the users at the end of the list, last first.
+            # Each user is popped off of the to_list once they have been processed.
             # That way, the to_list will always contain the recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
-
-            try:
-                log.info(
-                    "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                    Recipient name: %s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    current_recipient['profile__name'],
-                    email
+            batch = to_list[:-batch_size - 1:-1]
+            email_msgs = []
+            for current_recipient in batch:
+                recipient_context = {
+                    'email': current_recipient['email'],
+                    'name': current_recipient['profile__name'],
+                    'user_id': current_recipient['pk'],
+                }
+
+                # Create email:
+                email_msg = BulkEmailMessage(
+                    course_email.subject,
+                    plaintext_msg.render(recipient_context),
+                    from_addr,
+                    [current_recipient['email']],
+                    connection=connection
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
+                email_msg.attach_alternative(html_msg.render(recipient_context), 'text/html')
+                email_msgs.append(email_msg)
+
+            rate_limiter.wait(len(email_msgs))
+            log.debug(
+                "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s-%s/%s",
+                parent_task_id,
+                task_id,
+                email_id,
+                recipient_num + 1,
+                recipient_num + len(batch),
+                total_recipients
+            )
+            with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                num_sent, send_exc = _send_messages(connection, email_msgs)
+
+            for current_recipient in batch[:num_sent]:
+                recipient_num += 1
+                email = current_recipient['email']
+                total_recipients_successful += 1
+                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                    log.info('Email with id %s sent to %s', email_id, email)
+                else:
+                    log.debug('Email with id %s sent to %s', email_id, email)
+                subtask_status.increment(succeeded=1)
+
+                # Pop the user that was emailed off the end of the list only once they have
+                # successfully been processed.  (That way, if there were a failure that
+                # needed to be retried, the user is still on the list.)
+                recipients_info[email] += 1
+                to_list.pop()
+
+            if send_exc is None:
+                continue
+
+            # The email to the next user in the batch failed, and the rest of
+            # the batch is left on the list for the next iteration.
+            recipient_num += 1
+            email = batch[num_sent]['email']
 
-            except SMTPDataError as exc:
+            if isinstance(send_exc, SMTPDataError):
                 # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
                 total_recipients_failed += 1
                 log.error(
@@ -557,9 +641,9 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     total_recipients,
                     email
                 )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                if send_exc.smtp_code >= 400 and send_exc.smtp_code < 500:
                     # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
+                    raise send_exc
                 else:
                     # This will fall through and not retry the message.
                     log.warning(
@@ -571,12 +655,12 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                         recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        send_exc.smtp_error
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
+            elif isinstance(send_exc, SINGLE_EMAIL_FAILURE_ERRORS):
                 # This will fall through and not retry the message.
                 total_recipients_failed += 1
                 log.error(
@@ -588,33 +672,15 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     recipient_num,
                     total_recipients,
                     email,
-                    exc
+                    send_exc
                 )
                 dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                 subtask_status.increment(failed=1)
 
             else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
-                else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
+                # Leave the user on the list, for the outer handler to decide whether to retry.
+                raise send_exc
 
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
             recipients_info[email] += 1
             to_list.pop()
 
@@ -629,8 +695,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             total_recipients_failed,
             total_recipients
         )
-        duplicate_recipients = ["{0} ({1})".format(email, repetition)
-                                for email, repetition in recipients_info.most_common() if repetition > 1]
+        duplicate_recipients = ["{0} ({1})".format(to_email, repetition)
+                                for to_email, repetition in recipients_info.most_common() if repetition > 1]
         if duplicate_recipients:
             log.info(
                 "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Duplicate Recipients [%s]: [%s]",
@@ -139,6 +139,27 @@ class CourseEmailTemplateTest(TestCase):
         context = self._get_sample_plain_context()
         template.render_plaintext("My new plain text.", context)
 
+    def test_compiled_same_as_rendered(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._get_sample_html_context()
+        context['course_id'] = SlashSeparatedCourseKey('abc', '123', 'doremi')
+        message = u"Dear %%USER_FULLNAME%% (%%USER_ID%%),\n" + u"Welcome to %%COURSE_DISPLAY_NAME%%! " * 50
+        compiled_plaintext = template.compile_plaintext(message, context)
+        compiled_htmltext = template.compile_htmltext(message, context)
+
+        for name in [u'Ann', u'B\u00f8b']:
+            user = UserFactory.create()
+            recipient_context = {'name': name, 'email': user.email, 'user_id': user.id}
+            full_context = dict(context, **recipient_context)
+            self.assertEquals(
+                compiled_plaintext.render(recipient_context),
+                template.render_plaintext(message, full_context)
+            )
+            self.assertEquals(
+                compiled_htmltext.render(recipient_context),
+                template.render_htmltext(message, full_context)
+            )
+
 
 @attr('shard_1')
 class CourseAuthorizationTest(TestCase):
@@ -28,11 +28,14 @@ from boto.exception import AWSConnectionError
 from celery.states import SUCCESS, FAILURE  # pylint: disable=no-name-in-module, import-error
 
 from django.conf import settings
+from django.test import TestCase
 from django.core.management import call_command
+from django.test.utils import override_settings
 
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from bulk_email.models import CourseEmail, Optout, SEND_TO_ALL
+from bulk_email.tasks import SendRateLimiter
 
 from instructor_task.tasks import send_bulk_course_email
 from instructor_task.subtasks import update_subtask_status, SubtaskStatus
@@ -433,3 +436,57 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
             get_conn.return_value.send_messages.side_effect = cycle([None])
             self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+
+    @override_settings(BULK_EMAIL_SEND_BATCH_SIZE=10)
+    def test_successful_in_batches(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEquals(get_conn.return_value.send_messages.call_count, (num_emails + 9) / 10)
+
+    @override_settings(BULK_EMAIL_SEND_BATCH_SIZE=10)
+    def test_failure_in_batch(self):
+        # Select number of emails to fit into a single subtask.
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        # We also send email to the instructor:
+        self._create_students(num_emails - 1)
+        sent_emails = []
+        failures = [SESAddressBlacklistedError(554, "Email address is blacklisted")]
+
+        def send_messages(email_msgs):
+            """Send the emails like an email backend, failing on the third one."""
+            for email_msg in email_msgs:
+                email_msg.message()
+                if len(sent_emails) == 2 and failures:
+                    raise failures.pop()
+                sent_emails.append(email_msg.to[0])
+
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = send_messages
+            self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails - 1, failed=1)
+        # The emails after the failed one were sent once, in the next batches
+        self.assertEquals(len(set(sent_emails)), num_emails - 1)
+        self.assertEquals(len(sent_emails), num_emails - 1)
+
+
+class SendRateLimiterTest(TestCase):
+    """Tests of spacing out sending emails."""
+    @patch('bulk_email.tasks.sleep')
+    @patch('bulk_email.tasks.time', Mock(return_value=100.0))
+    def test_wait(self, mock_sleep):
+        rate_limiter = SendRateLimiter(10)
+        rate_limiter.wait(5)
+        self.assertFalse(mock_sleep.called)
+        rate_limiter.wait()
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch('bulk_email.tasks.sleep')
+    def test_unlimited(self, mock_sleep):
+        rate_limiter = SendRateLimiter(0)
+        for __ in range(10):
+            rate_limiter.wait(10)
+        self.assertFalse(mock_sleep.called)
@@ -300,30 +300,69 @@ def certificate_status_for_student(student, course_id):
     try:
         generated_certificate = GeneratedCertificate.objects.get(
             user=student, course_id=course_id)
-        cert_status = {
-            'status': generated_certificate.status,
-            'mode': generated_certificate.mode,
-            'uuid': generated_certificate.verify_uuid,
-        }
-        if generated_certificate.grade:
-            cert_status['grade'] = generated_certificate.grade
+    except GeneratedCertificate.DoesNotExist:
+        generated_certificate = None
+    return _certificate_status(generated_certificate, course_id)
 
-        if generated_certificate.mode == 'audit':
-            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(course_id)]
-            # Short term fix to make sure old audit users with certs still see their certs
-            # only do this if there if no honor mode
-            if 'honor' not in course_mode_slugs:
-                cert_status['status'] = CertificateStatuses.auditing
-                return cert_status
 
-        if generated_certificate.status == CertificateStatuses.downloadable:
-            cert_status['download_url'] = generated_certificate.download_url
+def certificate_statuses_for_student(student, course_ids, course_modes=None):
+    """
+    Returns the result of `certificate_status_for_student` for each of
+    `course_ids`, loading the student's certificates with a single query.
 
-        return cert_status
+    Arguments:
+        student (User): the student.
+        course_ids (list of CourseKey): the courses to get certificate statuses for.
+        course_modes (dict): if given, maps each course id to its list of
+            unexpired course modes, to avoid loading them for audit certificates.
 
-    except GeneratedCertificate.DoesNotExist:
-        pass
-    return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+    Returns:
+        dict mapping each course id to its certificate status dict.
+    """
+    certificates = {
+        certificate.course_id: certificate
+        for certificate in GeneratedCertificate.objects.filter(user=student, course_id__in=course_ids)
+    }
+    return {
+        course_id: _certificate_status(
+            certificates.get(course_id),
+            course_id,
+            course_modes.get(course_id) if course_modes is not None else None,
+        )
+        for course_id in course_ids
+    }
+
+
+def _certificate_status(generated_certificate, course_id, course_modes=None):
+    """
+    Builds the status dict described in `certificate_status_for_student` for
+    `generated_certificate`, which is None if the student has no certificate.
+    """
+    if generated_certificate is None:
+        return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+
+    cert_status = {
+        'status': generated_certificate.status,
+        'mode': generated_certificate.mode,
+        'uuid': generated_certificate.verify_uuid,
+    }
+    if generated_certificate.grade:
+        cert_status['grade'] = generated_certificate.grade
+
+    if generated_certificate.mode == 'audit':
+        if course_modes is None:
+            course_modes = CourseMode.modes_for_course(course_id)
+        course_mode_slugs = [mode.slug for mode in course_modes]
+        # Short term fix to make sure old audit users with certs still see their certs
+        # only do this if there if no honor mode
+        if 'honor' not in course_mode_slugs:
+            cert_status['status'] = CertificateStatuses.auditing
+            return cert_status
+
+    if generated_certificate.status == CertificateStatuses.downloadable:
+        cert_status['download_url'] = generated_certificate.download_url
+
+    return cert_status
 
 
 def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
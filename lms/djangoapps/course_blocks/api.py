@@ -1,10 +1,11 @@
 """
 API entry point to the course_blocks app with top-level
-get_course_blocks and clear_course_from_cache functions.
+get_course_blocks, update_course_in_cache and clear_course_from_cache
+functions.
 """
 from django.core.cache import cache
 
-from openedx.core.lib.block_cache.block_cache import get_blocks, clear_block_cache
+from openedx.core.lib.block_cache.block_cache import get_blocks, clear_block_cache, update_block_cache
 from xmodule.modulestore.django import modulestore
 
 from .transformers import (
@@ -81,6 +82,21 @@ def get_course_blocks(
     )
 
 
+def update_course_in_cache(course_key):
+    """
+    A higher order function implemented on top of the
+    block_cache.update_block_cache function that recollects the block
+    structure of the course for the given course_key and replaces it
+    in the cache.
+
+    Note: See Note in get_course_blocks.
+    """
+    store = modulestore()
+    course_usage_key = store.make_course_usage_key(course_key)
+    with store.bulk_operations(course_key):
+        update_block_cache(cache, store, course_usage_key)
+
+
 def clear_course_from_cache(course_key):
     """
     A higher order function implemented on top of the
@@ -1,11 +1,13 @@
 """
 Signal handlers for invalidating cached data.
 """
+from django.conf import settings
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
 from .api import clear_course_from_cache
+from .tasks import update_course_in_cache
 
 
 @receiver(SignalHandler.course_published)
@@ -13,8 +15,19 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     """
     Catches the signal that a course has been published in the module
     store and invalidates the corresponding cache entry if one exists.
+
+    If ENABLE_ASYNC_COURSE_BLOCKS_UPDATE is set, the cache entry is
+    instead replaced by a celery task, so that requests continue to be
+    served from the previously cached block structure rather than
+    collecting it themselves.
     """
-    clear_course_from_cache(course_key)
+    if settings.FEATURES.get('ENABLE_ASYNC_COURSE_BLOCKS_UPDATE', False):
+        update_course_in_cache.apply_async(
+            [unicode(course_key)],
+            countdown=settings.COURSE_BLOCKS_UPDATE_DELAY,
+        )
+    else:
+        clear_course_from_cache(course_key)
 
 
 @receiver(SignalHandler.course_deleted)
@@ -0,0 +1,33 @@
+"""
+Asynchronous tasks related to the Course Blocks sub-application.
+"""
+import logging
+
+from celery.task import task
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
+
+from .api import update_course_in_cache as _update_course_in_cache
+
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task(
+    name=u'lms.djangoapps.course_blocks.tasks.update_course_in_cache',
+    default_retry_delay=settings.COURSE_BLOCKS_UPDATE_RETRY_DELAY,
+    max_retries=settings.COURSE_BLOCKS_UPDATE_MAX_RETRIES,
+)
+def update_course_in_cache(course_id):
+    """
+    Recollects the block structure of the specified course and
+    replaces it in the cache.
+
+    Callers should pass the course key as a Unicode string, since a
+    CourseLocator is not JSON-serializable.
+    """
+    try:
+        _update_course_in_cache(CourseKey.from_string(course_id))
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception('Error while updating the block structure of course %s in the cache.', course_id)
+        raise update_course_in_cache.retry(exc=exc)
@@ -0,0 +1,57 @@
+"""
+Tests for the course_blocks signal handlers.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from mock import patch
+
+from openedx.core.lib.block_cache.block_structure_factory import BlockStructureFactory
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import get_course_blocks, COURSE_BLOCK_ACCESS_TRANSFORMERS
+
+
+class CourseBlocksSignalTest(ModuleStoreTestCase):
+    """
+    Tests for the course_blocks signal handlers.
+    """
+    def setUp(self):
+        super(CourseBlocksSignalTest, self).setUp()
+        self.user = UserFactory.create()
+        self.course = CourseFactory.create()
+        self.course_usage_key = self.store.make_course_usage_key(self.course.id)
+
+        # populate the cache
+        get_course_blocks(self.user, self.course_usage_key)
+
+    def _get_cached_course(self):
+        """
+        Returns the cached block structure of the course, if any.
+        """
+        return BlockStructureFactory.create_from_cache(
+            self.course_usage_key, cache, COURSE_BLOCK_ACCESS_TRANSFORMERS
+        )
+
+    def test_course_publish_clears_cache(self):
+        self.assertIsNotNone(self._get_cached_course())
+        ItemFactory.create(parent=self.course, category='chapter')
+        self.assertIsNone(self._get_cached_course())
+
+    @patch.dict(settings.FEATURES, {'ENABLE_ASYNC_COURSE_BLOCKS_UPDATE': True})
+    def test_course_publish_updates_cache(self):
+        chapter = ItemFactory.create(parent=self.course, category='chapter')
+        block_structure = self._get_cached_course()
+        self.assertIsNotNone(block_structure)
+        self.assertTrue(block_structure.has_block(chapter.location))
+
+    @patch.dict(settings.FEATURES, {'ENABLE_ASYNC_COURSE_BLOCKS_UPDATE': True})
+    @patch('lms.djangoapps.course_blocks.signals.update_course_in_cache.apply_async')
+    def test_course_publish_enqueues_update(self, mock_apply_async):
+        ItemFactory.create(parent=self.course, category='chapter')
+        mock_apply_async.assert_called_with(
+            [unicode(self.course.id)],
+            countdown=settings.COURSE_BLOCKS_UPDATE_DELAY,
+        )
+        self.assertIsNotNone(self._get_cached_course())
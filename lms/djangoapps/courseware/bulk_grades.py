@@ -0,0 +1,548 @@
+"""
+Bulk grading of every student in a course, for grade reports.
+
+`courseware.grades.grade` grades one student at a time: it builds a
+FieldDataCache, walks every graded subsection and instantiates XModules to
+find out what each problem is worth. For a report over a whole course that
+work is repeated for every enrolled student.
+
+`iterate_bulk_grades_for` instead loads the scores for a chunk of students in
+a couple of streaming queries, places them in dense students x problems NumPy
+arrays, and applies the course grader (`WeightedSubsectionsGrader` over
+`AssignmentFormatGrader` / `SingleSectionGrader`) as array operations. It
+yields the same (student, gradeset, err_msg) tuples as
+`courseware.grades.iterate_grades_for`.
+
+Bulk grading relies on every non-staff student seeing the same set of
+problems. Courses where that does not hold (dynamic children such as
+randomized or library content, problems restricted to groups, problems that
+always need recalculating, CCX courses or custom graders) are graded one
+student at a time instead, as are students with course roles (staff, beta
+testers, ...) whose access to problems differs from other students.
+
+Gradesets produced here contain the keys reports rely on: 'percent', 'grade',
+'section_breakdown' and 'grade_breakdown' (with 'label'/'category'/'percent'
+entries) and, with keep_raw_scores, 'raw_scores'.
+"""
+from __future__ import division
+
+import logging
+
+import numpy
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+
+import dogstats_wrapper as dog_stats_api
+from opaque_keys.edx.keys import CourseKey
+
+from courseware import courses
+from courseware.access import has_access
+from courseware.grades import MaxScoresCache, grade_for_percentage, iterate_grades_for, _get_mock_request
+from courseware.model_data import FieldDataCache
+from courseware.models import StudentModule, StudentModuleScore, read_from_score_index
+from courseware.module_render import get_module_for_descriptor
+from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
+from student.models import CourseAccessRole, anonymous_id_for_user
+from xmodule import graders
+from xmodule.graders import Score
+
+
+log = logging.getLogger("edx.courseware")
+
+# Number of students whose scores are held in memory at once
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class BulkCourseGrader(object):
+    """
+    Grades many students of a single course at once using NumPy arrays.
+
+    The course structure (graded subsections, their scored problems, problem
+    weights and the grader configuration) is read once when the grader is
+    created. `grade_students` can then be called for successive chunks of
+    students.
+    """
+    def __init__(self, course):
+        self.course = course
+        # Grading policy might be overriden by a CCX, need to reset it
+        course.set_grading_policy(course.grading_policy)
+        grading_context = course.grading_context
+
+        self.ineligible_reason = self._ineligible_reason(grading_context)
+        if self.ineligible_reason:
+            return
+
+        # Subsections, in the order the grader sees them for each format
+        self.sections = [
+            (section_format, section)
+            for section_format, sections in grading_context['graded_sections'].iteritems()
+            for section in sections
+        ]
+
+        # Problems are the columns of our score arrays. `_touching_locations`
+        # maps every scored location (including ones that non-staff students
+        # can't load) to its subsection, since any state on them means the
+        # student has started that subsection.
+        self.problems = []
+        problem_sections = []
+        self._columns = {}
+        self._submission_columns = {}
+        self._touching_locations = {}
+        anonymous_user = AnonymousUser()
+        for section_index, (__, section) in enumerate(self.sections):
+            for descriptor in section['xmoduledescriptors']:
+                self._touching_locations[descriptor.location] = section_index
+                self._touching_locations[descriptor.location.to_deprecated_string()] = section_index
+                if not has_access(anonymous_user, 'load', descriptor, course.id):
+                    continue
+                self._columns[descriptor.location] = len(self.problems)
+                self._submission_columns[descriptor.location.to_deprecated_string()] = len(self.problems)
+                self.problems.append(descriptor)
+                problem_sections.append(section_index)
+
+        num_problems = len(self.problems)
+        self.problem_sections = numpy.array(problem_sections, dtype=int)
+        self.problem_graded = numpy.array([bool(problem.graded) for problem in self.problems], dtype=bool)
+        self.problem_weights = numpy.array(
+            [problem.weight if problem.weight is not None else numpy.nan for problem in self.problems],
+            dtype=float
+        )
+        # Membership matrix of problems (rows) in subsections (columns)
+        self.membership = numpy.zeros((num_problems, len(self.sections)))
+        self.membership[numpy.arange(num_problems), self.problem_sections] = 1.0
+
+        # Unweighted max score of each problem, for students who haven't got
+        # a score for it yet. NaN means unknown, and -inf that the problem
+        # could not be scored (e.g. it failed to load).
+        self.max_scores_cache = MaxScoresCache.create_for_course(course)
+        self.max_scores_cache.fetch_from_remote([problem.location for problem in self.problems])
+        self.max_scores = numpy.array(
+            [self._cached_max_score(problem) for problem in self.problems],
+            dtype=float
+        )
+
+    def _cached_max_score(self, problem):
+        """Return the remotely cached max score of the problem, or NaN."""
+        max_score = self.max_scores_cache.get(problem.location)
+        return max_score if max_score is not None else numpy.nan
+
+    def _ineligible_reason(self, grading_context):
+        """
+        Return a message explaining why this course can't be graded in bulk,
+        or None if it can.
+        """
+        if getattr(self.course.id, 'ccx', None):
+            return u"CCX courses override course content per CCX"
+        if settings.GENERATE_PROFILE_SCORES:
+            return u"random profile scores are being generated"
+
+        grader = self.course.grader
+        if not isinstance(grader, graders.WeightedSubsectionsGrader):
+            return u"unsupported grader {}".format(grader.__class__.__name__)
+        for subgrader, __, __ in grader.sections:
+            if not isinstance(subgrader, (graders.AssignmentFormatGrader, graders.SingleSectionGrader)):
+                return u"unsupported subgrader {}".format(subgrader.__class__.__name__)
+
+        for descriptor in grading_context['all_descriptors']:
+            if descriptor.has_dynamic_children():
+                return u"{} has dynamic children".format(descriptor.location)
+        for sections in grading_context['graded_sections'].itervalues():
+            for section in sections:
+                for descriptor in section['xmoduledescriptors']:
+                    if descriptor.always_recalculate_grades:
+                        return u"{} always recalculates grades".format(descriptor.location)
+                    if any(getattr(descriptor, 'group_access', {}).values()):
+                        return u"{} is restricted to groups".format(descriptor.location)
+        return None
+
+    @property
+    def eligible(self):
+        """Can this course be graded in bulk?"""
+        return self.ineligible_reason is None
+
+    def grade_students(self, students, keep_raw_scores=False):
+        """
+        Grade a list of students, returning a list of gradesets in the same
+        order.
+        """
+        num_students = len(students)
+        num_problems = len(self.problems)
+        rows = {student.id: index for index, student in enumerate(students)}
+
+        # Unweighted scores from StudentModule, NaN where there is none
+        raw_earned = _nan_array((num_students, num_problems))
+        raw_possible = _nan_array((num_students, num_problems))
+        # Scores from the submissions API, which take precedence as they are
+        sub_earned = _nan_array((num_students, num_problems))
+        sub_possible = _nan_array((num_students, num_problems))
+        # Whether the student has any state in each subsection
+        touched = numpy.zeros((num_students, len(self.sections)), dtype=bool)
+
+        self._load_student_module_scores(rows, raw_earned, raw_possible, touched)
+        self._load_submissions_scores(students, sub_earned, sub_possible, touched)
+
+        # Students who have started a subsection but have no score for one of
+        # its problems earned 0 out of the problem's max score.
+        needs_max_score = touched[:, self.problem_sections] & numpy.isnan(raw_possible) & numpy.isnan(sub_possible)
+        self._fill_unknown_max_scores(students, needs_max_score)
+        max_scores = numpy.where(self.max_scores == -numpy.inf, numpy.nan, self.max_scores)
+        raw_earned = numpy.where(needs_max_score, 0.0, raw_earned)
+        raw_possible = numpy.where(needs_max_score, max_scores[numpy.newaxis, :], raw_possible)
+
+        # Apply problem weights, see courseware.grades.weighted_score
+        weighted = ~numpy.isnan(self.problem_weights)[numpy.newaxis, :] & (raw_possible != 0)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            earned = numpy.where(weighted, raw_earned * self.problem_weights / raw_possible, raw_earned)
+        possible = numpy.where(weighted, self.problem_weights[numpy.newaxis, :], raw_possible)
+
+        has_submission = ~numpy.isnan(sub_possible)
+        earned = numpy.where(has_submission, sub_earned, earned)
+        possible = numpy.where(has_submission, sub_possible, possible)
+
+        # Only subsections the student has started are scored
+        scored = ~numpy.isnan(possible) & touched[:, self.problem_sections]
+        graded = scored & self.problem_graded[numpy.newaxis, :] & (possible > 0)
+
+        section_earned = numpy.dot(numpy.where(graded, earned, 0.0), self.membership)
+        section_possible = numpy.dot(numpy.where(graded, possible, 0.0), self.membership)
+        # Subsections that haven't been started count as 0 out of 1
+        section_possible = numpy.where(touched, section_possible, 1.0)
+        section_earned = numpy.where(touched, section_earned, 0.0)
+
+        gradesets = self._apply_grader(section_earned, section_possible)
+        if keep_raw_scores:
+            for row, gradeset in enumerate(gradesets):
+                gradeset['raw_scores'] = self._raw_scores(earned[row], possible[row], scored[row], graded[row])
+        return gradesets
+
+    def _load_student_module_scores(self, rows, raw_earned, raw_possible, touched):
+        """
+        Fill in scores and started subsections from StudentModule, streaming
+        only the columns we need.
+        """
+        score_rows, score_columns, grades, max_grades = [], [], [], []
+        for student_id, location, grade, max_grade in self._student_module_scores(rows.keys()):
+            location = location.map_into_course(self.course.id)
+            section_index = self._touching_locations.get(location)
+            if section_index is None:
+                continue
+            row = rows[student_id]
+            touched[row, section_index] = True
+            column = self._columns.get(location)
+            if column is not None and max_grade is not None:
+                score_rows.append(row)
+                score_columns.append(column)
+                grades.append(grade if grade is not None else 0.0)
+                max_grades.append(max_grade)
+
+        if score_rows:
+            raw_earned[score_rows, score_columns] = grades
+            raw_possible[score_rows, score_columns] = max_grades
+
+    def _student_module_scores(self, student_ids):
+        """
+        Yield (student_id, location, grade, max_grade) for every StudentModule
+        of the students, from the score index if it is in use.
+        """
+        if read_from_score_index():
+            scores = StudentModuleScore.read_course(self.course.id, user_ids=student_ids)
+            for student_id, location, earned, possible in zip(
+                    scores.user_ids, scores.usage_keys, scores.earned, scores.possible
+            ):
+                yield (
+                    int(student_id),
+                    location,
+                    None if numpy.isnan(earned) else float(earned),
+                    None if numpy.isnan(possible) else float(possible),
+                )
+            return
+
+        queryset = StudentModule.objects.filter(course_id=self.course.id, student_id__in=student_ids)
+        if "read_replica" in settings.DATABASES:
+            queryset = queryset.using("read_replica")
+        for row in queryset.values_list('student_id', 'module_state_key', 'grade', 'max_grade').iterator():
+            yield row
+
+    def _load_submissions_scores(self, students, sub_earned, sub_possible, touched):
+        """
+        Fill in scores registered with the submissions API, which for the
+        moment means only openassessment (edx-ora2).
+        """
+        # We need to import this here to avoid a circular dependency, see
+        # courseware.grades._grade
+        from submissions.models import ScoreSummary  # installed from the edx-submissions repository
+
+        anonymous_ids = {
+            anonymous_id_for_user(student, self.course.id, save=False): row
+            for row, student in enumerate(students)
+        }
+        queryset = ScoreSummary.objects.filter(
+            student_item__course_id=self.course.id.to_deprecated_string(),
+            student_item__student_id__in=anonymous_ids.keys(),
+        )
+        for anonymous_id, item_id, points_earned, points_possible in queryset.values_list(
+                'student_item__student_id', 'student_item__item_id',
+                'latest__points_earned', 'latest__points_possible',
+        ).iterator():
+            # Scores worth zero points are hidden (e.g. they have been reset)
+            if not points_possible:
+                continue
+            section_index = self._touching_locations.get(item_id)
+            if section_index is None:
+                continue
+            row = anonymous_ids[anonymous_id]
+            touched[row, section_index] = True
+            column = self._submission_columns.get(item_id)
+            if column is not None:
+                sub_earned[row, column] = points_earned
+                sub_possible[row, column] = points_possible
+
+    def _fill_unknown_max_scores(self, students, needs_max_score):
+        """
+        Instantiate each problem whose max score isn't known yet once, for the
+        first student that needs it, and remember its max score.
+        """
+        unknown = numpy.isnan(self.max_scores) & needs_max_score.any(axis=0)
+        for column in numpy.nonzero(unknown)[0]:
+            problem = self.problems[column]
+            student = students[numpy.nonzero(needs_max_score[:, column])[0][0]]
+            field_data_cache = FieldDataCache([problem], self.course.id, student)
+            module = get_module_for_descriptor(
+                student, _get_mock_request(student), problem, field_data_cache, self.course.id, course=self.course
+            )
+            max_score = module.max_score() if module is not None else None
+            if max_score is None:
+                self.max_scores[column] = -numpy.inf
+            else:
+                self.max_scores[column] = max_score
+                self.max_scores_cache.set(problem.location, max_score)
+        self.max_scores_cache.push_to_remote()
+
+    def _apply_grader(self, section_earned, section_possible):
+        """
+        Run the course grader over students x subsections arrays of earned
+        and possible points, returning a gradeset for each student.
+        """
+        num_students = section_earned.shape[0]
+        # Subsections worth nothing can't be graded, and are left out
+        included = section_possible > 0
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            section_percent = numpy.where(included, section_earned / section_possible, 0.0)
+
+        total_percent = numpy.zeros(num_students)
+        breakdowns = [[] for __ in xrange(num_students)]
+        grade_breakdowns = [[] for __ in xrange(num_students)]
+        for subgrader, category, weight in self.course.grader.sections:
+            columns = [index for index, (section_format, __) in enumerate(self.sections)
+                       if section_format == subgrader.type]
+            if isinstance(subgrader, graders.AssignmentFormatGrader):
+                percent = self._assignment_format_grade(
+                    subgrader, section_percent[:, columns], included[:, columns], breakdowns
+                )
+            else:
+                percent = self._single_section_grade(
+                    subgrader, columns, section_percent, included, breakdowns
+                )
+
+            weighted_percent = percent * weight
+            total_percent += weighted_percent
+            for row in xrange(num_students):
+                grade_breakdowns[row].append({
+                    'percent': float(weighted_percent[row]),
+                    'detail': u"{0} = {1:.2%} of a possible {2:.2%}".format(
+                        category, weighted_percent[row], weight
+                    ),
+                    'category': category,
+                })
+
+        # We round the grade here, to make sure that the grade is an whole percentage and
+        # doesn't get displayed differently than it gets grades (see courseware.grades._grade)
+        rounded_percent = numpy.floor(total_percent * 100 + 0.05 + 0.5) / 100
+        return [
+            {
+                'percent': float(rounded_percent[row]),
+                'grade': grade_for_percentage(self.course.grade_cutoffs, rounded_percent[row]),
+                'section_breakdown': breakdowns[row],
+                'grade_breakdown': grade_breakdowns[row],
+            }
+            for row in xrange(num_students)
+        ]
+
+    @staticmethod
+    def _assignment_format_grade(subgrader, percent, included, breakdowns):
+        """
+        Vectorized `AssignmentFormatGrader.grade`. `percent` and `included`
+        are students x subsections-of-this-format arrays.
+        """
+        num_students, num_sections = percent.shape
+        num_included = included.sum(axis=1)
+        num_entries = numpy.maximum(num_included, subgrader.min_count)
+
+        # Each student's entries are their included subsections, padded with
+        # zeros up to min_count; everything else sorts to the end as +inf.
+        padding = numpy.arange(subgrader.min_count)[numpy.newaxis, :] < (num_entries - num_included)[:, numpy.newaxis]
+        entries = numpy.hstack([
+            numpy.where(included, percent, numpy.inf),
+            numpy.where(padding, 0.0, numpy.inf),
+        ])
+        entries.sort(axis=1)
+        entries = numpy.where(numpy.isinf(entries), 0.0, entries)
+
+        # Drop the lowest drop_count entries and average the rest
+        kept = numpy.arange(entries.shape[1])[numpy.newaxis, :] >= subgrader.drop_count
+        kept_count = num_entries - subgrader.drop_count
+        kept_total = numpy.where(kept, entries, 0.0).sum(axis=1)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            total_percent = numpy.where(kept_count > 0, kept_total / kept_count, 0.0)
+
+        for row in xrange(num_students):
+            row_percents = [float(percent[row, column]) for column in xrange(num_sections) if included[row, column]]
+            row_percents += [0.0] * (num_entries[row] - len(row_percents))
+            if len(row_percents) == 1:
+                breakdowns[row].append({
+                    'percent': float(total_percent[row]),
+                    'label': subgrader.short_label,
+                    'category': subgrader.category,
+                    'prominent': True,
+                })
+                continue
+            if not subgrader.show_only_average:
+                for index, row_percent in enumerate(row_percents):
+                    breakdowns[row].append({
+                        'percent': row_percent,
+                        'label': u"{short_label} {index:02d}".format(
+                            index=index + subgrader.starting_index,
+                            short_label=subgrader.short_label
+                        ),
+                        'category': subgrader.category,
+                    })
+            if not subgrader.hide_average:
+                breakdowns[row].append({
+                    'percent': float(total_percent[row]),
+                    'label': u"{short_label} Avg".format(short_label=subgrader.short_label),
+                    'category': subgrader.category,
+                    'prominent': True,
+                })
+        return total_percent
+
+    def _single_section_grade(self, subgrader, columns, section_percent, included, breakdowns):
+        """
+        Vectorized `SingleSectionGrader.grade`: the percent of the first
+        included subsection with a matching name.
+        """
+        num_students = section_percent.shape[0]
+        percent = numpy.zeros(num_students)
+        found = numpy.zeros(num_students, dtype=bool)
+        for column in columns:
+            if self.sections[column][1]['section_descriptor'].display_name_with_default != subgrader.name:
+                continue
+            matches = included[:, column] & ~found
+            percent = numpy.where(matches, section_percent[:, column], percent)
+            found |= matches
+
+        for row in xrange(num_students):
+            breakdowns[row].append({
+                'percent': float(percent[row]),
+                'label': subgrader.short_label,
+                'category': subgrader.category,
+                'prominent': True,
+            })
+        return percent
+
+    def _raw_scores(self, earned, possible, scored, graded):
+        """Build the list of problem Scores for one student."""
+        return [
+            Score(
+                float(earned[column]),
+                float(possible[column]),
+                bool(graded[column]),
+                self.problems[column].display_name_with_default,
+                self.problems[column].location
+            )
+            for column in numpy.nonzero(scored)[0]
+        ]
+
+
+def _nan_array(shape):
+    """Return a float array of the given shape filled with NaN."""
+    array = numpy.empty(shape)
+    array.fill(numpy.nan)
+    return array
+
+
+def _individually_graded_user_ids(course_key):
+    """
+    Return the ids of users holding a role in the course or its org. Their
+    access to problems (staff, beta testers) may differ from other students.
+    """
+    return set(
+        CourseAccessRole.objects.filter(org__iexact=course_key.org).values_list('user_id', flat=True)
+    )
+
+
+def iterate_bulk_grades_for(course_or_id, students, keep_raw_scores=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bulk version of `courseware.grades.iterate_grades_for`, yielding a tuple of
+
+    (student, gradeset, err_msg) for every student in `students`.
+
+    Falls back to `iterate_grades_for` for courses that can't be graded in
+    bulk, and for students with a role in the course.
+    """
+    if isinstance(course_or_id, (basestring, CourseKey)):
+        course = courses.get_course_by_id(course_or_id)
+    else:
+        course = course_or_id
+
+    bulk_grader = BulkCourseGrader(course)
+    if not bulk_grader.eligible:
+        log.info(
+            u"Grading students in course %s individually: %s", course.id, bulk_grader.ineligible_reason
+        )
+        for result in iterate_grades_for(course, students, keep_raw_scores):
+            yield result
+        return
+
+    individually_graded = _individually_graded_user_ids(course.id)
+
+    def grade_chunk(chunk):
+        """Grade a chunk of students, yielding results as iterate_grades_for does."""
+        individual = [student for student in chunk if student.is_staff or student.id in individually_graded]
+        bulk = [student for student in chunk if not (student.is_staff or student.id in individually_graded)]
+
+        if individual:
+            for result in iterate_grades_for(course, individual, keep_raw_scores):
+                yield result
+
+        if not bulk:
+            return
+        with dog_stats_api.timer('lms.grades.iterate_bulk_grades_for', tags=[u'action:{}'.format(course.id)]):
+            try:
+                gradesets = bulk_grader.grade_students(bulk, keep_raw_scores)
+            except Exception as exc:  # pylint: disable=broad-except
+                # Grade these students one by one instead, so that one bad
+                # record doesn't fail the whole chunk.
+                log.exception(u"Bulk grading failed for course %s: %s", course.id, exc.message)
+                for result in iterate_grades_for(course, bulk, keep_raw_scores):
+                    yield result
+                return
+
+        for student, gradeset in zip(bulk, gradesets):
+            GRADES_UPDATED.send_robust(
+                sender=None,
+                username=student.username,
+                grade_summary=gradeset,
+                course_key=course.id,
+                deadline=course.end
+            )
+            yield student, gradeset, ""
+
+    chunk = []
+    for student in students:
+        chunk.append(student)
+        if len(chunk) >= chunk_size:
+            for result in grade_chunk(chunk):
+                yield result
+            chunk = []
+    for result in grade_chunk(chunk):
+        yield result
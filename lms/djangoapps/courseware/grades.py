@@ -1,20 +1,26 @@
 # Compute grades using real division, with no integer truncation
 from __future__ import division
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from functools import partial
+import hashlib
 import json
 import random
 import logging
 
 from contextlib import contextmanager
+from datetime import datetime
 from django.conf import settings
 from django.test.client import RequestFactory
 from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import UTC
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
 from courseware.access import has_access
+from courseware.access_utils import adjust_start_date
 from courseware.model_data import FieldDataCache, ScoresClient
 from student.models import anonymous_id_for_user
 from util.db import outer_atomic
@@ -23,10 +29,10 @@ from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from .models import PersistentSubsectionGrade, StudentModule, SCORE_CHANGED, STUDENT_MODULES_CREATED
 from .module_render import get_module_for_descriptor
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
 
 
@@ -127,6 +133,205 @@ class MaxScoresCache(object):
         return max_score
 
 
+class SubsectionGradeStore(object):
+    """
+    Persisted per-subsection scores for one student in one course.
+
+    Each graded subsection that has been walked for the student is stored as a
+    `PersistentSubsectionGrade` row, tagged with the content version of the
+    course and the student's groups in its user partitions, since both decide
+    which blocks the walk reaches. The receivers at the bottom of this module
+    delete the affected rows whenever one of the student's scores changes, so
+    any row that exists, carries the current version and groups, and has not
+    outlived the start date of a block that was hidden from the student can be
+    used instead of walking the subsection again.
+
+    The store is disabled unless the ENABLE_PERSISTENT_SUBSECTION_GRADES
+    feature is on, and for courses without a content version (old XML courses).
+    """
+    def __init__(self, student, course):
+        self.student = student
+        self.course = course
+        self.course_version = None
+        self.enabled = bool(
+            settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False) and
+            not settings.GENERATE_PROFILE_SCORES and
+            _course_version(course) is not None and
+            student.is_authenticated()
+        )
+        if self.enabled:
+            self.course_version = u'{}/{}'.format(
+                _course_version(course), _user_partition_groups_hash(student, course)
+            )
+        self._rows = None
+
+    def _fetch(self):
+        """
+        Load all of the student's stored subsections for the course in one query.
+        """
+        if self._rows is None:
+            self._rows = {}
+            if self.enabled:
+                for row in PersistentSubsectionGrade.objects.filter(user=self.student, course_id=self.course.id):
+                    self._rows[row.usage_key.map_into_course(self.course.id)] = row
+        return self._rows
+
+    def get(self, section_descriptor):
+        """
+        Return the stored `PersistentSubsectionGrade` for the subsection, or
+        None if it is missing or was computed against older course content.
+        """
+        if not self.enabled:
+            return None
+        row = self._fetch().get(section_descriptor.location)
+        if row is None or row.course_version != self.course_version:
+            return None
+        if row.recompute_after is not None and row.recompute_after <= datetime.now(UTC()):
+            return None
+        return row
+
+    def has_all(self, section_descriptors):
+        """
+        Return True if fresh stored grades exist for every given subsection.
+        """
+        return self.enabled and all(self.get(descriptor) is not None for descriptor in section_descriptors)
+
+    def set(self, section_descriptor, blocks, recompute_after=None):
+        """
+        Persist the block entries (see `_subsection_blocks`) for a subsection.
+        `blocks` is None when the student has not interacted with it yet.
+        `recompute_after` is when a block the student could not yet see opens,
+        after which the stored grade is ignored.
+        """
+        if not self.enabled:
+            return
+        earned = possible = 0.0
+        for __, __, block_earned, block_possible, graded, __ in blocks or []:
+            if graded and block_possible:
+                earned += block_earned
+                possible += block_possible
+        row, __ = PersistentSubsectionGrade.objects.update_or_create(
+            user=self.student,
+            course_id=self.course.id,
+            usage_key=section_descriptor.location,
+            defaults={
+                'course_version': self.course_version,
+                'earned_graded': earned,
+                'possible_graded': possible,
+                'blocks': json.dumps(blocks) if blocks is not None else None,
+                'recompute_after': recompute_after,
+            }
+        )
+        self._fetch()[section_descriptor.location] = row
+
+
+def _course_version(course):
+    """
+    Return a string identifying the published content version of `course`, or
+    None if the course does not track one.
+    """
+    course_version = getattr(course, 'course_version', None)
+    if course_version is not None:
+        return unicode(course_version)
+    if course.subtree_edited_on is None:
+        return None
+    return course.subtree_edited_on.isoformat()
+
+
+def _user_partition_groups_hash(student, course):
+    """
+    Return a digest of the groups `student` is in for each active user
+    partition of `course`.
+    """
+    groups = []
+    for partition in course.user_partitions:
+        if not partition.active:
+            continue
+        group = partition.scheme.get_group_for_user(course.id, student, partition)
+        groups.append(u'{}:{}'.format(partition.id, group.id if group is not None else u''))
+    return hashlib.sha1(u','.join(sorted(groups)).encode('utf-8')).hexdigest()
+
+
+def _always_recalculate_by_section(grading_context):
+    """
+    Map each graded subsection location in `grading_context` to whether it
+    contains problems whose state is updated independently of interaction with
+    the LMS (E.g. combinedopenended ORA1). Those always need to be scored, so
+    they are never read from or written to the grade store.
+    """
+    return {
+        section['section_descriptor'].location: any(
+            descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
+        )
+        for sections in grading_context['graded_sections'].itervalues()
+        for section in sections
+    }
+
+
+def _subsection_blocks(student, section_descriptor, module_creator, scores_client, submissions_scores,
+                       max_scores_cache):
+    """
+    Walk a subsection for a student and return a list of
+    [usage_key, parent, earned, possible, graded, display_name] entries, one
+    for every descendant (including the subsection itself), and the earliest
+    start date among the descendants the student cannot access yet (or None).
+    `earned` and `possible` are None for blocks that are not scored or not
+    accessible.
+    """
+    blocks = []
+    next_start = None
+    now = datetime.now(UTC())
+    for module_descriptor in yield_dynamic_descriptor_descendants(section_descriptor, student.id, module_creator):
+        correct = total = None
+        course_key = module_descriptor.location.course_key
+        if not has_access(student, 'load', module_descriptor, course_key):
+            if module_descriptor.start is not None:
+                start = adjust_start_date(
+                    student, module_descriptor.days_early_for_beta, module_descriptor.start, course_key
+                )
+                if start > now and (next_start is None or start < next_start):
+                    next_start = start
+        else:
+            (correct, total) = get_score(
+                student,
+                module_descriptor,
+                module_creator,
+                scores_client,
+                submissions_scores,
+                max_scores_cache,
+            )
+        parent = module_descriptor.parent
+        blocks.append([
+            unicode(module_descriptor.location),
+            unicode(parent) if parent is not None else None,
+            correct,
+            total,
+            module_descriptor.graded,
+            module_descriptor.display_name_with_default,
+        ])
+    return blocks, next_start
+
+
+def _scores_from_blocks(course_key, blocks, graded=None):
+    """
+    Turn stored block entries into a list of Score objects, skipping blocks
+    without a score. If `graded` is None, the block's own graded flag is used
+    and problems worth zero points are never graded, as in `_grade`.
+    """
+    scores = []
+    for location, __, earned, possible, block_graded, display_name in blocks:
+        if earned is None and possible is None:
+            continue
+        if graded is None:
+            is_graded = block_graded and possible > 0
+        else:
+            is_graded = graded
+        scores.append(
+            Score(earned, possible, is_graded, display_name, UsageKey.from_string(location).map_into_course(course_key))
+        )
+    return scores
+
+
 class ProgressSummary(object):
     """
     Wrapper class for the computation of a user's scores across a course.
@@ -310,8 +515,8 @@ def grade(student, request, course, keep_raw_scores=False, field_data_cache=None
         deadline=course.end
     )
 
-    for receiver, response in responses:
-        log.info('Signal fired when student grade is calculated. Receiver: %s. Response: %s', receiver, response)
+    for signal_receiver, response in responses:
+        log.info('Signal fired when student grade is calculated. Receiver: %s. Response: %s', signal_receiver, response)
 
     return grade_summary
 
@@ -337,34 +542,52 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
 
     More information on the format is in the docstring for CourseGrader.
     """
-    with outer_atomic():
-        if field_data_cache is None:
-            field_data_cache = field_data_cache_for_grading(course, student)
-        if scores_client is None:
-            scores_client = ScoresClient.from_field_data_cache(field_data_cache)
-
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    # We need to import this here to avoid a circular dependency of the form:
-    # XBlock --> submissions --> Django Rest Framework error strings -->
-    # Django translation --> ... --> courseware --> submissions
-    from submissions import api as sub_api  # installed from the edx-submissions repository
+    grading_context = course.grading_context
+    grade_store = SubsectionGradeStore(student, course)
+    always_recalculate = _always_recalculate_by_section(grading_context)
+    stored_sections = [
+        section['section_descriptor']
+        for sections in grading_context['graded_sections'].itervalues()
+        for section in sections
+        if not always_recalculate[section['section_descriptor'].location]
+    ]
+
+    # When every subsection can be read from the grade store, we don't need to
+    # load any student state at all.
+    load_student_state = not (
+        len(stored_sections) == len(always_recalculate) and grade_store.has_all(stored_sections)
+    )
 
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(),
-            anonymous_id_for_user(student, course.id)
-        )
-        max_scores_cache = MaxScoresCache.create_for_course(course)
+    submissions_scores = {}
+    max_scores_cache = None
+    if load_student_state:
+        with outer_atomic():
+            if field_data_cache is None:
+                field_data_cache = field_data_cache_for_grading(course, student)
+            if scores_client is None:
+                scores_client = ScoresClient.from_field_data_cache(field_data_cache)
+
+        # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
+        # scores that were registered with the submissions API, which for the moment
+        # means only openassessment (edx-ora2)
+        # We need to import this here to avoid a circular dependency of the form:
+        # XBlock --> submissions --> Django Rest Framework error strings -->
+        # Django translation --> ... --> courseware --> submissions
+        from submissions import api as sub_api  # installed from the edx-submissions repository
+
+        with outer_atomic():
+            submissions_scores = sub_api.get_scores(
+                course.id.to_deprecated_string(),
+                anonymous_id_for_user(student, course.id)
+            )
+            max_scores_cache = MaxScoresCache.create_for_course(course)
 
-        # For the moment, we have to get scorable_locations from field_data_cache
-        # and not from scores_client, because scores_client is ignorant of things
-        # in the submissions API. As a further refactoring step, submissions should
-        # be hidden behind the ScoresClient.
-        max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
+            # For the moment, we have to get scorable_locations from field_data_cache
+            # and not from scores_client, because scores_client is ignorant of things
+            # in the submissions API. As a further refactoring step, submissions should
+            # be hidden behind the ScoresClient.
+            max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
 
-    grading_context = course.grading_context
     raw_scores = []
 
     totaled_scores = {}
@@ -375,6 +598,22 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
         for section in sections:
             section_descriptor = section['section_descriptor']
             section_name = section_descriptor.display_name_with_default
+            use_store = grade_store.enabled and not always_recalculate[section_descriptor.location]
+            stored_grade = grade_store.get(section_descriptor) if use_store else None
+
+            if stored_grade is not None:
+                blocks = stored_grade.get_blocks()
+                if blocks is not None:
+                    scores = _scores_from_blocks(course.id, blocks)
+                    __, graded_total = graders.aggregate_scores(scores, section_name)
+                    if keep_raw_scores:
+                        raw_scores += scores
+                else:
+                    graded_total = Score(0.0, 1.0, True, section_name, None)
+
+                if graded_total.possible > 0:
+                    format_scores.append(graded_total)
+                continue
 
             with outer_atomic():
                 # some problems have state that is updated independently of interaction
@@ -382,9 +621,7 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
                 # TODO This block is causing extra savepoints to be fired that are empty because no queries are executed
                 # during the loop. When refactoring this code please keep this outer_atomic call in mind and ensure we
                 # are not making unnecessary database queries.
-                should_grade_section = any(
-                    descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
-                )
+                should_grade_section = always_recalculate[section_descriptor.location]
 
                 # If there are no problems that always have to be regraded, check to
                 # see if any of our locations are in the scores from the submissions
@@ -414,50 +651,67 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
                             student, request, descriptor, field_data_cache, course.id, course=course
                         )
 
-                    descendants = yield_dynamic_descriptor_descendants(section_descriptor, student.id, create_module)
-                    for module_descriptor in descendants:
-                        user_access = has_access(
-                            student, 'load', module_descriptor, module_descriptor.location.course_key
-                        )
-                        if not user_access:
-                            continue
-
-                        (correct, total) = get_score(
+                    if use_store:
+                        blocks, recompute_after = _subsection_blocks(
                             student,
-                            module_descriptor,
+                            section_descriptor,
                             create_module,
                             scores_client,
                             submissions_scores,
                             max_scores_cache,
                         )
-                        if correct is None and total is None:
-                            continue
-
-                        if settings.GENERATE_PROFILE_SCORES:    # for debugging!
-                            if total > 1:
-                                correct = random.randrange(max(total - 2, 1), total + 1)
-                            else:
-                                correct = total
-
-                        graded = module_descriptor.graded
-                        if not total > 0:
-                            # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                            graded = False
-
-                        scores.append(
-                            Score(
-                                correct,
-                                total,
-                                graded,
-                                module_descriptor.display_name_with_default,
-                                module_descriptor.location
-                            )
+                        grade_store.set(section_descriptor, blocks, recompute_after)
+                        scores = _scores_from_blocks(course.id, blocks)
+                    else:
+                        descendants = yield_dynamic_descriptor_descendants(
+                            section_descriptor, student.id, create_module
                         )
+                        for module_descriptor in descendants:
+                            user_access = has_access(
+                                student, 'load', module_descriptor, module_descriptor.location.course_key
+                            )
+                            if not user_access:
+                                continue
+
+                            (correct, total) = get_score(
+                                student,
+                                module_descriptor,
+                                create_module,
+                                scores_client,
+                                submissions_scores,
+                                max_scores_cache,
+                            )
+                            if correct is None and total is None:
+                                continue
+
+                            if settings.GENERATE_PROFILE_SCORES:    # for debugging!
+                                if total > 1:
+                                    correct = random.randrange(max(total - 2, 1), total + 1)
+                                else:
+                                    correct = total
+
+                            graded = module_descriptor.graded
+                            if not total > 0:
+                                # We simply cannot grade a problem that is 12/0, because we might need it as a
+                                # percentage
+                                graded = False
+
+                            scores.append(
+                                Score(
+                                    correct,
+                                    total,
+                                    graded,
+                                    module_descriptor.display_name_with_default,
+                                    module_descriptor.location
+                                )
+                            )
 
                     __, graded_total = graders.aggregate_scores(scores, section_name)
                     if keep_raw_scores:
                         raw_scores += scores
                 else:
+                    if use_store:
+                        grade_store.set(section_descriptor, None)
                     graded_total = Score(0.0, 1.0, True, section_name, None)
 
                 #Add the graded total to totaled_scores
@@ -488,7 +742,8 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
             # so grader can be double-checked
             grade_summary['raw_scores'] = raw_scores
 
-        max_scores_cache.push_to_remote()
+        if max_scores_cache is not None:
+            max_scores_cache.push_to_remote()
 
     return grade_summary
 
@@ -589,6 +844,17 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
         # be hidden behind the ScoresClient.
         max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
 
+    # Graded subsections are read from and written to the grade store, unless
+    # they contain problems that always need to be recalculated.
+    grade_store = SubsectionGradeStore(student, course)
+    storable_sections = set()
+    if grade_store.enabled:
+        storable_sections = {
+            location
+            for location, recalculate in _always_recalculate_by_section(course.grading_context).iteritems()
+            if not recalculate
+        }
+
     chapters = []
     locations_to_children = defaultdict(list)
     locations_to_weighted_scores = {}
@@ -610,31 +876,53 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
 
                 module_creator = section_module.xmodule_runtime.get_module
 
-                for module_descriptor in yield_dynamic_descriptor_descendants(
-                        section_module, student.id, module_creator
-                ):
-                    locations_to_children[module_descriptor.parent].append(module_descriptor.location)
-                    (correct, total) = get_score(
-                        student,
-                        module_descriptor,
-                        module_creator,
-                        scores_client,
-                        submissions_scores,
-                        max_scores_cache,
-                    )
-                    if correct is None and total is None:
-                        continue
-
-                    weighted_location_score = Score(
-                        correct,
-                        total,
-                        graded,
-                        module_descriptor.display_name_with_default,
-                        module_descriptor.location
-                    )
+                if section_module.location in storable_sections:
+                    stored_grade = grade_store.get(section_module)
+                    blocks = stored_grade.get_blocks() if stored_grade is not None else None
+                    if blocks is None:
+                        blocks, recompute_after = _subsection_blocks(
+                            student,
+                            section_module,
+                            module_creator,
+                            scores_client,
+                            submissions_scores,
+                            max_scores_cache,
+                        )
+                        grade_store.set(section_module, blocks, recompute_after)
+
+                    for location, parent, __, __, __, __ in blocks:
+                        if parent is not None:
+                            parent = UsageKey.from_string(parent).map_into_course(course.id)
+                        locations_to_children[parent].append(UsageKey.from_string(location).map_into_course(course.id))
+                    scores = _scores_from_blocks(course.id, blocks, graded=graded)
+                    for weighted_location_score in scores:
+                        locations_to_weighted_scores[weighted_location_score.module_id] = weighted_location_score
+                else:
+                    for module_descriptor in yield_dynamic_descriptor_descendants(
+                            section_module, student.id, module_creator
+                    ):
+                        locations_to_children[module_descriptor.parent].append(module_descriptor.location)
+                        (correct, total) = get_score(
+                            student,
+                            module_descriptor,
+                            module_creator,
+                            scores_client,
+                            submissions_scores,
+                            max_scores_cache,
+                        )
+                        if correct is None and total is None:
+                            continue
 
-                    scores.append(weighted_location_score)
-                    locations_to_weighted_scores[module_descriptor.location] = weighted_location_score
+                        weighted_location_score = Score(
+                            correct,
+                            total,
+                            graded,
+                            module_descriptor.display_name_with_default,
+                            module_descriptor.location
+                        )
+
+                        scores.append(weighted_location_score)
+                        locations_to_weighted_scores[module_descriptor.location] = weighted_location_score
 
                 scores.reverse()
                 section_total, _ = graders.aggregate_scores(
@@ -808,3 +1096,111 @@ def _get_mock_request(student):
     request = RequestFactory().get('/')
     request.user = student
     return request
+
+
+def _block_ancestors(usage_keys):
+    """
+    Return a dict mapping each of `usage_keys` to the list of it and all of
+    its ancestors, or to None if its position in the course can't be
+    determined. The parent of each block is looked up only once.
+    """
+    parents = {}
+    ancestors = {}
+    for usage_key in set(usage_keys):
+        ancestors[usage_key] = []
+        location = usage_key
+        try:
+            while location is not None:
+                ancestors[usage_key].append(location)
+                if location not in parents:
+                    parents[location] = modulestore().get_parent_location(location)
+                location = parents[location]
+        except ItemNotFoundError:
+            ancestors[usage_key] = None
+    return ancestors
+
+
+def invalidate_subsection_grades(blocks):
+    """
+    Delete the stored subsection grades that contain the given blocks.
+
+    `blocks` is an iterable of (user_id, course_key, usage_key) tuples. One
+    delete is issued for each user and course. If a block's position in the
+    course can't be determined, all of its user's stored grades for the course
+    are deleted instead.
+    """
+    blocks = list(blocks)
+    ancestors = _block_ancestors(usage_key for __, __, usage_key in blocks)
+    usage_keys_by_user_course = OrderedDict()
+    for user_id, course_key, usage_key in blocks:
+        usage_keys = usage_keys_by_user_course.setdefault((user_id, course_key), set())
+        if usage_keys is None:
+            continue
+        if ancestors[usage_key] is None:
+            usage_keys_by_user_course[(user_id, course_key)] = None
+        else:
+            usage_keys.update(ancestors[usage_key])
+
+    for (user_id, course_key), usage_keys in usage_keys_by_user_course.iteritems():
+        PersistentSubsectionGrade.invalidate(user_id, course_key, usage_keys)
+
+
+@receiver(SCORE_CHANGED)
+def score_changed_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume signals that indicate score changes, and drop the stored grades of
+    the subsection containing the scored block. See the definition of
+    courseware.models.SCORE_CHANGED for a description of the signal.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False):
+        return
+    user_id = kwargs.get('user_id', None)
+    course_id = kwargs.get('course_id', None)
+    usage_id = kwargs.get('usage_id', None)
+    if None in (user_id, course_id, usage_id):
+        return
+    try:
+        course_key = CourseKey.from_string(course_id)
+        usage_key = UsageKey.from_string(usage_id).map_into_course(course_key)
+    except InvalidKeyError:
+        log.warning(u"Unable to invalidate stored grades for course %s, block %s", course_id, usage_id)
+        return
+    invalidate_subsection_grades([(user_id, course_key, usage_key)])
+
+
+@receiver(post_save, sender=StudentModule)
+@receiver(post_delete, sender=StudentModule)
+def student_module_changed_handler(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drop the stored grades of the subsection containing a block whose state
+    was just created or deleted, since that changes whether the subsection
+    counts as attempted. Score updates are handled by `score_changed_handler`.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False):
+        return
+    if kwargs.get('created', True):
+        invalidate_subsection_grades([_student_module_block(instance)])
+
+
+@receiver(STUDENT_MODULES_CREATED)
+def student_modules_created_handler(sender, instances, **kwargs):  # pylint: disable=unused-argument
+    """
+    Bulk counterpart of `student_module_changed_handler`, for StudentModules
+    that were inserted without sending post_save.
+    """
+    if not settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False):
+        return
+    invalidate_subsection_grades(_student_module_block(instance) for instance in instances)
+
+
+def _student_module_block(instance):
+    """
+    Return the (user_id, course_key, usage_key) of the block whose state is
+    stored in the StudentModule `instance`, as `invalidate_subsection_grades`
+    expects it.
+    """
+    return (
+        instance.student_id,
+        instance.course_id,
+        instance.module_state_key.map_into_course(instance.course_id),
+    )
@@ -0,0 +1,73 @@
+"""
+Copy the scores of existing StudentModule rows into StudentModuleScore.
+
+Run this once after turning on the ENABLE_STUDENT_MODULE_SCORE_INDEX feature,
+and before turning on READ_STUDENT_MODULE_SCORE_INDEX. It is safe to run
+again: every index row in a batch is rewritten from its StudentModule.
+"""
+
+import logging
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from courseware.models import StudentModule, StudentModuleScore
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Backfill StudentModuleScore from StudentModule.
+    """
+    help = __doc__.strip()
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--batch',
+            type='int',
+            default=1000,
+            help="Number of StudentModule ids to copy in a transaction.",
+        ),
+        make_option(
+            '--start',
+            type='int',
+            default=0,
+            help="StudentModule id to start from, to resume an interrupted run.",
+        ),
+        make_option(
+            '--sleep',
+            type='float',
+            default=0,
+            help="Seconds to sleep between batches.",
+        ),
+    )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch']
+        max_id = StudentModule.objects.aggregate(Max('id'))['id__max'] or 0
+
+        for start in xrange(options['start'], max_id + 1, batch_size):
+            copied = backfill_student_module_scores(start, start + batch_size)
+            log.info("Copied %d scores of StudentModules %d to %d", copied, start, start + batch_size - 1)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+
+def backfill_student_module_scores(start, end):
+    """
+    Rewrite the index rows of the StudentModules with ids in [start, end).
+
+    Returns the number of rows written.
+    """
+    with transaction.atomic():
+        student_modules = StudentModule.objects.filter(id__gte=start, id__lt=end).only(
+            'id', 'student', 'course_id', 'module_state_key', 'grade', 'max_grade', 'modified',
+        )
+        scores = [StudentModuleScore.for_student_module(student_module) for student_module in student_modules]
+        StudentModuleScore.objects.filter(student_module_id__gte=start, student_module_id__lt=end).delete()
+        StudentModuleScore.objects.bulk_create(scores)
+    return len(scores)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.conf import settings
+import xmodule_django.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('courseware', '0002_persistentsubsectiongrade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentModuleScore',
+            fields=[
+                ('student_module', models.OneToOneField(related_name='score_index', primary_key=True, serialize=False, to='courseware.StudentModule')),
+                ('course_id', xmodule_django.models.CourseKeyField(max_length=255, db_index=True)),
+                ('module_state_key', xmodule_django.models.LocationKeyField(max_length=255, db_column=b'module_id')),
+                ('earned', models.FloatField(null=True, blank=True)),
+                ('possible', models.FloatField(null=True, blank=True)),
+                ('modified', models.DateTimeField()),
+                ('student', models.ForeignKey(to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='studentmodulescore',
+            index_together=set([('student', 'course_id')]),
+        ),
+    ]
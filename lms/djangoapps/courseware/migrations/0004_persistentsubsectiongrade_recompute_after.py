@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0003_studentmodulescore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='persistentsubsectiongrade',
+            name='recompute_after',
+            field=models.DateTimeField(null=True, blank=True),
+        ),
+    ]
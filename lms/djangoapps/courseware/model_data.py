@@ -26,6 +26,8 @@ from abc import abstractmethod, ABCMeta
 from collections import defaultdict, namedtuple
 from .models import (
     StudentModule,
+    StudentModuleScore,
+    read_from_score_index,
     XModuleUserStateSummaryField,
     XModuleStudentPrefsField,
     XModuleStudentInfoField
@@ -952,18 +954,24 @@ class ScoresClient(object):
 
     def fetch_scores(self, locations):
         """Grab score information."""
-        scores_qset = StudentModule.objects.filter(
-            student_id=self.user_id,
-            course_id=self.course_key,
-            module_state_key__in=set(locations),
-        )
+        if read_from_score_index():
+            scores_qset = StudentModuleScore.objects.filter(
+                student_id=self.user_id,
+                course_id=self.course_key,
+                module_state_key__in=set(locations),
+            ).values_list('module_state_key', 'earned', 'possible')
+        else:
+            scores_qset = StudentModule.objects.filter(
+                student_id=self.user_id,
+                course_id=self.course_key,
+                module_state_key__in=set(locations),
+            ).values_list('module_state_key', 'grade', 'max_grade')
         # Locations in StudentModule don't necessarily have course key info
         # attached to them (since old mongo identifiers don't include runs).
         # So we have to add that info back in before we put it into our lookup.
         self._locations_to_scores.update({
             UsageKey.from_string(location).map_into_course(self.course_key): self.Score(correct, total)
-            for location, correct, total
-            in scores_qset.values_list('module_state_key', 'grade', 'max_grade')
+            for location, correct, total in scores_qset
         })
         self._has_fetched = True
 
@@ -12,20 +12,23 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
-import logging
 import itertools
+import json
+import logging
+from collections import namedtuple
 
+import numpy
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
 
-from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField
+from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField, UsageKeyField
 log = logging.getLogger(__name__)
 
 log = logging.getLogger("edx.courseware")
@@ -149,6 +152,11 @@ class StudentModule(models.Model):
         return unicode(repr(self))
 
 
+# Signal sent with the StudentModules that were inserted in bulk, as bulk
+# inserts don't send post_save for the rows they create.
+STUDENT_MODULES_CREATED = Signal(providing_args=['instances'])
+
+
 class StudentModuleHistory(models.Model):
     """Keeps a complete history of state changes for a given XModule for a given
     Student. Right now, we restrict this to problems so that the table doesn't
@@ -177,18 +185,202 @@ class StudentModuleHistory(models.Model):
         we save.
         """
         if instance.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
-            history_entry = StudentModuleHistory(student_module=instance,
-                                                 version=None,
-                                                 created=instance.modified,
-                                                 state=instance.state,
-                                                 grade=instance.grade,
-                                                 max_grade=instance.max_grade)
+            history_entry = StudentModuleHistory.for_student_module(instance)
             history_entry.save()
 
+    @classmethod
+    def for_student_module(cls, student_module):
+        """
+        Returns an unsaved history entry recording the current state of
+        `student_module`.
+        """
+        return cls(
+            student_module=student_module,
+            version=None,
+            created=student_module.modified,
+            state=student_module.state,
+            grade=student_module.grade,
+            max_grade=student_module.max_grade,
+        )
+
     def __unicode__(self):
         return unicode(repr(self))
 
 
+# Columns of the scores read from StudentModuleScore in bulk. `user_ids`,
+# `earned` and `possible` are NumPy arrays, with NaN for missing scores.
+ScoreArrays = namedtuple('ScoreArrays', 'user_ids usage_keys earned possible modified')
+
+
+class StudentModuleScore(models.Model):
+    """
+    Narrow copy of the score columns of StudentModule, one row per
+    StudentModule, so that the scores of a whole course or user can be read
+    without scanning StudentModule rows and their state.
+
+    Rows are maintained from StudentModule's signals while the
+    ENABLE_STUDENT_MODULE_SCORE_INDEX feature is on, and existing rows can be
+    copied over with the `backfill_student_module_scores` command.
+    """
+    objects = ChunkingManager()
+
+    student_module = models.OneToOneField(StudentModule, primary_key=True, related_name='score_index')
+    student = models.ForeignKey(User)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_column='module_id')
+
+    earned = models.FloatField(null=True, blank=True)
+    possible = models.FloatField(null=True, blank=True)
+    modified = models.DateTimeField()
+
+    class Meta(object):
+        app_label = "courseware"
+        index_together = (('student', 'course_id'),)
+
+    @classmethod
+    def for_student_module(cls, student_module):
+        """
+        Returns an unsaved index row holding the current score of `student_module`.
+        """
+        return cls(
+            student_module_id=student_module.id,
+            student_id=student_module.student_id,
+            course_id=student_module.course_id,
+            module_state_key=student_module.module_state_key,
+            earned=student_module.grade,
+            possible=student_module.max_grade,
+            modified=student_module.modified,
+        )
+
+    @classmethod
+    def read_course(cls, course_key, user_ids=None):
+        """
+        Read the scores of every user in `course_key`, or only of the users in
+        `user_ids`, as :class:`ScoreArrays`.
+        """
+        rows = cls._read_only().filter(course_id=course_key)
+        if user_ids is not None:
+            # Chunked, as chunked_filter does, to stay within the query
+            # parameter limits of sqlite3.
+            rows = [rows.filter(student_id__in=chunk) for chunk in chunks(user_ids, 500)]
+        return cls._to_arrays(course_key, rows)
+
+    @classmethod
+    def read_user(cls, user_id, course_key):
+        """
+        Read the scores of `user_id` in `course_key` as :class:`ScoreArrays`.
+        """
+        return cls._to_arrays(course_key, cls._read_only().filter(student_id=user_id, course_id=course_key))
+
+    @classmethod
+    def _read_only(cls):
+        """
+        Return the manager to read from, using a read replica if one exists
+        for this environment.
+        """
+        if "read_replica" in settings.DATABASES:
+            return cls.objects.db_manager("read_replica")
+        return cls.objects
+
+    @staticmethod
+    def _to_arrays(course_key, querysets):
+        """
+        Stream the score columns of `querysets` (a queryset, or a list of
+        them) into :class:`ScoreArrays`.
+        """
+        if isinstance(querysets, models.QuerySet):
+            querysets = [querysets]
+
+        user_ids, usage_keys, earned, possible, modified = [], [], [], [], []
+        for queryset in querysets:
+            for row in queryset.values_list(
+                    'student_id', 'module_state_key', 'earned', 'possible', 'modified'
+            ).iterator():
+                user_ids.append(row[0])
+                # Old mongo locations don't include the course run
+                usage_keys.append(row[1].map_into_course(course_key))
+                earned.append(numpy.nan if row[2] is None else row[2])
+                possible.append(numpy.nan if row[3] is None else row[3])
+                modified.append(row[4])
+
+        return ScoreArrays(
+            numpy.array(user_ids, dtype=numpy.int64),
+            usage_keys,
+            numpy.array(earned, dtype=numpy.float64),
+            numpy.array(possible, dtype=numpy.float64),
+            modified,
+        )
+
+    def __unicode__(self):
+        return u"[StudentModuleScore] {}: {} {} ({}/{})".format(
+            self.student_id, self.course_id, self.module_state_key, self.earned, self.possible
+        )
+
+
+def score_index_enabled():
+    """
+    Returns whether StudentModuleScore rows are maintained.
+    """
+    return settings.FEATURES.get('ENABLE_STUDENT_MODULE_SCORE_INDEX', False)
+
+
+def read_from_score_index():
+    """
+    Returns whether scores should be read from StudentModuleScore rather
+    than from StudentModule.
+    """
+    return score_index_enabled() and settings.FEATURES.get('READ_STUDENT_MODULE_SCORE_INDEX', False)
+
+
+@receiver(post_init, sender=StudentModule)
+def remember_indexed_score(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Remember the score a StudentModule was loaded with, so that saving it
+    only writes its StudentModuleScore when the score changed.
+    """
+    instance._indexed_score = (instance.grade, instance.max_grade)  # pylint: disable=protected-access
+
+
+@receiver(post_save, sender=StudentModule)
+def update_score_index(sender, instance, created, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """
+    Write the StudentModuleScore of a StudentModule that was created or
+    whose score changed. Index rows are deleted along with their StudentModule.
+    """
+    if raw or not score_index_enabled():
+        return
+    score = (instance.grade, instance.max_grade)
+    if created or score != getattr(instance, '_indexed_score', None):
+        StudentModuleScore.for_student_module(instance).save(force_insert=created)
+        instance._indexed_score = score  # pylint: disable=protected-access
+
+
+@receiver(STUDENT_MODULES_CREATED)
+def index_created_student_modules(sender, instances, **kwargs):  # pylint: disable=unused-argument
+    """
+    Write the StudentModuleScores of StudentModules that were inserted in bulk.
+    """
+    if not score_index_enabled() or not instances:
+        return
+
+    # Bulk inserts don't return the ids of the new rows, so read them back.
+    by_student_and_course = itertools.groupby(
+        sorted(instances, key=lambda instance: (instance.student_id, unicode(instance.course_id))),
+        lambda instance: (instance.student_id, instance.course_id),
+    )
+    for (student_id, course_id), student_modules in by_student_and_course:
+        created = StudentModule.objects.chunked_filter(
+            'module_state_key__in',
+            [student_module.module_state_key for student_module in student_modules],
+            student_id=student_id,
+            course_id=course_id,
+        )
+        StudentModuleScore.objects.bulk_create(
+            [StudentModuleScore.for_student_module(student_module) for student_module in created],
+            batch_size=500,
+        )
+
+
 class XBlockFieldBase(models.Model):
     """
     Base class for all XBlock field storage.
@@ -295,6 +487,67 @@ class OfflineComputedGradeLog(models.Model):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    Stores the per-block scores a user earned in a single graded subsection,
+    so that course grades can be re-aggregated without walking the course tree
+    and instantiating XModules again. See `courseware.grades.SubsectionGradeStore`.
+
+    Rows are deleted whenever a score inside the subsection changes, and are
+    ignored when `course_version` no longer matches the published course and
+    the user's partition groups, or once `recompute_after` has passed.
+    """
+    objects = ChunkingManager()
+
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = UsageKeyField(max_length=255)
+
+    # Version of the course content and digest of the user's partition groups
+    # these scores were computed against
+    course_version = models.CharField(max_length=255, blank=True)
+
+    # Start date of the first block in the subsection that was hidden from the
+    # user when these scores were computed
+    recompute_after = models.DateTimeField(null=True, blank=True)
+
+    # Totals of the graded problems in the subsection, for reporting
+    earned_graded = models.FloatField(default=0.0)
+    possible_graded = models.FloatField(default=0.0)
+
+    # JSON list of [usage_key, parent, earned, possible, graded, display_name]
+    # entries, one per descendant of the subsection. Null if the user has not
+    # yet interacted with anything in the subsection.
+    blocks = models.TextField(null=True, blank=True)
+
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    def get_blocks(self):
+        """
+        Return the decoded list of block entries, or None if the user had not
+        interacted with the subsection when it was stored.
+        """
+        return json.loads(self.blocks) if self.blocks is not None else None
+
+    @classmethod
+    def invalidate(cls, user_id, course_id, usage_keys=None):
+        """
+        Delete the stored grades for `user_id` in `course_id`. If `usage_keys`
+        is given, only the subsections in that list are removed.
+        """
+        queryset = cls.objects.filter(user_id=user_id, course_id=course_id)
+        if usage_keys is not None:
+            queryset = queryset.filter(usage_key__in=usage_keys)
+        queryset.delete()
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} {} ({}/{})".format(
+            self.user_id, self.course_id, self.usage_key, self.earned_graded, self.possible_graded
+        )
+
+
 class StudentFieldOverride(TimeStampedModel):
     """
     Holds the value of a specific field overriden for a student.  This is used
@@ -0,0 +1,102 @@
+"""
+Tests for bulk grading of a whole course.
+"""
+from mock import patch
+
+from courseware.bulk_grades import BulkCourseGrader, iterate_bulk_grades_for
+from courseware.grades import iterate_grades_for
+from courseware.model_data import set_score
+from student.models import CourseEnrollment
+from student.roles import CourseBetaTesterRole
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+
+class TestBulkGrades(ModuleStoreTestCase):
+    """
+    Bulk grading should produce the same grades as grading students one by one.
+    """
+    def setUp(self):
+        super(TestBulkGrades, self).setUp()
+        self.course = CourseFactory.create(
+            grading_policy={
+                "GRADER": [
+                    {"type": "Homework", "min_count": 3, "drop_count": 1, "short_label": "HW", "weight": 0.6},
+                    {"type": "Final", "name": "Final Exam", "short_label": "Final", "weight": 0.4},
+                ],
+                "GRADE_CUTOFFS": {"Pass": 0.5},
+            }
+        )
+        chapter = ItemFactory.create(category='chapter', parent=self.course)
+        self.problems = []
+        for index in xrange(2):
+            sequential = ItemFactory.create(
+                category='sequential', parent=chapter, graded=True, format='Homework',
+                display_name='Homework {}'.format(index)
+            )
+            vertical = ItemFactory.create(category='vertical', parent=sequential)
+            self.problems.append(ItemFactory.create(category='problem', parent=vertical))
+            self.problems.append(ItemFactory.create(category='problem', parent=vertical, metadata={'weight': 5}))
+        final = ItemFactory.create(
+            category='sequential', parent=chapter, graded=True, format='Final', display_name='Final Exam'
+        )
+        vertical = ItemFactory.create(category='vertical', parent=final)
+        self.problems.append(ItemFactory.create(category='problem', parent=vertical))
+        self.course = self.store.get_course(self.course.id)
+
+        self.students = [UserFactory.create() for __ in xrange(4)]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+
+        # Student 0 never attempts anything, the others attempt a varying
+        # number of problems.
+        for index, student in enumerate(self.students[1:], start=1):
+            for problem in self.problems[:index * 2]:
+                set_score(student.id, problem.location, index % 2, 1)
+
+    def _gradesets(self, iterator):
+        """Map student ids to gradesets."""
+        return {student.id: gradeset for student, gradeset, __ in iterator}
+
+    def assert_same_grades(self, expected, actual):
+        """Compare the parts of two gradesets that bulk grading produces."""
+        self.assertEqual(expected['percent'], actual['percent'])
+        self.assertEqual(expected['grade'], actual['grade'])
+        self.assertEqual(
+            [(section['label'], section['percent']) for section in expected['section_breakdown']],
+            [(section['label'], section['percent']) for section in actual['section_breakdown']],
+        )
+        self.assertEqual(
+            sorted((unicode(score.module_id), score.earned, score.possible, score.graded)
+                   for score in expected['raw_scores']),
+            sorted((unicode(score.module_id), score.earned, score.possible, score.graded)
+                   for score in actual['raw_scores']),
+        )
+
+    def test_course_is_eligible(self):
+        self.assertTrue(BulkCourseGrader(self.course).eligible)
+
+    def test_matches_individual_grading(self):
+        expected = self._gradesets(iterate_grades_for(self.course, self.students, keep_raw_scores=True))
+        actual = self._gradesets(
+            iterate_bulk_grades_for(self.course, self.students, keep_raw_scores=True, chunk_size=3)
+        )
+        self.assertEqual(set(expected), set(actual))
+        for student_id in expected:
+            self.assert_same_grades(expected[student_id], actual[student_id])
+
+    def test_ineligible_course_grades_individually(self):
+        with patch.object(BulkCourseGrader, '_ineligible_reason', return_value=u"testing"):
+            with patch('courseware.bulk_grades.iterate_grades_for', wraps=iterate_grades_for) as mock_iterate:
+                results = list(iterate_bulk_grades_for(self.course, self.students))
+        mock_iterate.assert_called_once_with(self.course, self.students, False)
+        self.assertEqual(len(results), len(self.students))
+
+    def test_course_roles_grade_individually(self):
+        beta_tester = self.students[2]
+        CourseBetaTesterRole(self.course.id).add_users(beta_tester)
+        with patch('courseware.bulk_grades.iterate_grades_for', wraps=iterate_grades_for) as mock_iterate:
+            results = list(iterate_bulk_grades_for(self.course, self.students))
+        mock_iterate.assert_called_once_with(self.course, [beta_tester], False)
+        self.assertEqual(len(results), len(self.students))
@@ -1,6 +1,9 @@
 """
 Test grade calculation.
 """
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
@@ -9,8 +12,13 @@ from mock import patch, MagicMock
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator
+from pytz import UTC
 
-from courseware.grades import field_data_cache_for_grading, grade, iterate_grades_for, MaxScoresCache, ProgressSummary
+from courseware.grades import (
+    field_data_cache_for_grading, grade, iterate_grades_for, progress_summary, MaxScoresCache, ProgressSummary
+)
+from courseware.model_data import set_score
+from courseware.models import PersistentSubsectionGrade, StudentModule, SCORE_CHANGED, STUDENT_MODULES_CREATED
 from student.tests.factories import UserFactory
 from student.models import CourseEnrollment
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -169,6 +177,134 @@ class TestMaxScoresCache(ModuleStoreTestCase):
         self.assertEqual(max_scores_cache.num_cached_from_remote(), 1)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_SUBSECTION_GRADES': True})
+class TestPersistentSubsectionGrades(ModuleStoreTestCase):
+    """
+    Tests that subsection grades are stored, reused and invalidated.
+    """
+    def setUp(self):
+        super(TestPersistentSubsectionGrades, self).setUp()
+        self.student = UserFactory.create()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(category='chapter', parent=self.course)
+        self.sequential = ItemFactory.create(
+            category='sequential', parent=chapter, graded=True, format='Homework'
+        )
+        self.vertical = ItemFactory.create(category='vertical', parent=self.sequential)
+        self.problem = ItemFactory.create(category='problem', parent=self.vertical)
+        self.course = self.store.get_course(self.course.id)
+
+        CourseEnrollment.enroll(self.student, self.course.id)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+
+    def _stored_grade(self):
+        """Return the stored grade for the sequential, or None."""
+        try:
+            return PersistentSubsectionGrade.objects.get(
+                user=self.student, course_id=self.course.id, usage_key=self.sequential.location
+            )
+        except PersistentSubsectionGrade.DoesNotExist:
+            return None
+
+    def test_unattempted_subsection_is_stored(self):
+        grade(self.student, self.request, self.course)
+        stored_grade = self._stored_grade()
+        self.assertIsNotNone(stored_grade)
+        self.assertIsNone(stored_grade.get_blocks())
+
+    def test_grade_stores_subsection_scores(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        stored_grade = self._stored_grade()
+        self.assertEqual(stored_grade.earned_graded, 1.0)
+        self.assertEqual(stored_grade.possible_graded, 2.0)
+
+    def test_stored_grades_skip_student_state(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        first_summary = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        with patch('courseware.grades.field_data_cache_for_grading') as mock_field_data_cache:
+            second_summary = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        self.assertFalse(mock_field_data_cache.called)
+        self.assertEqual(first_summary['percent'], second_summary['percent'])
+        self.assertEqual(first_summary['raw_scores'], second_summary['raw_scores'])
+
+    def test_progress_summary_uses_stored_grades(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        with patch('courseware.grades.get_score') as mock_get_score:
+            chapters = progress_summary(self.student, self.request, self.course)
+        self.assertFalse(mock_get_score.called)
+        section_total = chapters[0]['sections'][0]['section_total']
+        self.assertEqual((section_total.earned, section_total.possible), (1.0, 2.0))
+
+    def test_score_change_invalidates_subsection(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        self.assertIsNotNone(self._stored_grade())
+        SCORE_CHANGED.send(
+            sender=None,
+            points_possible=2,
+            points_earned=2,
+            user_id=self.student.id,
+            course_id=unicode(self.course.id),
+            usage_id=unicode(self.problem.location)
+        )
+        self.assertIsNone(self._stored_grade())
+
+    def test_created_student_modules_invalidate_with_one_delete(self):
+        grade(self.student, self.request, self.course)
+        self.assertIsNotNone(self._stored_grade())
+        instances = [
+            StudentModule(student=self.student, course_id=self.course.id, module_state_key=location)
+            for location in (self.problem.location, self.vertical.location)
+        ]
+        invalidate = PersistentSubsectionGrade.invalidate
+        get_parent_location = self.store.get_parent_location
+        with patch.object(PersistentSubsectionGrade, 'invalidate', wraps=invalidate) as mock_invalidate:
+            with patch.object(self.store, 'get_parent_location', wraps=get_parent_location) as mock_parent:
+                STUDENT_MODULES_CREATED.send(sender=None, instances=instances)
+        self.assertEqual(mock_invalidate.call_count, 1)
+        # problem, vertical, sequential, chapter and course
+        self.assertEqual(mock_parent.call_count, 5)
+        self.assertIsNone(self._stored_grade())
+
+    def test_stale_course_version_is_recomputed(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        PersistentSubsectionGrade.objects.filter(user=self.student).update(course_version='stale', earned_graded=0)
+        grade(self.student, self.request, self.course)
+        stored_grade = self._stored_grade()
+        self.assertNotEqual(stored_grade.course_version, 'stale')
+        self.assertEqual(stored_grade.earned_graded, 1.0)
+
+    def test_partition_group_change_is_recomputed(self):
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        PersistentSubsectionGrade.objects.filter(user=self.student).update(earned_graded=0)
+        with patch('courseware.grades._user_partition_groups_hash', return_value='other groups'):
+            grade(self.student, self.request, self.course)
+        stored_grade = self._stored_grade()
+        self.assertTrue(stored_grade.course_version.endswith('/other groups'))
+        self.assertEqual(stored_grade.earned_graded, 1.0)
+
+    def test_unreleased_block_is_recomputed_after_start(self):
+        start = datetime.now(UTC) + timedelta(days=1)
+        ItemFactory.create(category='problem', parent=self.vertical, start=start)
+        self.course = self.store.get_course(self.course.id)
+        set_score(self.student.id, self.problem.location, 1, 2)
+        grade(self.student, self.request, self.course)
+        stored_grade = self._stored_grade()
+        self.assertEqual(stored_grade.recompute_after, start)
+
+        PersistentSubsectionGrade.objects.filter(user=self.student).update(
+            recompute_after=datetime.now(UTC) - timedelta(seconds=1), earned_graded=0
+        )
+        grade(self.student, self.request, self.course)
+        self.assertEqual(self._stored_grade().earned_graded, 1.0)
+
+
 class TestFieldDataCacheScorableLocations(ModuleStoreTestCase):
     """
     Make sure we can filter the locations we pull back student state for via
@@ -0,0 +1,125 @@
+"""
+Tests of the StudentModuleScore index of StudentModule scores.
+"""
+import numpy
+from django.conf import settings
+from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.management.commands.backfill_student_module_scores import backfill_student_module_scores
+from courseware.model_data import ScoresClient
+from courseware.models import StudentModule, StudentModuleScore
+from courseware.tests.factories import StudentModuleFactory, UserFactory
+from courseware.user_state_client import DjangoXBlockUserStateClient
+
+
+@patch.dict(settings.FEATURES, {
+    'ENABLE_STUDENT_MODULE_SCORE_INDEX': True,
+    'READ_STUDENT_MODULE_SCORE_INDEX': True,
+})
+class StudentModuleScoreTest(TestCase):
+    """
+    Tests of maintaining and reading StudentModuleScore.
+    """
+    def setUp(self):
+        super(StudentModuleScoreTest, self).setUp()
+        self.user = UserFactory.create()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.problems = [self.course_key.make_usage_key('problem', 'p{}'.format(index)) for index in range(3)]
+
+    def _create_module(self, usage_key, grade=None, max_grade=None, user=None):
+        """Create a StudentModule for `usage_key`."""
+        return StudentModuleFactory.create(
+            student=user or self.user,
+            course_id=self.course_key,
+            module_state_key=usage_key,
+            grade=grade,
+            max_grade=max_grade,
+        )
+
+    def _indexed_score(self, student_module):
+        """Returns the indexed (earned, possible) of `student_module`."""
+        score = StudentModuleScore.objects.get(student_module=student_module)
+        return score.earned, score.possible
+
+    def test_maintained_on_save(self):
+        student_module = self._create_module(self.problems[0], 1, 2)
+        self.assertEqual(self._indexed_score(student_module), (1, 2))
+
+        student_module = StudentModule.objects.get(id=student_module.id)
+        student_module.grade = 2
+        student_module.save()
+        self.assertEqual(self._indexed_score(student_module), (2, 2))
+
+    def test_state_only_save_not_indexed(self):
+        student_module = StudentModule.objects.get(id=self._create_module(self.problems[0], 1, 2).id)
+        student_module.state = '{"a": 1}'
+        # Updating the module and writing its history, without touching the index
+        with self.assertNumQueries(2):
+            student_module.save()
+
+    def test_deleted_with_student_module(self):
+        student_module = self._create_module(self.problems[0], 1, 2)
+        student_module.delete()
+        self.assertFalse(StudentModuleScore.objects.exists())
+
+    @patch.dict(settings.FEATURES, {'ENABLE_STUDENT_MODULE_SCORE_INDEX': False})
+    def test_not_maintained_when_disabled(self):
+        self._create_module(self.problems[0], 1, 2)
+        self.assertFalse(StudentModuleScore.objects.exists())
+
+    def test_bulk_created_student_modules(self):
+        client = DjangoXBlockUserStateClient(self.user)
+        client.set_many(self.user.username, {usage_key: {'a': 1} for usage_key in self.problems})
+        self.assertEqual(StudentModuleScore.objects.filter(student=self.user).count(), len(self.problems))
+
+    def test_read_course_and_user(self):
+        other_user = UserFactory.create()
+        self._create_module(self.problems[0], 1, 2)
+        self._create_module(self.problems[1])
+        self._create_module(self.problems[0], 2, 2, user=other_user)
+
+        scores = StudentModuleScore.read_course(self.course_key)
+        self.assertEqual(len(scores.usage_keys), 3)
+        self.assertEqual(
+            {
+                (int(user_id), unicode(usage_key), float(possible))
+                for user_id, usage_key, possible in zip(
+                    scores.user_ids, scores.usage_keys, numpy.nan_to_num(scores.possible)
+                )
+            },
+            {
+                (self.user.id, unicode(self.problems[0]), 2.0),
+                (self.user.id, unicode(self.problems[1]), 0.0),
+                (other_user.id, unicode(self.problems[0]), 2.0),
+            }
+        )
+
+        scores = StudentModuleScore.read_course(self.course_key, user_ids=[other_user.id])
+        self.assertEqual(list(scores.user_ids), [other_user.id])
+        self.assertEqual(list(scores.earned), [2])
+
+        scores = StudentModuleScore.read_user(self.user.id, self.course_key)
+        self.assertEqual(set(scores.usage_keys), set(self.problems[:2]))
+        self.assertEqual(numpy.isnan(scores.earned).sum(), 1)
+
+    def test_scores_client_reads_index(self):
+        student_module = self._create_module(self.problems[0], 1, 2)
+        # Scores are read from the index, not from StudentModule
+        StudentModuleScore.objects.filter(student_module=student_module).update(earned=2)
+
+        client = ScoresClient(self.course_key, self.user.id)
+        client.fetch_scores(self.problems)
+        self.assertEqual(client.get(self.problems[0]), ScoresClient.Score(2, 2))
+        self.assertIsNone(client.get(self.problems[1]))
+
+    def test_backfill(self):
+        with patch.dict(settings.FEATURES, {'ENABLE_STUDENT_MODULE_SCORE_INDEX': False}):
+            student_modules = [self._create_module(usage_key, 1, 3) for usage_key in self.problems]
+
+        written = backfill_student_module_scores(0, max(sm.id for sm in student_modules) + 1)
+
+        self.assertEqual(written, len(self.problems))
+        for student_module in student_modules:
+            self.assertEqual(self._indexed_score(student_module), (1, 3))
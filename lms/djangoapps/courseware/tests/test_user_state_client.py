@@ -4,13 +4,17 @@ defined in edx_user_state_client.
 """
 
 from collections import defaultdict
+import json
 from unittest import skip
 
 from django.test import TestCase
+from mock import Mock
+from opaque_keys.edx.locator import CourseLocator
 
 from edx_user_state_client.tests import UserStateClientTestBase
+from courseware.models import StudentModule, StudentModuleHistory, STUDENT_MODULES_CREATED
 from courseware.user_state_client import DjangoXBlockUserStateClient
-from courseware.tests.factories import UserFactory
+from courseware.tests.factories import StudentModuleFactory, UserFactory
 
 
 class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
@@ -65,3 +69,81 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+class TestDjangoUserStateClientBulkSet(TestCase):
+    """
+    Tests of the batched write path of DjangoXBlockUserStateClient.set_many.
+    """
+    def setUp(self):
+        super(TestDjangoUserStateClientBulkSet, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.course_key = CourseLocator('org', 'course', 'run')
+
+    def _block(self, block_type, index):
+        """Returns the usage key of a block in the test course."""
+        return self.course_key.make_usage_key(block_type, 'block_{}'.format(index))
+
+    def _state(self, usage_key):
+        """Returns the stored state of `usage_key`."""
+        return json.loads(StudentModule.objects.get(student=self.user, module_state_key=usage_key).state)
+
+    def test_creates_and_updates_in_bulk(self):
+        existing = self._block('problem', 0)
+        StudentModuleFactory.create(
+            student=self.user,
+            course_id=self.course_key,
+            module_state_key=existing,
+            state=json.dumps({'a': 1, 'b': 2}),
+            grade=1,
+            max_grade=2,
+        )
+        new_problem = self._block('problem', 1)
+        new_html = self._block('html', 2)
+
+        self.client.set_many(self.user.username, {
+            existing: {'b': 3},
+            new_problem: {'c': 4},
+            new_html: {'d': 5},
+        })
+
+        self.assertEqual(self._state(existing), {'a': 1, 'b': 3})
+        self.assertEqual(self._state(new_problem), {'c': 4})
+        self.assertEqual(self._state(new_html), {'d': 5})
+
+        # The score of the existing row is left alone.
+        student_module = StudentModule.objects.get(student=self.user, module_state_key=existing)
+        self.assertEqual((student_module.grade, student_module.max_grade), (1, 2))
+
+        # History is only recorded for problems, one entry per write.
+        history = StudentModuleHistory.objects.filter(student_module__student=self.user)
+        self.assertEqual(
+            {unicode(entry.student_module.module_state_key): json.loads(entry.state) for entry in history},
+            {unicode(existing): {'a': 1, 'b': 3}, unicode(new_problem): {'c': 4}},
+        )
+        self.assertEqual(len(history), 2)
+
+    def test_query_count_independent_of_block_count(self):
+        blocks = [self._block('problem', index) for index in range(10)]
+        for usage_key in blocks[:5]:
+            StudentModuleFactory.create(student=self.user, course_id=self.course_key, module_state_key=usage_key)
+
+        # Read existing rows, update, insert, read back created rows, insert history.
+        with self.assertNumQueries(5 + 2):  # plus the savepoint around the insert
+            self.client.set_many(self.user.username, {usage_key: {'x': 1} for usage_key in blocks})
+
+        for usage_key in blocks:
+            self.assertEqual(self._state(usage_key), {'x': 1})
+
+    def test_created_signal(self):
+        receiver = Mock()
+        STUDENT_MODULES_CREATED.connect(receiver)
+        self.addCleanup(STUDENT_MODULES_CREATED.disconnect, receiver)
+
+        blocks = [self._block('html', index) for index in range(3)]
+        self.client.set_many(self.user.username, {usage_key: {'x': 1} for usage_key in blocks})
+
+        self.assertEqual(receiver.call_count, 1)
+        instances = receiver.call_args[1]['instances']
+        self.assertEqual({instance.module_state_key for instance in instances}, set(blocks))
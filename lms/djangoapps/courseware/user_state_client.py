@@ -14,8 +14,11 @@ except ImportError:
 
 import dogstats_wrapper as dog_stats_api
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Case, TextField, Value, When
+from django.utils import timezone
 from xblock.fields import Scope, ScopeBase
-from courseware.models import StudentModule, StudentModuleHistory
+from courseware.models import StudentModule, StudentModuleHistory, STUDENT_MODULES_CREATED, chunks
 from edx_user_state_client.interface import XBlockUserStateClient, XBlockUserState
 
 
@@ -42,6 +45,12 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
     # Use this sample rate for DataDog events.
     API_DATADOG_SAMPLE_RATE = 0.1
 
+    # `set_many` calls for at least this many blocks write them in bulk.
+    BULK_SET_MIN_BLOCKS = 2
+
+    # Maximum number of rows read or written by a single query when writing in bulk.
+    BULK_CHUNK_SIZE = 500
+
     class ServiceUnavailable(XBlockUserStateClient.ServiceUnavailable):
         """
         This error is raised if the service backing this client is currently unavailable.
@@ -184,66 +193,214 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
-        # We do a find_or_create for every block (rather than re-using field objects
-        # that were queried in get_many) so that if the score has
-        # been changed by some other piece of the code, we don't overwrite
-        # that score.
+        num_queries = 0
         if self.user is not None and self.user.username == username:
             user = self.user
         else:
             user = User.objects.get(username=username)
+            num_queries += 1
 
         evt_time = time()
 
-        for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
-                student=user,
-                course_id=usage_key.course_key,
-                module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
-            )
+        if len(block_keys_to_state) >= self.BULK_SET_MIN_BLOCKS:
+            num_queries += self._set_many_bulk(user, block_keys_to_state, evt_time)
+        else:
+            for usage_key, state in block_keys_to_state.items():
+                num_queries += self._set_one(user, usage_key, state, evt_time)
 
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0
-            if not created:
-                if student_module.state is None:
-                    current_state = {}
-                else:
-                    current_state = json.loads(student_module.state)
-                num_fields_before = len(current_state)
-                current_state.update(state)
-                num_fields_after = len(current_state)
-                student_module.state = json.dumps(current_state)
-                # We just read this object, so we know that we can do an update
-                student_module.save(force_update=True)
-
-            # The rest of this method exists only to submit DataDog events.
-            # Remove it once we're no longer interested in the data.
-            #
-            # Record whether a state row has been created or updated.
-            if created:
-                self._ddog_increment(evt_time, 'set_many.state_created')
+        # Events for the entire set_many call.
+        finish_time = time()
+        self._ddog_histogram(evt_time, 'set_many.blks_updated', len(block_keys_to_state))
+        self._ddog_histogram(evt_time, 'set_many.queries', num_queries)
+        self._ddog_histogram(evt_time, 'set_many.response_time', (finish_time - evt_time) * 1000)
+
+    def _set_one(self, user, usage_key, state, evt_time):
+        """
+        Overlay `state` over the stored state of a single block, creating its
+        :class:`~StudentModule` if needed.
+
+        Returns the number of queries made.
+        """
+        # We do a find_or_create for every block (rather than re-using field objects
+        # that were queried in get_many) so that if the score has
+        # been changed by some other piece of the code, we don't overwrite
+        # that score.
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+        num_queries = 2 if created else 1
+
+        num_fields_before = num_fields_after = len(state)
+        if not created:
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            num_fields_before = len(current_state)
+            current_state.update(state)
+            num_fields_after = len(current_state)
+            student_module.state = json.dumps(current_state)
+            # We just read this object, so we know that we can do an update
+            student_module.save(force_update=True)
+            num_queries += 1
+
+        if student_module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
+            num_queries += 1
+
+        self._ddog_record_set(evt_time, created, state, num_fields_before, num_fields_after)
+        return num_queries
+
+    def _set_many_bulk(self, user, block_keys_to_state, evt_time):
+        """
+        Overlay the states in `block_keys_to_state` over the stored state of
+        their blocks, using a fixed number of queries rather than a few per block.
+
+        The existing :class:`~StudentModule`s are read at once, the states are
+        merged in memory, and then the rows are written with one multi-row update
+        and one bulk insert. History entries are also inserted in bulk. As with
+        :meth:`_set_one`, only the state of existing rows is written, so that
+        scores set meanwhile by other code are not overwritten.
+
+        Returns the number of queries made.
+        """
+        num_queries = 0
+        now = timezone.now()
+
+        existing, reads = self._get_student_modules_for_user(user, block_keys_to_state.keys())
+        num_queries += reads
+
+        to_update = []
+        to_create = []
+        for usage_key, state in block_keys_to_state.iteritems():
+            student_module = existing.get(usage_key)
+            if student_module is None:
+                to_create.append((usage_key, StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    module_type=usage_key.block_type,
+                    state=json.dumps(state),
+                )))
+                continue
+
+            current_state = {} if student_module.state is None else json.loads(student_module.state)
+            num_fields_before = len(current_state)
+            current_state.update(state)
+            student_module.state = json.dumps(current_state)
+            student_module.modified = now
+            to_update.append(student_module)
+            self._ddog_record_set(evt_time, False, state, num_fields_before, len(current_state))
+
+        for chunk in chunks(to_update, self.BULK_CHUNK_SIZE):
+            StudentModule.objects.filter(pk__in=[module.pk for module in chunk]).update(
+                state=Case(
+                    *[When(pk=module.pk, then=Value(module.state)) for module in chunk],
+                    output_field=TextField()
+                ),
+                modified=now,
+            )
+            num_queries += 1
+
+        history_modules = [
+            module for module in to_update
+            if module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+
+        if to_create:
+            try:
+                with transaction.atomic():
+                    StudentModule.objects.bulk_create(
+                        [module for __, module in to_create],
+                        batch_size=self.BULK_CHUNK_SIZE,
+                    )
+                num_queries += len(list(chunks(to_create, self.BULK_CHUNK_SIZE)))
+            except IntegrityError:
+                # Some of the rows were created meanwhile by another request,
+                # so fall back to merging state into those one block at a time.
+                for usage_key, __ in to_create:
+                    num_queries += self._set_one(user, usage_key, block_keys_to_state[usage_key], evt_time)
             else:
-                self._ddog_increment(evt_time, 'set_many.state_updated')
+                for usage_key, __ in to_create:
+                    state = block_keys_to_state[usage_key]
+                    self._ddog_record_set(evt_time, True, state, len(state), len(state))
+
+                STUDENT_MODULES_CREATED.send(
+                    sender=StudentModule,
+                    instances=[module for __, module in to_create],
+                )
+
+                # Bulk inserts don't return the ids of the new rows, which
+                # their history entries need, so read those rows back.
+                history_keys = [
+                    usage_key for usage_key, module in to_create
+                    if module.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES
+                ]
+                if history_keys:
+                    created, reads = self._get_student_modules_for_user(user, history_keys)
+                    history_modules.extend(created.itervalues())
+                    num_queries += reads
+
+        if history_modules:
+            StudentModuleHistory.objects.bulk_create(
+                [StudentModuleHistory.for_student_module(module) for module in history_modules],
+                batch_size=self.BULK_CHUNK_SIZE,
+            )
+            num_queries += len(list(chunks(history_modules, self.BULK_CHUNK_SIZE)))
+
+        return num_queries
 
-            # Event to record number of fields sent in to set/set_many.
-            self._ddog_histogram(evt_time, 'set_many.fields_in', len(state))
+    def _get_student_modules_for_user(self, user, block_keys):
+        """
+        Retrieve the :class:`~StudentModule`s of `user` for the supplied ``block_keys``.
 
-            # Event to record number of new fields set in set/set_many.
-            num_new_fields_set = num_fields_after - num_fields_before
-            self._ddog_histogram(evt_time, 'set_many.fields_set', num_new_fields_set)
+        Returns a dict mapping usage keys to their `StudentModule`, and the
+        number of queries made.
+        """
+        student_modules = {}
+        num_queries = 0
+        course_key_func = attrgetter('course_key')
+        for course_key, usage_keys in itertools.groupby(sorted(block_keys, key=course_key_func), course_key_func):
+            for chunk in chunks(usage_keys, self.BULK_CHUNK_SIZE):
+                query = StudentModule.objects.filter(
+                    student=user,
+                    course_id=course_key,
+                    module_state_key__in=chunk,
+                )
+                for student_module in query:
+                    usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                    student_modules[usage_key] = student_module
+                num_queries += 1
+        return student_modules, num_queries
+
+    def _ddog_record_set(self, evt_time, created, state, num_fields_before, num_fields_after):
+        """
+        Submit the DataDog events for setting `state` on a single block.
+        """
+        # The rest of this method exists only to submit DataDog events.
+        # Remove it once we're no longer interested in the data.
+        #
+        # Record whether a state row has been created or updated.
+        if created:
+            self._ddog_increment(evt_time, 'set_many.state_created')
+        else:
+            self._ddog_increment(evt_time, 'set_many.state_updated')
 
-            # Event to record number of existing fields updated in set/set_many.
-            num_fields_updated = max(0, len(state) - num_new_fields_set)
-            self._ddog_histogram(evt_time, 'set_many.fields_updated', num_fields_updated)
+        # Event to record number of fields sent in to set/set_many.
+        self._ddog_histogram(evt_time, 'set_many.fields_in', len(state))
 
-        # Events for the entire set_many call.
-        finish_time = time()
-        self._ddog_histogram(evt_time, 'set_many.blks_updated', len(block_keys_to_state))
-        self._ddog_histogram(evt_time, 'set_many.response_time', (finish_time - evt_time) * 1000)
+        # Event to record number of new fields set in set/set_many.
+        num_new_fields_set = num_fields_after - num_fields_before
+        self._ddog_histogram(evt_time, 'set_many.fields_set', num_new_fields_set)
+
+        # Event to record number of existing fields updated in set/set_many.
+        num_fields_updated = max(0, len(state) - num_new_fields_set)
+        self._ddog_histogram(evt_time, 'set_many.fields_updated', num_fields_updated)
 
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
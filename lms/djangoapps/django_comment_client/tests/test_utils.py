@@ -9,6 +9,7 @@ from django.utils.timezone import UTC as django_utc
 from django.core.urlresolvers import reverse
 from django.test import TestCase, RequestFactory
 from edxmako import add_lookup
+from request_cache.middleware import RequestCache
 
 from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
@@ -230,6 +231,41 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         with self.assertRaises(utils.DiscussionIdMapIsNotCached):
             utils.get_cached_discussion_key(self.course, 'test_discussion_id')
 
+    def test_cached_discussion_id_map_reused(self):
+        utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+
+        # A later request only reads when the course structure was last modified
+        RequestCache.clear_request_cache()
+        with self.assertNumQueries(1):
+            usage_key = utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        self.assertEqual(usage_key, self.discussion.location)
+
+        # and the same request reads nothing
+        with self.assertNumQueries(0):
+            usage_key = utils.get_cached_discussion_key(self.course, 'test_discussion_id_2')
+        self.assertEqual(usage_key, self.discussion2.location)
+
+    def test_cached_discussion_id_map_updated(self):
+        utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+
+        cache = CourseStructure.objects.get(course_id=self.course.id)
+        cache.discussion_id_map_json = json.dumps({'test_discussion_id': unicode(self.discussion2.location)})
+        cache.save()
+
+        RequestCache.clear_request_cache()
+        usage_key = utils.get_cached_discussion_key(self.course, 'test_discussion_id')
+        self.assertEqual(usage_key, self.discussion2.location)
+
+    def test_discussion_access_checked_once_per_request(self):
+        with mock.patch.object(utils, 'has_access', wraps=utils.has_access) as mock_has_access:
+            utils.get_cached_discussion_id_map(
+                self.course,
+                ['test_discussion_id'] * 20,
+                self.user
+            )
+            self.assertTrue(utils.discussion_category_id_access(self.course, self.user, 'test_discussion_id'))
+        self.assertEqual(mock_has_access.call_count, 1)
+
     def test_module_does_not_have_required_keys(self):
         self.assertTrue(utils.has_required_keys(self.discussion))
         self.assertFalse(utils.has_required_keys(self.bad_discussion))
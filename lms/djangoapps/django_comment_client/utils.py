@@ -6,6 +6,7 @@ from django.conf import settings
 
 import pytz
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
@@ -18,8 +19,9 @@ from ccx.overrides import get_current_ccx
 
 from django_comment_common.models import Role, FORUM_ROLE_STUDENT
 from django_comment_client.permissions import check_permissions_by_view, has_permission, get_team
-from django_comment_client.settings import MAX_COMMENT_DEPTH
+from django_comment_client.settings import MAX_COMMENT_DEPTH, DISCUSSION_ID_MAP_CACHE_TIMEOUT
 from edxmako import lookup_template
+import request_cache
 
 from courseware import courses
 from courseware.access import has_access
@@ -32,6 +34,9 @@ from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+DISCUSSION_ID_MAP_CACHE_NAME = 'django_comment_client.discussion_id_map'
+ACCESSIBLE_DISCUSSIONS_CACHE_NAME = 'django_comment_client.accessible_discussions'
+
 
 def extract(dic, keys):
     """
@@ -155,19 +160,63 @@ class DiscussionIdMapIsNotCached(Exception):
     pass
 
 
+def _get_course_discussion_id_map(course_key):
+    """
+    Returns the discussion id map of the course's CourseStructure, or None if it is not cached.
+
+    The deserialized map is memoized in the request cache, and in the django cache under the time the course
+    structure was last modified, which changes whenever the course is published.
+    """
+    discussion_id_maps = request_cache.get_cache(DISCUSSION_ID_MAP_CACHE_NAME)
+    if course_key in discussion_id_maps:
+        return discussion_id_maps[course_key]
+
+    discussion_id_map = None
+    modified = CourseStructure.objects.filter(course_id=course_key).values_list('modified', flat=True).first()
+    if modified is not None:
+        cache_key = u'{}.{}.{}'.format(DISCUSSION_ID_MAP_CACHE_NAME, course_key, modified.isoformat())
+        discussion_id_map = cache.get(cache_key)
+        if discussion_id_map is None:
+            try:
+                discussion_id_map = CourseStructure.objects.only(
+                    'course_id', 'discussion_id_map_json'
+                ).get(course_id=course_key).discussion_id_map
+            except CourseStructure.DoesNotExist:
+                pass
+            if discussion_id_map is not None:
+                cache.set(cache_key, discussion_id_map, DISCUSSION_ID_MAP_CACHE_TIMEOUT)
+
+    discussion_id_maps[course_key] = discussion_id_map
+    return discussion_id_map
+
+
+def _get_accessible_discussion_module(course, user, usage_key):
+    """
+    Returns the discussion module at usage_key if it has the required keys and is accessible to user, else None.
+
+    Memoized in the request cache, so that each discussion module is loaded and checked once per request no matter
+    how many threads belong to it.
+    """
+    accessible_modules = request_cache.get_cache(ACCESSIBLE_DISCUSSIONS_CACHE_NAME)
+    cache_key = (user.id, usage_key)
+    if cache_key not in accessible_modules:
+        module = modulestore().get_item(usage_key)
+        if not (has_required_keys(module) and has_access(user, 'load', module, course.id)):
+            module = None
+        accessible_modules[cache_key] = module
+    return accessible_modules[cache_key]
+
+
 def get_cached_discussion_key(course, discussion_id):
     """
     Returns the usage key of the discussion module associated with discussion_id if it is cached. If the discussion id
     map is cached but does not contain discussion_id, returns None. If the discussion id map is not cached for course,
     raises a DiscussionIdMapIsNotCached exception.
     """
-    try:
-        cached_mapping = CourseStructure.objects.get(course_id=course.id).discussion_id_map
-        if not cached_mapping:
-            raise DiscussionIdMapIsNotCached()
-        return cached_mapping.get(discussion_id)
-    except CourseStructure.DoesNotExist:
+    cached_mapping = _get_course_discussion_id_map(course.id)
+    if not cached_mapping:
         raise DiscussionIdMapIsNotCached()
+    return cached_mapping.get(discussion_id)
 
 
 def get_cached_discussion_id_map(course, discussion_ids, user):
@@ -177,14 +226,15 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
     """
     try:
         entries = []
-        for discussion_id in discussion_ids:
-            key = get_cached_discussion_key(course, discussion_id)
-            if not key:
-                continue
-            module = modulestore().get_item(key)
-            if not (has_required_keys(module) and has_access(user, 'load', module, course.id)):
-                continue
-            entries.append(get_discussion_id_map_entry(module))
+        with modulestore().bulk_operations(course.id):
+            for discussion_id in set(discussion_ids):
+                key = get_cached_discussion_key(course, discussion_id)
+                if not key:
+                    continue
+                module = _get_accessible_discussion_module(course, user, key)
+                if module is None:
+                    continue
+                entries.append(get_discussion_id_map_entry(module))
         return dict(entries)
     except DiscussionIdMapIsNotCached:
         return get_discussion_id_map(course, user)
@@ -398,8 +448,7 @@ def discussion_category_id_access(course, user, discussion_id):
         key = get_cached_discussion_key(course, discussion_id)
         if not key:
             return False
-        module = modulestore().get_item(key)
-        return has_required_keys(module) and has_access(user, 'load', module, course.id)
+        return _get_accessible_discussion_module(course, user, key) is not None
     except DiscussionIdMapIsNotCached:
         return discussion_id in get_discussion_categories_ids(course, user)
 
@@ -21,10 +21,11 @@ def edxnotes(cls):
     Decorator that makes components annotatable.
     """
     original_get_html = cls.get_html
+    original_student_view_cacheable = getattr(cls, "student_view_cacheable", False)
 
-    def get_html(self, *args, **kwargs):
+    def get_course_if_enabled(self):
         """
-        Returns raw html for the component.
+        Returns the course if edxnotes are enabled for the component, else None.
         """
         is_studio = getattr(self.system, "is_author_mode", False)
         course = self.descriptor.runtime.modulestore.get_course(self.runtime.course_id)
@@ -34,6 +35,15 @@ def edxnotes(cls):
         # - when Harvard Annotation Tool is enabled for the course;
         # - when the feature flag or `edxnotes` setting of the course is set to False.
         if is_studio or not is_feature_enabled(course):
+            return None
+        return course
+
+    def get_html(self, *args, **kwargs):
+        """
+        Returns raw html for the component.
+        """
+        course = get_course_if_enabled(self)
+        if course is None:
             return original_get_html(self, *args, **kwargs)
         else:
             return render_to_string("edxnotes_wrapper.html", {
@@ -54,5 +64,17 @@ def edxnotes(cls):
                 },
             })
 
+    def student_view_cacheable(self):
+        """
+        The notes wrapper holds the user's token, so the student view may only
+        be cached (see xblock_django.fragment_cache) while edxnotes are disabled.
+        """
+        if isinstance(original_student_view_cacheable, property):
+            cacheable = original_student_view_cacheable.fget(self)
+        else:
+            cacheable = original_student_view_cacheable
+        return cacheable and get_course_if_enabled(self) is None
+
     cls.get_html = get_html
+    cls.student_view_cacheable = property(student_view_cacheable)
     return cls
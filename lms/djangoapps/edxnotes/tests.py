@@ -142,6 +142,24 @@ class EdxNotesDecoratorTest(ModuleStoreTestCase):
         enable_edxnotes_for_the_course(self.course, self.user.id)
         self.assertEqual("original_get_html", self.problem.get_html())
 
+    @patch.dict("django.conf.settings.FEATURES", {"ENABLE_EDXNOTES": True, "ENABLE_XBLOCK_FRAGMENT_CACHE": True})
+    @patch("edxnotes.decorators.get_edxnotes_id_token")
+    def test_edxnotes_html_not_cached(self, mock_get_id_token):
+        """
+        Tests that the student view of an html component, which would otherwise be
+        cached, is rendered for each user while edxnotes are enabled, since it holds
+        the user's token.
+        """
+        enable_edxnotes_for_the_course(self.course, self.user.id)
+        html = ItemFactory.create(category="html", parent_location=self.course.location, data="<p>Notes</p>")
+        course = modulestore().get_course(self.course.id)
+        for username in ("Ann", "Ben"):
+            user = UserFactory.create(username=username)
+            mock_get_id_token.return_value = "{}-token".format(username)
+            field_data_cache = FieldDataCache([html], course.id, user)
+            module = get_module_for_descriptor(user, MagicMock(), html, field_data_cache, course.id, course=course)
+            self.assertIn("{}-token".format(username), module.render("student_view").content)
+
 
 @skipUnless(settings.FEATURES["ENABLE_EDXNOTES"], "EdxNotes feature needs to be enabled.")
 @ddt.ddt
@@ -366,7 +366,27 @@ def coupon_codes_features(features, coupons_list, course_id):
     return [extract_coupon(coupon, features) for coupon in coupons_list]
 
 
-def list_problem_responses(course_key, problem_location):
+def problem_response_modules(course_key, problem_location):
+    """
+    Return the StudentModule queryset, ordered by student, holding the
+    responses to the problem identified by `problem_location`.
+    """
+    problem_key = UsageKey.from_string(problem_location)
+    # Are we dealing with an "old-style" problem location?
+    run = problem_key.run
+    if not run:
+        problem_key = course_key.make_usage_key_from_deprecated_string(problem_location)
+    if problem_key.course_key != course_key:
+        return StudentModule.objects.none()
+
+    smdat = StudentModule.objects.filter(
+        course_id=course_key,
+        module_state_key=problem_key
+    )
+    return smdat.order_by('student')
+
+
+def list_problem_responses(course_key, problem_location, filter_fcn=None):
     """
     Return responses to a given problem as a dict.
 
@@ -380,20 +400,13 @@ def list_problem_responses(course_key, problem_location):
 
     where `state` represents a student's response to the problem
     identified by `problem_location`.
-    """
-    problem_key = UsageKey.from_string(problem_location)
-    # Are we dealing with an "old-style" problem location?
-    run = problem_key.run
-    if not run:
-        problem_key = course_key.make_usage_key_from_deprecated_string(problem_location)
-    if problem_key.course_key != course_key:
-        return []
 
-    smdat = StudentModule.objects.filter(
-        course_id=course_key,
-        module_state_key=problem_key
-    )
-    smdat = smdat.order_by('student')
+    If a `filter_fcn` is not None, it is applied to the StudentModule query
+    before it is run, e.g. to restrict it to a range of students.
+    """
+    smdat = problem_response_modules(course_key, problem_location)
+    if filter_fcn is not None:
+        smdat = filter_fcn(smdat)
 
     return [
         {'username': response.student.username, 'state': response.state}
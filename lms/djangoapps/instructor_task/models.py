@@ -204,6 +204,14 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_utf8_decoded_rows(self, csv_file):
+        """
+        Given a file object containing utf-8 encoded CSV data, yield its rows
+        as lists of unicode strings.
+        """
+        for row in csv.reader(csv_file):
+            yield [item.decode('utf-8') for item in row]
+
 
 class S3ReportStore(ReportStore):
     """
@@ -313,15 +321,34 @@ class S3ReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def exists(self, course_id, filename):
+        """Return whether `filename` has been stored for `course_id`."""
+        return self.key_for(course_id, filename).exists()
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows of the CSV file `filename` stored by `store_rows()`, as
+        lists of unicode strings.
+        """
+        data = self.key_for(course_id, filename).get_contents_as_string()
+        gzip_file = GzipFile(fileobj=StringIO(data), mode="rb")
+        return self._get_utf8_decoded_rows(gzip_file)
+
+    def delete(self, course_id, filename):
+        """Delete the file `filename` stored for `course_id`, if any."""
+        self.key_for(course_id, filename).delete()
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
-        can be plugged straight into an href
+        can be plugged straight into an href. Files stored under a
+        subdirectory (e.g. the partial reports of sharded tasks) are not listed.
         """
         course_dir = self.key_for(course_id, '')
         return [
             (key.key.split("/")[-1], key.generate_url(expires_in=300))
             for key in sorted(self.bucket.list(prefix=course_dir.key), reverse=True, key=lambda k: k.last_modified)
+            if "/" not in key.key[len(course_dir.key):]
         ]
 
 
@@ -372,7 +399,7 @@ class LocalFSReportStore(ReportStore):
         full_path = self.path_to(course_id, filename)
         directory = os.path.dirname(full_path)
         if not os.path.exists(directory):
-            os.mkdir(directory)
+            os.makedirs(directory)
 
         with open(full_path, "wb") as f:
             f.write(buff.getvalue())
@@ -388,18 +415,42 @@ class LocalFSReportStore(ReportStore):
 
         self.store(course_id, filename, output_buffer)
 
+    def exists(self, course_id, filename):
+        """Return whether `filename` has been stored for `course_id`."""
+        return os.path.exists(self.path_to(course_id, filename))
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows of the CSV file `filename` stored by `store_rows()`, as
+        lists of unicode strings.
+        """
+        with open(self.path_to(course_id, filename), "rb") as csv_file:
+            for row in self._get_utf8_decoded_rows(csv_file):
+                yield row
+
+    def delete(self, course_id, filename):
+        """Delete the file `filename` stored for `course_id`, if any."""
+        full_path = self.path_to(course_id, filename)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples. `url`
         can be plugged straight into an href. Note that `LocalFSReportStore`
         will generate `file://` type URLs, so you'll need to copy the URL and
         open it in a new browser window. Again, this class is only meant for
-        local development.
+        local development. Subdirectories (e.g. the partial reports of sharded
+        tasks) are not listed.
         """
         course_dir = self.path_to(course_id, '')
         if not os.path.exists(course_dir):
             return []
-        files = [(filename, os.path.join(course_dir, filename)) for filename in os.listdir(course_dir)]
+        files = [
+            (filename, os.path.join(course_dir, filename))
+            for filename in os.listdir(course_dir)
+            if os.path.isfile(os.path.join(course_dir, filename))
+        ]
         files.sort(key=lambda (filename, full_path): os.path.getmtime(full_path), reverse=True)
 
         return [
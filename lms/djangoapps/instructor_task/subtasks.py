@@ -463,10 +463,14 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, defer_completion=False):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
+    Returns True if this was the last of the subtasks to complete.  If `defer_completion` is set,
+    the last subtask leaves the InstructorTask in PROGRESS so that it can do some final work (e.g.
+    merging the partial reports written by each subtask) before calling finalize_subtasks().
+
     Because select_for_update is used to lock the InstructorTask object while it is being updated,
     multiple subtasks updating at the same time may time out while waiting for the lock.
     The actual update operation is surrounded by a try/except/else that permits the update to be
@@ -476,7 +480,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
     the attempting of retries has concluded.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status, defer_completion)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -484,7 +488,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count, defer_completion)
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -498,7 +502,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
 
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, defer_completion=False):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -518,7 +522,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     subtasks.  'Total' is expected to have been set at the time the subtasks were created.
     The other three counters are incremented depending on the value of `status`.  Once the counters
     for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
+    "status" is changed to SUCCESS, unless `defer_completion` is set.
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
@@ -574,7 +578,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        if num_remaining <= 0 and not defer_completion:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -587,3 +591,28 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         dog_stats_api.increment('instructor_task.subtask.update_exception')
         raise
+    return num_remaining == 0
+
+
+@transaction.atomic
+def finalize_subtasks(entry_id, extra_meta=None):
+    """
+    Mark an InstructorTask whose completion was deferred by its last subtask as having succeeded.
+
+    Uses select_for_update to lock the InstructorTask object while it is being updated.  The
+    values in `extra_meta` (e.g. the current 'step') are added to the stored task progress, and
+    the 'duration_ms' value is brought up to date.
+
+    Returns the task progress as stored in the InstructorTask object.
+    """
+    entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+    task_progress = json.loads(entry.task_output)
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+    if extra_meta is not None:
+        task_progress.update(extra_meta)
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+    entry.task_state = SUCCESS
+    entry.save()
+    TASK_LOG.info("Task output finalized to %s for instructor task %d", entry.task_output, entry_id)
+    return task_progress
@@ -30,7 +30,11 @@ from bulk_email.tasks import perform_delegate_email_batches
 from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
+    filter_done_problems,
     perform_module_state_update,
+    perform_sharded_task,
+    perform_task_shard,
+    prepare_rescore_problem_module_states,
     rescore_problem_module_state,
     reset_attempts_module_state,
     delete_problem_module_state,
@@ -72,14 +76,9 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
-
-    def filter_fcn(modules_to_update):
-        """Filter that matches problems which are marked as being done"""
-        return modules_to_update.filter(state__contains='"done": true')
-
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
-    return run_main_task(entry_id, visit_fcn, action_name)
+    return _run_shardable_task(
+        entry_id, 'rescore_problem', xmodule_instance_args, action_name, settings.CELERY_DEFAULT_ROUTING_KEY
+    )
 
 
 @task(base=BaseInstructorTask)
@@ -155,8 +154,9 @@ def calculate_problem_responses_csv(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('generated')
-    task_fn = partial(upload_problem_responses_csv, xmodule_instance_args)
-    return run_main_task(entry_id, task_fn, action_name)
+    return _run_shardable_task(
+        entry_id, 'problem_responses_csv', xmodule_instance_args, action_name, settings.GRADES_DOWNLOAD_ROUTING_KEY
+    )
 
 
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
@@ -171,8 +171,9 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(upload_grades_csv, xmodule_instance_args)
-    return run_main_task(entry_id, task_fn, action_name)
+    return _run_shardable_task(
+        entry_id, 'grade_course', xmodule_instance_args, action_name, settings.GRADES_DOWNLOAD_ROUTING_KEY
+    )
 
 
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
@@ -188,8 +189,9 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(upload_problem_grade_report, xmodule_instance_args)
-    return run_main_task(entry_id, task_fn, action_name)
+    return _run_shardable_task(
+        entry_id, 'grade_problems', xmodule_instance_args, action_name, settings.GRADES_DOWNLOAD_ROUTING_KEY
+    )
 
 
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
@@ -290,3 +292,61 @@ def cohort_students(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('cohorted')
     task_fn = partial(cohort_students_and_upload, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
+
+
+def _shardable_task_fcn(task_type, xmodule_instance_args):
+    """
+    Return the function that performs an InstructorTask of `task_type`, or one
+    shard of it, as called by `run_main_task` or `perform_task_shard`.
+    """
+    if task_type == 'rescore_problem':
+        update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+        prepare_fcn = partial(prepare_rescore_problem_module_states, xmodule_instance_args)
+        return partial(perform_module_state_update, update_fcn, filter_done_problems, prepare_fcn=prepare_fcn)
+    report_fcns = {
+        'problem_responses_csv': upload_problem_responses_csv,
+        'grade_course': upload_grades_csv,
+        'grade_problems': upload_problem_grade_report,
+    }
+    return partial(report_fcns[task_type], xmodule_instance_args)
+
+
+def _run_shardable_task(entry_id, task_type, xmodule_instance_args, action_name, routing_key):
+    """
+    Runs an InstructorTask of `task_type`, which is split into `run_task_shard`
+    subtasks by user-id range if the course is large enough (see
+    `perform_sharded_task`).  Subtasks are queued with `routing_key`.
+    """
+    def create_subtask_fcn(shard, initial_subtask_status):
+        """Creates a subtask to perform one shard of the task."""
+        return run_task_shard.subtask(
+            (
+                entry_id,
+                task_type,
+                xmodule_instance_args,
+                action_name,
+                shard.to_dict(),
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=routing_key,
+        )
+
+    task_fn = _shardable_task_fcn(task_type, xmodule_instance_args)
+    visit_fcn = partial(perform_sharded_task, task_type, task_fn, create_subtask_fcn)
+    return run_main_task(entry_id, visit_fcn, action_name)
+
+
+@task()
+def run_task_shard(entry_id, task_type, xmodule_instance_args, action_name, shard_dict, subtask_status_dict):
+    """
+    Performs one shard of a sharded InstructorTask of `task_type`, i.e. the
+    students in one user-id range.
+
+    `shard_dict` is the dict representation of the TaskShard to perform, and
+    `subtask_status_dict` that of the subtask's initial SubtaskStatus.  The last
+    shard to complete merges the partial reports written by all of them and
+    marks the InstructorTask as complete.
+    """
+    task_fn = _shardable_task_fcn(task_type, xmodule_instance_args)
+    return perform_task_shard(task_type, task_fn, entry_id, action_name, shard_dict, subtask_status_dict)
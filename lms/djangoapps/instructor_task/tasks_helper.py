@@ -9,7 +9,7 @@ from collections import OrderedDict
 from datetime import datetime
 from django.conf import settings
 from eventtracking import tracker
-from itertools import chain
+from itertools import chain, count
 from time import time
 import unicodecsv
 import logging
@@ -45,6 +45,7 @@ from certificates.models import (
     GeneratedCertificate
 )
 from certificates.api import generate_user_certificates
+from courseware.bulk_grades import iterate_bulk_grades_for
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
@@ -54,17 +55,25 @@ from instructor_analytics.basic import (
     enrolled_students_features,
     get_proctored_exam_results,
     list_may_enroll,
-    list_problem_responses
+    list_problem_responses,
+    problem_response_modules,
 )
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    finalize_subtasks,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from opaque_keys.edx.keys import UsageKey
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, is_course_cohorted
-from student.models import CourseEnrollment, CourseAccessRole
+from student.models import CourseEnrollment, CourseAccessRole, anonymous_id_for_user
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 
@@ -78,6 +87,8 @@ FILTERED_OUT_ROLES = ['staff', 'instructor', 'finance_admin', 'sales_admin']
 UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
+# the number of StudentModules passed to each call of a perform_module_state_update prepare_fcn
+MODULE_STATE_PREPARE_BATCH_SIZE = 100
 
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
@@ -178,6 +189,14 @@ class UpdateProblemModuleStateError(Exception):
     pass
 
 
+class TaskShardError(Exception):
+    """
+    Error signaling that one or more shards of a sharded task failed, so
+    that their partial results could not be merged.
+    """
+    pass
+
+
 def _get_current_task():
     """
     Stub to make it easier to test without actually running Celery.
@@ -297,41 +316,262 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+class TaskShard(object):
     """
-    Performs generic update by visiting StudentModule instances with the update_fcn provided.
+    The slice of a sharded InstructorTask performed by one of its subtasks.
 
-    StudentModule instances are those that match the specified `course_id` and `module_state_key`.
-    If `student_identifier` is not None, it is used as an additional filter to limit the modules to those belonging
-    to that student. If `student_identifier` is None, performs update on modules for all students on the specified problem.
+    A shard covers the rows of the task's shard queryset (see
+    `_get_shard_queryset`) whose `field` lies between `first` and `last`,
+    which for reports is a range of user ids.  Partial reports written by a
+    shard are named after the parent `task_id` and the shard's `index`, so
+    that they can be merged back in order once all shards are done.
+    """
+    def __init__(self, task_id, index, field, first, last):
+        self.task_id = task_id
+        self.index = index
+        self.field = field
+        self.first = first
+        self.last = last
+
+    @classmethod
+    def from_dict(cls, d):
+        """Construct a TaskShard object from a dict representation."""
+        return cls(**d)
+
+    def to_dict(self):
+        """Output a JSON-serializable dict representation of a TaskShard object."""
+        return dict(self.__dict__)
+
+    def filter(self, queryset):
+        """Restrict `queryset` to the rows covered by this shard."""
+        return queryset.filter(**{
+            self.field + '__gte': self.first,
+            self.field + '__lte': self.last,
+        })
+
+    @staticmethod
+    def partial_filename(task_id, csv_name, index):
+        """Return the ReportStore filename of shard `index`'s part of the CSV `csv_name`."""
+        return u"partial/{task_id}/{csv_name}_{index:05d}.csv".format(
+            task_id=task_id,
+            csv_name=csv_name,
+            index=index,
+        )
 
-    If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
-    argument, which is the query being filtered, and returns the filtered version of the query.
+    def store_rows(self, rows, csv_name, course_id):
+        """
+        Store this shard's part of the CSV `csv_name`.  The first row of each
+        part is taken to be its header when merging, so an empty header is
+        stored if there are no rows at all.
+        """
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        report_store.store_rows(
+            course_id,
+            self.partial_filename(self.task_id, csv_name, self.index),
+            rows or [[]],
+        )
 
-    The `update_fcn` is called on each StudentModule that passes the resulting filtering.
-    It is passed three arguments:  the module_descriptor for the module pointed to by the
-    module_state_key, the particular StudentModule to update, and the xmodule_instance_args being
-    passed through.  If the value returned by the update function evaluates to a boolean True,
-    the update is successful; False indicates the update on the particular student module failed.
-    A raised exception indicates a fatal condition -- that no other student modules should be considered.
+    def __repr__(self):
+        return 'TaskShard<%r>' % (self.to_dict(),)
 
-    The return value is a dict containing the task's results, with the following keys:
 
-          'attempted': number of attempts made
-          'succeeded': number of attempts that "succeeded"
-          'skipped': number of attempts that "skipped"
-          'failed': number of attempts that "failed"
-          'total': number of possible updates to attempt
-          'action_name': user-visible verb to use in status messages.  Should be past-tense.
-              Pass-through of input `action_name`.
-          'duration_ms': how long the task has (or had) been running.
+def _get_shard_queryset(task_type, course_id, task_input):
+    """
+    Return the ordered queryset that a task of `task_type` is split over by
+    `perform_sharded_task`, and the unique field that shards are ranges of.
+    """
+    if task_type in ('grade_course', 'grade_problems'):
+        return CourseEnrollment.objects.users_enrolled_in(course_id).order_by('pk'), 'pk'
+    elif task_type == 'problem_responses_csv':
+        # Each student has a single StudentModule for the problem.
+        modules = problem_response_modules(course_id, task_input.get('problem_location'))
+        return modules.order_by('student_id'), 'student_id'
+    elif task_type == 'rescore_problem':
+        # An entrance exam has several StudentModules per student, so split
+        # these by StudentModule rather than by student.
+        __, modules = _get_modules_to_update(course_id, task_input, filter_done_problems)
+        return modules.order_by('pk'), 'pk'
+    raise ValueError(u"Task type {} cannot be sharded".format(task_type))
+
+
+def _get_shard_csv_names(task_type, task_input):
+    """Return the names of the CSVs whose partial parts are merged for a task of `task_type`."""
+    if task_type == 'grade_course':
+        return ['grade_report', 'grade_report_err']
+    elif task_type == 'grade_problems':
+        return ['problem_grade_report', 'problem_grade_report_err']
+    elif task_type == 'problem_responses_csv':
+        return [_problem_responses_csv_name(task_input)]
+    return []
+
+
+def perform_sharded_task(task_type, task_fcn, create_subtask_fcn, entry_id, course_id, task_input, action_name):
+    """
+    Performs a task of `task_type`, splitting it into subtasks if it is large enough.
 
-    Because this is run internal to a task, it does not catch exceptions.  These are allowed to pass up to the
-    next level, so that it can set the failure modes and capture the error trace in the InstructorTask and the
-    result object.
+    If the ENABLE_SHARDED_INSTRUCTOR_TASKS feature is on and the task has more than
+    settings.INSTRUCTOR_TASK_ITEMS_PER_SUBTASK items to work on, the items are
+    split into ranges of at most that size (see `TaskShard`), and
+    `create_subtask_fcn` is called with each shard and its initial SubtaskStatus
+    to construct the subtask that runs `perform_task_shard` on it.  Otherwise,
+    `task_fcn` is called directly to perform the whole task.
 
+    Returns the task progress, as for `run_main_task`.
+    """
+    if not settings.FEATURES.get('ENABLE_SHARDED_INSTRUCTOR_TASKS', False):
+        return task_fcn(entry_id, course_id, task_input, action_name)
+
+    items_per_task = settings.INSTRUCTOR_TASK_ITEMS_PER_SUBTASK
+
+    queryset, field = _get_shard_queryset(task_type, course_id, task_input)
+    total_num_items = queryset.count()
+    if total_num_items <= items_per_task:
+        return task_fcn(entry_id, course_id, task_input, action_name)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    # Check to see if the shards have already been queued, which can happen
+    # when this task is requeued after a loss of connection to the broker.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u"Task %s has already been split into subtasks!  InstructorTask = %s", entry.task_id, entry)
+        return json.loads(entry.task_output)
+
+    shard_indexes = count()
+
+    def _create_shard_subtask(item_list, initial_subtask_status):
+        """Creates a subtask to perform the range of the task covered by `item_list`."""
+        shard = TaskShard(
+            entry.task_id,
+            next(shard_indexes),
+            field,
+            item_list[0][field],
+            item_list[-1][field],
+        )
+        return create_subtask_fcn(shard, initial_subtask_status)
+
+    item_fields = [] if field == 'pk' else [field]
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_shard_subtask,
+        [queryset],
+        item_fields,
+        items_per_task,
+        total_num_items,
+    )
+
+
+def perform_task_shard(task_type, task_fcn, entry_id, action_name, shard_dict, subtask_status_dict):
+    """
+    Performs one shard of a task split up by `perform_sharded_task`.
+
+    `task_fcn` is called with the same arguments as by `run_main_task`, plus
+    the `shard` to restrict its work to.  The subtask's counts are then added
+    to the InstructorTask's progress, and the last shard to complete merges
+    the partial reports written by all of them.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    shard = TaskShard.from_dict(shard_dict)
+    TASK_LOG.info(u"Preparing to perform %s as subtask %s for instructor task %d", shard, current_task_id, entry_id)
+
+    # Confirm that the subtask is known to the InstructorTask and hasn't already
+    # been run, as in send_course_email().
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    task_input = json.loads(entry.task_input)
+    try:
+        with dog_stats_api.timer('instructor_tasks.time.shard', tags=[u'action:{name}'.format(name=action_name)]):
+            task_progress = task_fcn(entry_id, entry.course_id, task_input, action_name, shard=shard)
+    except Exception:
+        TASK_LOG.exception(u"Subtask %s for instructor task %d failed unexpectedly!", current_task_id, entry_id)
+        subtask_status.increment(state=FAILURE)
+        if update_subtask_status(entry_id, current_task_id, subtask_status, defer_completion=True):
+            _merge_task_shards(entry_id, _get_shard_csv_names(task_type, task_input))
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress['succeeded'],
+        failed=task_progress['failed'],
+        skipped=task_progress['skipped'],
+        state=SUCCESS,
+    )
+    if update_subtask_status(entry_id, current_task_id, subtask_status, defer_completion=True):
+        _merge_task_shards(entry_id, _get_shard_csv_names(task_type, task_input))
+
+    # Release any queries that the connection has been hanging onto
+    reset_queries()
+    return subtask_status.to_dict()
+
+
+def _merged_rows(report_store, course_id, filenames):
+    """
+    Yield the rows of the partial CSVs `filenames` in order, keeping only the
+    first non-empty header row.
+    """
+    header = None
+    for filename in filenames:
+        rows = report_store.read_rows(course_id, filename)
+        part_header = next(rows, [])
+        if part_header and header is None:
+            header = part_header
+            yield header
+        for row in rows:
+            yield row
+
+
+def _merge_task_shards(entry_id, csv_names):
+    """
+    Merge the partial reports written by the shards of a sharded task into
+    the final reports, and mark the InstructorTask as complete.
+
+    If any shard failed, no report is uploaded and the task is marked as
+    failed instead, since the report would be missing some students.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    task_progress = json.loads(entry.task_output)
+    course_id = entry.course_id
+    report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+    timestamp = datetime.fromtimestamp(task_progress['start_time'], UTC)
+
+    for csv_name in csv_names:
+        filenames = [
+            TaskShard.partial_filename(entry.task_id, csv_name, index)
+            for index in range(subtask_dict['total'])
+        ]
+        filenames = [filename for filename in filenames if report_store.exists(course_id, filename)]
+        if filenames and not subtask_dict['failed']:
+            upload_csv_to_report_store(_merged_rows(report_store, course_id, filenames), csv_name, course_id, timestamp)
+        for filename in filenames:
+            report_store.delete(course_id, filename)
+
+    if subtask_dict['failed']:
+        message = u"{failed} of {total} subtasks failed".format(
+            failed=subtask_dict['failed'],
+            total=subtask_dict['total'],
+        )
+        TASK_LOG.error(u"Task %s: %s, not merging their results", entry.task_id, message)
+        entry.task_output = InstructorTask.create_output_for_failure(TaskShardError(message), None)
+        entry.task_state = FAILURE
+        entry.save_now()
+        return
+
+    step = {'step': 'Uploading CSVs'} if csv_names else None
+    finalize_subtasks(entry_id, extra_meta=step)
+
+
+def filter_done_problems(modules_to_update):
+    """Filter that matches problems which are marked as being done"""
+    return modules_to_update.filter(state__contains='"done": true')
+
+
+def _get_modules_to_update(course_id, task_input, filter_fcn):
+    """
+    Return the problem descriptors named by `task_input`, keyed by usage key,
+    and the query for the StudentModules that `perform_module_state_update`
+    should visit for them.
     """
-    start_time = time()
     usage_keys = []
     problem_url = task_input.get('problem_url')
     entrance_exam_url = task_input.get('entrance_exam_url')
@@ -372,9 +612,60 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     if filter_fcn is not None:
         modules_to_update = filter_fcn(modules_to_update)
 
+    return problems, modules_to_update
+
+
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name, shard=None,
+                                prepare_fcn=None):
+    """
+    Performs generic update by visiting StudentModule instances with the update_fcn provided.
+
+    StudentModule instances are those that match the specified `course_id` and `module_state_key`.
+    If `student_identifier` is not None, it is used as an additional filter to limit the modules to those belonging
+    to that student. If `student_identifier` is None, performs update on modules for all students on the specified problem.
+
+    If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
+    argument, which is the query being filtered, and returns the filtered version of the query.
+    If a `shard` is given, the query is further restricted to the StudentModules it covers.
+
+    The `update_fcn` is called on each StudentModule that passes the resulting filtering.
+    It is passed three arguments:  the module_descriptor for the module pointed to by the
+    module_state_key, the particular StudentModule to update, and the xmodule_instance_args being
+    passed through.  If the value returned by the update function evaluates to a boolean True,
+    the update is successful; False indicates the update on the particular student module failed.
+    A raised exception indicates a fatal condition -- that no other student modules should be considered.
+
+    If a `prepare_fcn` is not None, it is called before the update_fcn on each batch of up to
+    MODULE_STATE_PREPARE_BATCH_SIZE StudentModules for the same module, with the module_descriptor
+    and the list of those StudentModules.  It can do work for the whole batch at once.
+
+    The return value is a dict containing the task's results, with the following keys:
+
+          'attempted': number of attempts made
+          'succeeded': number of attempts that "succeeded"
+          'skipped': number of attempts that "skipped"
+          'failed': number of attempts that "failed"
+          'total': number of possible updates to attempt
+          'action_name': user-visible verb to use in status messages.  Should be past-tense.
+              Pass-through of input `action_name`.
+          'duration_ms': how long the task has (or had) been running.
+
+    Because this is run internal to a task, it does not catch exceptions.  These are allowed to pass up to the
+    next level, so that it can set the failure modes and capture the error trace in the InstructorTask and the
+    result object.
+
+    """
+    start_time = time()
+    problems, modules_to_update = _get_modules_to_update(course_id, task_input, filter_fcn)
+    if shard is not None:
+        modules_to_update = shard.filter(modules_to_update)
+
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
+    if prepare_fcn is not None:
+        modules_to_update = _prepare_module_states(prepare_fcn, problems, modules_to_update)
+
     for module_to_update in modules_to_update:
         task_progress.attempted += 1
         module_descriptor = problems[unicode(module_to_update.module_state_key)]
@@ -396,6 +687,27 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     return task_progress.update_task_state()
 
 
+def _prepare_module_states(prepare_fcn, problems, modules_to_update):
+    """
+    Yield the StudentModules in `modules_to_update`, calling `prepare_fcn` on
+    each batch of them for the same problem before they are yielded.
+    """
+    batches = OrderedDict()
+    for module_to_update in modules_to_update:
+        key = unicode(module_to_update.module_state_key)
+        batch = batches.setdefault(key, [])
+        batch.append(module_to_update)
+        if len(batch) == MODULE_STATE_PREPARE_BATCH_SIZE:
+            prepare_fcn(problems[key], batch)
+            for prepared_module in batches.pop(key):
+                yield prepared_module
+
+    for key, batch in batches.iteritems():
+        prepare_fcn(problems[key], batch)
+        for prepared_module in batch:
+            yield prepared_module
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -468,6 +780,44 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
     )
 
 
+@outer_atomic
+def prepare_rescore_problem_module_states(xmodule_instance_args, module_descriptor, student_modules):
+    '''
+    Takes an XModule descriptor and a batch of its StudentModule objects, and runs the
+    problem's script for all of their students in as few sandboxes as possible, so that
+    rescore_problem_module_state finds each student's script results in the cache.
+
+    The problem is instantiated for the first student to find its script, which caches
+    that student's results as well.  Only the script is run ahead of time: each student's
+    answers are still checked by rescore_problem_module_state.
+    '''
+    if len(student_modules) < 2:
+        return
+
+    course_id = student_modules[0].course_id
+    with modulestore().bulk_operations(course_id):
+        course = get_course_by_id(course_id)
+        instance = _get_module_instance_for_task(
+            course_id,
+            student_modules[0].student,
+            module_descriptor,
+            xmodule_instance_args,
+            grade_bucket_type='rescore',
+            course=course
+        )
+    if getattr(instance, 'lcp', None) is None:
+        # Let rescore_problem_module_state report the problem.
+        return
+
+    students = []
+    for student_module in student_modules[1:]:
+        seed = json.loads(student_module.state or '{}').get('seed')
+        if seed is not None:
+            # Capa modules are given the per-student anonymized id (see get_module_system_for_user).
+            students.append((seed, anonymous_id_for_user(student_module.student, None)))
+    instance.lcp.warm_context_cache(students)
+
+
 @outer_atomic
 def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module):
     '''
@@ -656,7 +1006,34 @@ def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": report_name})
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+def _upload_report_csv(rows, csv_name, course_id, timestamp, shard=None):
+    """
+    Upload a report CSV using ReportStore, or, when generating one `shard` of
+    a sharded report, store that shard's part of it for merging later.
+    """
+    if shard is None:
+        upload_csv_to_report_store(rows, csv_name, course_id, timestamp)
+    else:
+        shard.store_rows(rows, csv_name, course_id)
+
+
+def _iterate_grades_for_report(course_id, students, keep_raw_scores=False):
+    """
+    Return the (student, gradeset, err_msg) iterator used by grade reports,
+    grading students in bulk if the ENABLE_BULK_GRADE_REPORTS feature is on.
+    """
+    if settings.FEATURES.get('ENABLE_BULK_GRADE_REPORTS', False):
+        return iterate_bulk_grades_for(
+            course_id,
+            students,
+            keep_raw_scores=keep_raw_scores,
+            chunk_size=getattr(settings, 'BULK_GRADE_REPORT_CHUNK_SIZE', 1000),
+        )
+    return iterate_grades_for(course_id, students, keep_raw_scores=keep_raw_scores)
+
+
+def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name, shard=None):
+    # pylint: disable=too-many-statements
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
@@ -668,11 +1045,16 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     As we start to add more CSV downloads, it will probably be worthwhile to
     make a more general CSVDoc class instead of building out the rows like we
     do here.
+
+    If a `shard` is given, only the students it covers are graded, and their
+    rows are stored for merging with those of the other shards.
     """
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
+    if shard is not None:
+        enrolled_students = shard.filter(enrolled_students)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
@@ -713,7 +1095,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
         total_enrolled_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    for student, gradeset, err_msg in _iterate_grades_for_report(course_id, enrolled_students):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -811,11 +1193,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
     # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+    _upload_report_csv(rows, 'grade_report', course_id, start_date, shard)
 
     # If there are any error rows (don't count the header), write them out as well
     if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+        _upload_report_csv(err_rows, 'grade_report_err', course_id, start_date, shard)
 
     # One last update before we close out...
     TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
@@ -872,10 +1254,17 @@ def _order_problems(blocks):
     return problems
 
 
-def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
+def _problem_responses_csv_name(task_input):
+    """Return the name of the problem responses CSV for the problem named by `task_input`."""
+    problem_location = re.sub(r'[:/]', '_', task_input.get('problem_location'))
+    return 'student_state_from_{}'.format(problem_location)
+
+
+def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name, shard=None):
     """
     For a given `course_id`, generate a CSV file containing
     all student answers to a given problem, and store using a `ReportStore`.
+    If a `shard` is given, only the answers of the students it covers are included.
     """
     start_time = time()
     start_date = datetime.now(UTC)
@@ -886,10 +1275,17 @@ def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, t
 
     # Compute result table and format it
     problem_location = task_input.get('problem_location')
-    student_data = list_problem_responses(course_id, problem_location)
+    student_data = list_problem_responses(
+        course_id,
+        problem_location,
+        filter_fcn=shard.filter if shard is not None else None,
+    )
     features = ['username', 'state']
     header, rows = format_dictlist(student_data, features)
 
+    if shard is not None:
+        # Each shard reports the responses it found, which the parent task totals.
+        task_progress.total = len(rows)
     task_progress.attempted = task_progress.succeeded = len(rows)
     task_progress.skipped = task_progress.total - task_progress.attempted
 
@@ -899,22 +1295,22 @@ def upload_problem_responses_csv(_xmodule_instance_args, _entry_id, course_id, t
     task_progress.update_task_state(extra_meta=current_step)
 
     # Perform the upload
-    problem_location = re.sub(r'[:/]', '_', problem_location)
-    csv_name = 'student_state_from_{}'.format(problem_location)
-    upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+    _upload_report_csv(rows, _problem_responses_csv_name(task_input), course_id, start_date, shard)
 
     return task_progress.update_task_state(extra_meta=current_step)
 
 
-def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name, shard=None):
     """
     Generate a CSV containing all students' problem grades within a given
-    `course_id`.
+    `course_id`.  If a `shard` is given, only the students it covers are graded.
     """
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
+    if shard is not None:
+        enrolled_students = shard.filter(enrolled_students)
     task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
     # This struct encapsulates both the display names of each static item in the
@@ -936,7 +1332,7 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
+    for student, gradeset, err_msg in _iterate_grades_for_report(course_id, enrolled_students, keep_raw_scores=True):
         student_fields = [getattr(student, field_name) for field_name in header_row]
         task_progress.attempted += 1
 
@@ -972,10 +1368,10 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
 
     # Perform the upload if any students have been successfully graded
     if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+        _upload_report_csv(rows, 'problem_grade_report', course_id, start_date, shard)
     # If there are any error rows, write them out as well
     if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+        _upload_report_csv(error_rows, 'problem_grade_report_err', course_id, start_date, shard)
 
     return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
 
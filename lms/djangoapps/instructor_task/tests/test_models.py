@@ -93,6 +93,25 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    def test_partial_rows(self):
+        """
+        Test that rows stored under a subdirectory can be read back and
+        deleted, and are not listed by links_for().
+        """
+        report_store = self.create_report_store()
+        rows = [[u'id', u'username'], [1, u'ni\xf1o']]
+        report_store.store_rows(self.course_id, 'partial/task/report_00000.csv', rows)
+
+        self.assertTrue(report_store.exists(self.course_id, 'partial/task/report_00000.csv'))
+        self.assertEqual(
+            list(report_store.read_rows(self.course_id, 'partial/task/report_00000.csv')),
+            [[u'id', u'username'], [u'1', u'ni\xf1o']]
+        )
+        self.assertEqual(report_store.links_for(self.course_id), [])
+
+        report_store.delete(self.course_id, 'partial/task/report_00000.csv')
+        self.assertFalse(report_store.exists(self.course_id, 'partial/task/report_00000.csv'))
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -17,6 +17,7 @@ from opaque_keys.edx.locations import i4xEncoder
 
 from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory
+from student.models import anonymous_id_for_user
 from student.tests.factories import UserFactory, CourseEnrollmentFactory
 
 from instructor_task.models import InstructorTask
@@ -268,6 +269,26 @@ class TestRescoreInstructorTask(TestInstructorTasks):
         self.assertEquals(output.get('action_name'), 'rescored')
         self.assertGreater(output.get('duration_ms'), 0)
 
+    def test_rescoring_warms_script_cache(self):
+        input_state = json.dumps({'done': True, 'seed': 1})
+        num_students = 3
+        students = self._create_students_with_state(num_students, input_state)
+        task_entry = self._create_input_entry()
+        mock_instance = Mock()
+        mock_instance.rescore_problem = Mock(return_value={'success': 'correct'})
+        with patch('instructor_task.tasks_helper.get_module_for_descriptor_internal') as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+        # the script is run ahead of time for all but the student whose problem was made to find it
+        self.assertEquals(mock_instance.lcp.warm_context_cache.call_count, 1)
+        warmed = mock_instance.lcp.warm_context_cache.call_args[0][0]
+        anonymous_ids = [anonymous_id_for_user(student, None) for student in students]
+        self.assertEquals(len(warmed), num_students - 1)
+        for seed, anonymous_id in warmed:
+            self.assertEquals(seed, 1)
+            self.assertIn(anonymous_id, anonymous_ids)
+        self.assertEquals(mock_instance.rescore_problem.call_count, num_students)
+
     def test_rescoring_bad_result(self):
         # Confirm that rescoring does not succeed if "success" key is not an expected value.
         input_state = json.dumps({'done': True})
@@ -7,11 +7,14 @@ Tests that CSV grade report generation works with unicode emails.
 
 """
 import ddt
+from functools import partial
 from mock import Mock, patch
 import tempfile
 import json
+from uuid import uuid4
 from openedx.core.djangoapps.course_groups import cohorts
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 
@@ -20,6 +23,7 @@ from certificates.models import CertificateStatuses, GeneratedCertificate
 from certificates.tests.factories import GeneratedCertificateFactory, CertificateWhitelistFactory
 from course_modes.models import CourseMode
 from courseware.tests.factories import InstructorFactory
+from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin, InstructorTaskModuleTestCase
 from openedx.core.djangoapps.course_groups.models import CourseUserGroupPartitionGroup, CohortMembership
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
@@ -32,10 +36,12 @@ from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnro
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from instructor_task.models import ReportStore
+from instructor_task.models import InstructorTask, ReportStore
 from survey.models import SurveyForm, SurveyAnswer
 from instructor_task.tasks_helper import (
     cohort_students_and_upload,
+    perform_sharded_task,
+    perform_task_shard,
     upload_problem_responses_csv,
     upload_grades_csv,
     upload_problem_grade_report,
@@ -327,6 +333,91 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
         self._verify_cell_data_for_user(self.student2.username, self.course.id, 'Team Name', team2.name)
 
 
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_SHARDED_INSTRUCTOR_TASKS': True})
+@override_settings(INSTRUCTOR_TASK_ITEMS_PER_SUBTASK=2)
+class TestShardedGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that grade reports split into subtasks by user-id range are merged
+    back into a single report.
+    """
+    def setUp(self):
+        super(TestShardedGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+
+    def _run_sharded_task(self, task_fcn):
+        """Run the grade report task, performing each of its shards as soon as it is queued."""
+        def create_subtask_fcn(shard, initial_subtask_status):
+            """Create a fake subtask that performs the shard when applied."""
+            def perform_shard():
+                """Perform the shard, as the real subtask would."""
+                try:
+                    perform_task_shard(
+                        'grade_course',
+                        task_fcn,
+                        self.entry.id,
+                        'graded',
+                        shard.to_dict(),
+                        initial_subtask_status.to_dict(),
+                    )
+                except ValueError:
+                    pass
+            subtask = Mock()
+            subtask.apply_async.side_effect = perform_shard
+            return subtask
+
+        with patch('instructor_task.tasks_helper._get_current_task'):
+            return perform_sharded_task(
+                'grade_course', task_fcn, create_subtask_fcn, self.entry.id, self.course.id, {}, 'graded'
+            )
+
+    def test_shards_are_merged(self):
+        self._run_sharded_task(partial(upload_grades_csv, None))
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, json.loads(entry.task_output))
+
+        # Only the merged report is listed, and the partial reports are gone.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('grade_report', links[0][0])
+        self.verify_rows_in_csv(
+            [{'id': unicode(student.id), 'username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+
+    def test_failed_shard(self):
+        def task_fcn(*args, **kwargs):
+            """Fail on the second shard."""
+            if kwargs['shard'].index == 1:
+                raise ValueError("Shard failed")
+            return upload_grades_csv(None, *args, **kwargs)
+
+        self._run_sharded_task(task_fcn)
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'TaskShardError')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
+    @override_settings(INSTRUCTOR_TASK_ITEMS_PER_SUBTASK=5)
+    def test_small_course_is_not_sharded(self):
+        result = self._run_sharded_task(partial(upload_grades_csv, None))
+
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+        self.assertEqual(InstructorTask.objects.get(pk=self.entry.id).subtasks, '')
+
+
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskCourseTestCase):
     """
     Tests that generation of CSV files listing student answers to a
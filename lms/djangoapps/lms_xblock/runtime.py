@@ -15,6 +15,7 @@ from xmodule.services import SettingsService
 from xmodule.library_tools import LibraryToolsService
 from xmodule.x_module import ModuleSystem
 from xmodule.partitions.partitions_service import PartitionService
+from xblock_django import fragment_cache
 
 
 def _quote_slashes(match):
@@ -208,6 +209,7 @@ class LmsModuleSystem(ModuleSystem):  # pylint: disable=abstract-method
             track_function=kwargs.get('track_function', None),
             cache=request_cache_dict
         )
+        self._partition_service = services['partitions']
         services['library_tools'] = LibraryToolsService(modulestore())
         services['fs'] = xblock.reference.plugins.FSService()
         services['settings'] = SettingsService()
@@ -238,6 +240,43 @@ class LmsModuleSystem(ModuleSystem):  # pylint: disable=abstract-method
     def local_resource_url(self, *args, **kwargs):
         return local_resource_url(*args, **kwargs)
 
+    def render(self, block, view_name, context=None):
+        """
+        Render a block by invoking its view, or take the view from the cache of
+        fragments if the block allows it (see xblock_django.fragment_cache).
+        """
+        if not fragment_cache.is_cacheable(block, view_name) or self.applicable_aside_types(block):
+            return super(LmsModuleSystem, self).render(block, view_name, context)
+
+        key = fragment_cache.fragment_cache_key(
+            block,
+            view_name,
+            fragment_cache.course_fragments_version(self.course_id, RequestCache.get_request_cache().data),
+            self._user_group_ids(block),
+            getattr(self, 'user_is_staff', False),
+        )
+        frag = fragment_cache.get_cached_fragment(key)
+        if frag is None:
+            # cacheable blocks have no children or user state, so unlike
+            # Runtime.render there's no view to remember or state to save
+            frag = getattr(block, view_name)(context or {})
+            fragment_cache.cache_fragment(key, frag)
+        return self.wrap_xblock(block, view_name, frag, context)
+
+    def _user_group_ids(self, block):
+        """
+        Return the ids of the user's groups in the partitions which block restricts access by.
+        """
+        group_access = getattr(getattr(block, 'descriptor', block), 'group_access', None) or {}
+        group_ids = []
+        for partition_id in group_access:
+            try:
+                group_ids.append(self._partition_service.get_user_group_id_for_partition(partition_id))
+            except ValueError:
+                # the partition no longer exists, so doesn't affect access
+                pass
+        return group_ids
+
     def wrap_aside(self, block, aside, view, frag, context):
         """
         Creates a div which identifies the aside, points to the original block,
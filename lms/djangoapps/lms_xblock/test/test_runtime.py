@@ -2,15 +2,22 @@
 Tests of the LMS XBlock Runtime and associated utilities
 """
 
+from datetime import datetime
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
 from ddt import ddt, data
-from mock import Mock
+from mock import Mock, patch
+from pytz import UTC
 from unittest import TestCase
 from urlparse import urlparse
 from opaque_keys.edx.locations import BlockUsageLocator, CourseLocator, SlashSeparatedCourseKey
 from lms.djangoapps.lms_xblock.runtime import quote_slashes, unquote_slashes, LmsModuleSystem
+from request_cache.middleware import RequestCache
 from xblock.fields import ScopeIds
+from xblock.fragment import Fragment
+from xblock_django import signals
 
 TEST_STRINGS = [
     '',
@@ -132,6 +139,79 @@ class TestHandlerUrl(TestCase):
         self.assertIsNone(parsed_fq_url.hostname)
 
 
+@patch.dict(settings.FEATURES, {'ENABLE_XBLOCK_FRAGMENT_CACHE': True})
+@patch.object(LmsModuleSystem, 'applicable_aside_types', Mock(return_value=[]))
+class TestFragmentCache(TestCase):
+    """Test the caching of rendered fragments by the LMS runtime"""
+
+    def setUp(self):
+        super(TestFragmentCache, self).setUp()
+        cache.clear()
+        RequestCache.clear_request_cache()
+        self.course_key = SlashSeparatedCourseKey("org", "course", "run")
+        self.runtime = LmsModuleSystem(
+            static_url='/static',
+            track_function=Mock(),
+            get_module=Mock(),
+            render_template=Mock(),
+            replace_urls=str,
+            course_id=self.course_key,
+            descriptor_runtime=Mock(),
+            wrappers=[lambda block, view, frag, context: Fragment(u'<div>{}</div>'.format(frag.content))],
+        )
+        self.runtime.user_is_staff = False
+        usage_key = self.course_key.make_usage_key('html', 'html')
+        self.block = Mock(
+            scope_ids=ScopeIds(None, 'html', usage_key, usage_key),
+            has_children=False,
+            student_view_cacheable=True,
+            descriptor=Mock(edited_on=datetime(2015, 1, 1, tzinfo=UTC), group_access={}),
+        )
+        self.block.student_view.return_value = Fragment(u'content')
+
+    def assert_renders(self, view_count):
+        """
+        Assert that the block renders as wrapped content, having rendered its view view_count times
+        """
+        self.assertEqual(self.runtime.render(self.block, 'student_view').content, u'<div>content</div>')
+        self.assertEqual(self.block.student_view.call_count, view_count)
+
+    def test_cached(self):
+        self.assert_renders(1)
+        self.assert_renders(1)
+
+    def test_not_cacheable(self):
+        self.block.student_view_cacheable = False
+        self.assert_renders(1)
+        self.assert_renders(2)
+
+    def test_key(self):
+        self.assert_renders(1)
+
+        self.block.descriptor.edited_on = datetime(2015, 1, 2, tzinfo=UTC)
+        self.assert_renders(2)
+
+        with translation.override('eo'):
+            self.assert_renders(3)
+
+        self.runtime.user_is_staff = True
+        self.assert_renders(4)
+
+        self.block.descriptor.group_access = {0: [1]}
+        with patch.object(self.runtime, '_partition_service') as mock_partition_service:
+            mock_partition_service.get_user_group_id_for_partition.return_value = 1
+            self.assert_renders(5)
+            self.assert_renders(5)
+            mock_partition_service.get_user_group_id_for_partition.return_value = 2
+            self.assert_renders(6)
+
+    def test_course_published(self):
+        self.assert_renders(1)
+        signals._listen_for_course_publish(None, self.course_key)  # pylint: disable=protected-access
+        RequestCache.clear_request_cache()
+        self.assert_renders(2)
+
+
 class TestUserServiceAPI(TestCase):
     """Test the user service interface"""
 
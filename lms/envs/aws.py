@@ -197,6 +197,13 @@ if 'loc_cache' not in CACHES:
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'edx_location_mem_cache',
     }
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_MEMORY_BUDGET', COURSE_STRUCTURE_CACHE_MEMORY_BUDGET
+)
+XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES = ENV_TOKENS.get(
+    'XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES', XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES
+)
+XBLOCK_FRAGMENT_CACHE_TIMEOUT = ENV_TOKENS.get('XBLOCK_FRAGMENT_CACHE_TIMEOUT', XBLOCK_FRAGMENT_CACHE_TIMEOUT)
 
 # Email overrides
 DEFAULT_FROM_EMAIL = ENV_TOKENS.get('DEFAULT_FROM_EMAIL', DEFAULT_FROM_EMAIL)
@@ -226,6 +233,8 @@ BULK_EMAIL_MAX_RETRIES = ENV_TOKENS.get('BULK_EMAIL_MAX_RETRIES', BULK_EMAIL_MAX
 BULK_EMAIL_INFINITE_RETRY_CAP = ENV_TOKENS.get('BULK_EMAIL_INFINITE_RETRY_CAP', BULK_EMAIL_INFINITE_RETRY_CAP)
 BULK_EMAIL_LOG_SENT_EMAILS = ENV_TOKENS.get('BULK_EMAIL_LOG_SENT_EMAILS', BULK_EMAIL_LOG_SENT_EMAILS)
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS', BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+BULK_EMAIL_SEND_BATCH_SIZE = ENV_TOKENS.get('BULK_EMAIL_SEND_BATCH_SIZE', BULK_EMAIL_SEND_BATCH_SIZE)
+BULK_EMAIL_MAX_SENDS_PER_SECOND = ENV_TOKENS.get('BULK_EMAIL_MAX_SENDS_PER_SECOND', BULK_EMAIL_MAX_SENDS_PER_SECOND)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -275,6 +284,9 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_POOL_SIZE = ENV_TOKENS.get("COMMENTS_SERVICE_POOL_SIZE", COMMENTS_SERVICE_POOL_SIZE)
+COMMENTS_SERVICE_MAX_RETRIES = ENV_TOKENS.get("COMMENTS_SERVICE_MAX_RETRIES", COMMENTS_SERVICE_MAX_RETRIES)
+COMMENTS_SERVICE_FANOUT_THREADS = ENV_TOKENS.get("COMMENTS_SERVICE_FANOUT_THREADS", COMMENTS_SERVICE_FANOUT_THREADS)
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -298,6 +310,10 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_LOCAL_CACHE_DIR = ENV_TOKENS.get("SAFE_EXEC_LOCAL_CACHE_DIR", SAFE_EXEC_LOCAL_CACHE_DIR)
+SAFE_EXEC_LOCAL_CACHE_MAX_ENTRIES = ENV_TOKENS.get(
+    "SAFE_EXEC_LOCAL_CACHE_MAX_ENTRIES", SAFE_EXEC_LOCAL_CACHE_MAX_ENTRIES
+)
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -524,6 +540,11 @@ VERIFY_STUDENT = AUTH_TOKENS.get("VERIFY_STUDENT", VERIFY_STUDENT)
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+INSTRUCTOR_TASK_ITEMS_PER_SUBTASK = ENV_TOKENS.get(
+    "INSTRUCTOR_TASK_ITEMS_PER_SUBTASK", INSTRUCTOR_TASK_ITEMS_PER_SUBTASK
+)
+
+COURSE_BLOCKS_UPDATE_DELAY = ENV_TOKENS.get("COURSE_BLOCKS_UPDATE_DELAY", COURSE_BLOCKS_UPDATE_DELAY)
 
 # financial reports
 FINANCIAL_REPORTS = ENV_TOKENS.get("FINANCIAL_REPORTS", FINANCIAL_REPORTS)
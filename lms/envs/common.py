@@ -311,6 +311,10 @@ FEATURES = {
     # Enable temporary APIs required for xBlocks on Mobile
     'ENABLE_COURSE_BLOCKS_NAVIGATION_API': False,
 
+    # Recollect a course's cached block structure in a celery task when
+    # the course is published, instead of clearing it from the cache.
+    'ENABLE_ASYNC_COURSE_BLOCKS_UPDATE': False,
+
     # Enable the combined login/registration form
     'ENABLE_COMBINED_LOGIN_REGISTRATION': False,
 
@@ -397,6 +401,28 @@ FEATURES = {
     # Enable the max score cache to speed up grading
     'ENABLE_MAX_SCORE_CACHE': True,
 
+    # Cache the student views of XBlocks which render the same for many users
+    # (see XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES and xblock_django.fragment_cache)
+    'ENABLE_XBLOCK_FRAGMENT_CACHE': False,
+
+    # Persist per-subsection grades so that grading only re-aggregates at the
+    # course level for subsections whose scores have not changed
+    'ENABLE_PERSISTENT_SUBSECTION_GRADES': False,
+
+    # Keep a narrow copy of StudentModule scores in StudentModuleScore, and
+    # read scores for grading from it. Turn on reads only after running the
+    # backfill_student_module_scores command with maintenance enabled.
+    'ENABLE_STUDENT_MODULE_SCORE_INDEX': False,
+    'READ_STUDENT_MODULE_SCORE_INDEX': False,
+
+    # Grade all students of a course together in grade reports, instead of
+    # grading them one at a time (see courseware.bulk_grades)
+    'ENABLE_BULK_GRADE_REPORTS': False,
+
+    # Split grade reports, problem response reports and rescoring of large
+    # courses into subtasks by user-id range (see INSTRUCTOR_TASK_ITEMS_PER_SUBTASK)
+    'ENABLE_SHARDED_INSTRUCTOR_TASKS': False,
+
     # Enable LTI Provider feature.
     'ENABLE_LTI_PROVIDER': False,
 }
@@ -717,6 +743,11 @@ XBLOCK_MIXINS = (LmsBlockMixin, InheritanceMixin, XModuleMixin, EditInfoMixin)
 # Allow any XBlock in the LMS
 XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
+# Block types whose student views are cached when ENABLE_XBLOCK_FRAGMENT_CACHE
+# is on, provided the blocks declare them cacheable, and for how many seconds.
+XBLOCK_FRAGMENT_CACHE_BLOCK_TYPES = ('html',)
+XBLOCK_FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
 ############# ModuleStore Configuration ##########
 
 MODULESTORE_BRANCH = 'published-only'
@@ -768,6 +799,10 @@ MODULESTORE = {
     }
 }
 
+# Memory budget, in bytes of pickled data, for the per-process cache of split
+# modulestore course structures kept in front of the 'course_structure_cache'.
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = 128 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -783,6 +818,13 @@ CODE_JAIL = {
     },
 }
 
+# Directory of a local, disk-backed cache of sandboxed code results, kept in
+# front of the shared cache.  None means results are only cached in the
+# shared cache.
+SAFE_EXEC_LOCAL_CACHE_DIR = None
+# The most results the local cache keeps before evicting the least recently used.
+SAFE_EXEC_LOCAL_CACHE_MAX_ENTRIES = 10000
+
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
 # of them must match the course id for that course to run unsafe code.
 #
@@ -1754,6 +1796,25 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of emails passed to the email backend at once.  The backend sends them
+# over the same connection, without going back to the task between emails.
+BULK_EMAIL_SEND_BATCH_SIZE = 20
+
+# Maximum number of emails each bulk email task sends per second, or 0 to send
+# them as fast as possible until the email service starts throttling.
+BULK_EMAIL_MAX_SENDS_PER_SECOND = 0
+
+############################# Course Blocks ###################################
+
+# Number of seconds to wait after a course is published before
+# recollecting its cached block structure.
+COURSE_BLOCKS_UPDATE_DELAY = 0
+
+# Number of seconds to wait before retrying, and maximum number of
+# retries of, a failed update of a course's cached block structure.
+COURSE_BLOCKS_UPDATE_RETRY_DELAY = 30
+COURSE_BLOCKS_UPDATE_MAX_RETRIES = 3
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -2207,6 +2268,10 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Maximum number of students (or, for rescoring, problem states) handled by
+# each subtask when ENABLE_SHARDED_INSTRUCTOR_TASKS is on.
+INSTRUCTOR_TASK_ITEMS_PER_SUBTASK = 5000
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
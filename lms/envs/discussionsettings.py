@@ -1,2 +1,11 @@
 
 DISCUSSION_ALLOWED_UPLOAD_FILE_TYPES = ('.jpg', '.jpeg', '.gif', '.bmp', '.png', '.tiff')
+
+# Number of connections to the comments service kept alive by each process.
+# 0 opens a new connection for every request.
+COMMENTS_SERVICE_POOL_SIZE = 10
+# Number of times a request that could not connect to the comments service is retried
+COMMENTS_SERVICE_MAX_RETRIES = 1
+# Number of threads making independent comments service requests concurrently.
+# 0 makes them one after the other.
+COMMENTS_SERVICE_FANOUT_THREADS = 4
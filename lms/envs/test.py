@@ -237,6 +237,9 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in memory across tests
+COURSE_STRUCTURE_CACHE_MEMORY_BUDGET = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -306,6 +309,16 @@ FEATURES['ENABLE_MOBILE_SOCIAL_FACEBOOK_FEATURES'] = True
 FEATURES['ENABLE_VIDEO_ABSTRACTION_LAYER_API'] = True
 FEATURES['ENABLE_COURSE_BLOCKS_NAVIGATION_API'] = True
 
+############################### Bulk Email ####################################
+# Tests mock the email connection's `send_messages` to succeed or fail for each email.
+BULK_EMAIL_SEND_BATCH_SIZE = 1
+
+########################### Comments service ##################################
+# Tests mock `requests.request` and expect the comments service calls to be
+# made in order, in the test thread.
+COMMENTS_SERVICE_POOL_SIZE = 0
+COMMENTS_SERVICE_FANOUT_THREADS = 0
+
 ###################### Payment ##############################3
 # Enable fake payment processing page
 FEATURES['ENABLE_PAYMENT_FAKE'] = True
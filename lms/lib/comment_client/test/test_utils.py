@@ -0,0 +1,84 @@
+"""
+Tests of the comments service client's connection pooling and fan-out.
+"""
+import threading
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import translation
+from mock import Mock, patch
+
+from lms.lib.comment_client import utils
+
+
+@override_settings(COMMENTS_SERVICE_POOL_SIZE=4, COMMENTS_SERVICE_MAX_RETRIES=2)
+class GetSessionTestCase(TestCase):
+    """
+    Tests of the keep-alive session used to talk to the comments service.
+    """
+    def test_session_reused(self):
+        session = utils.get_session()
+        self.assertIs(utils.get_session(), session)
+
+        adapter = session.get_adapter('http://localhost:4567/api/v1/threads')
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertEqual(adapter._pool_maxsize, 4)  # pylint: disable=protected-access
+
+    def test_new_session_after_fork(self):
+        session = utils.get_session()
+        with patch('lms.lib.comment_client.utils.os.getpid', return_value=-1):
+            self.assertIsNot(utils.get_session(), session)
+
+    @override_settings(COMMENTS_SERVICE_POOL_SIZE=0)
+    def test_pooling_disabled(self):
+        self.assertIsNone(utils.get_session())
+
+    def test_requests_use_session(self):
+        response = Mock(status_code=200, json=Mock(return_value={'id': '1'}))
+        with patch('requests.Session.request', return_value=response) as mock_request:
+            self.assertEqual(utils.perform_request('get', 'http://localhost:4567/api/v1/users/1'), {'id': '1'})
+        self.assertEqual(mock_request.call_count, 1)
+
+
+@override_settings(COMMENTS_SERVICE_FANOUT_THREADS=2)
+class PerformConcurrentlyTestCase(TestCase):
+    """
+    Tests of making comments service calls concurrently.
+    """
+    def test_results_in_order(self):
+        self.assertEqual(utils.perform_concurrently(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+
+    def test_calls_run_concurrently(self):
+        # Each call waits for the other one, which only completes if both run at once.
+        barrier = [threading.Event(), threading.Event()]
+
+        def call(index):
+            """Signals this call started, and waits for the other one."""
+            barrier[index].set()
+            return barrier[1 - index].wait(5)
+
+        self.assertEqual(utils.perform_concurrently(lambda: call(0), lambda: call(1)), [True, True])
+
+    def test_first_exception_raised(self):
+        def fail(message):
+            """Raises a CommentClientError."""
+            raise utils.CommentClientError(message)
+
+        with self.assertRaises(utils.CommentClientError) as context:
+            utils.perform_concurrently(lambda: 1, lambda: fail('first'), lambda: fail('second'))
+        self.assertEqual(context.exception.message, 'first')
+
+    def test_language_propagated(self):
+        with translation.override('eo'):
+            self.assertEqual(
+                utils.perform_concurrently(translation.get_language, translation.get_language),
+                ['eo', 'eo'],
+            )
+
+    @override_settings(COMMENTS_SERVICE_FANOUT_THREADS=0)
+    def test_fanout_disabled(self):
+        thread_names = utils.perform_concurrently(
+            lambda: threading.current_thread().name,
+            lambda: threading.current_thread().name,
+        )
+        self.assertEqual(thread_names, [threading.current_thread().name] * 2)
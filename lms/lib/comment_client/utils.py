@@ -1,14 +1,26 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
+import os
+import threading
+from multiprocessing.pool import ThreadPool
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# Keep-alive session and thread pool shared by the threads of a process, see
+# `get_session` and `perform_concurrently`. Both are keyed by the pid that
+# created them, since neither survives a fork.
+_process_lock = threading.Lock()
+_session = (None, None)
+_thread_pool = (None, None)
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -50,6 +62,95 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def get_session():
+    """
+    Returns the `requests.Session` used to talk to the comments service,
+    which keeps up to `COMMENTS_SERVICE_POOL_SIZE` connections alive and
+    retries failed connections `COMMENTS_SERVICE_MAX_RETRIES` times.
+
+    Returns None when `COMMENTS_SERVICE_POOL_SIZE` is 0, in which case every
+    request opens a new connection.
+    """
+    global _session  # pylint: disable=global-statement
+    pool_size = getattr(settings, 'COMMENTS_SERVICE_POOL_SIZE', 0)
+    if not pool_size:
+        return None
+
+    pid, session = _session
+    if pid != os.getpid():
+        with _process_lock:
+            pid, session = _session
+            if pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=pool_size,
+                    max_retries=getattr(settings, 'COMMENTS_SERVICE_MAX_RETRIES', 0),
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = (os.getpid(), session)
+    return session
+
+
+def _get_thread_pool():
+    """
+    Returns the thread pool of `perform_concurrently`, or None when
+    `COMMENTS_SERVICE_FANOUT_THREADS` is 0.
+    """
+    global _thread_pool  # pylint: disable=global-statement
+    threads = getattr(settings, 'COMMENTS_SERVICE_FANOUT_THREADS', 0)
+    if not threads:
+        return None
+
+    pid, pool = _thread_pool
+    if pid != os.getpid():
+        with _process_lock:
+            pid, pool = _thread_pool
+            if pid != os.getpid():
+                pool = ThreadPool(threads)
+                _thread_pool = (os.getpid(), pool)
+    return pool
+
+
+def perform_concurrently(*calls):
+    """
+    Makes independent comments service calls concurrently, and returns their
+    results in the order of `calls`. If any call raises, the exception of the
+    first one that did is raised once all of them completed.
+
+    Each call is a callable taking no arguments, for example::
+
+        threads, user = perform_concurrently(
+            lambda: profiled_user.active_threads(query_params),
+            lambda: cc.User.from_django_user(request.user).to_dict(),
+        )
+
+    Calls are made one after the other in the calling thread when
+    `COMMENTS_SERVICE_FANOUT_THREADS` is 0.
+    """
+    pool = _get_thread_pool()
+    if pool is None or len(calls) < 2:
+        return [call() for call in calls]
+
+    # The language sent to the comments service is per thread.
+    language = get_language()
+
+    def run(call):
+        """Returns (result, None), or (None, exception) if `call` raised."""
+        try:
+            with translation.override(language):
+                return call(), None
+        except Exception as exc:  # pylint: disable=broad-except
+            return None, exc
+
+    outcomes = pool.map(run, calls)
+    for __, exc in outcomes:
+        if exc is not None:
+            raise exc
+    return [result for result, __ in outcomes]
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
 
@@ -75,8 +176,9 @@ def perform_request(method, url, data_or_params=None, raw=False,
     else:
         data = None
         params = merge_dict(data_or_params, request_id_dict)
+    session = get_session()
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = (session or requests).request(
             method,
             url,
             data=data,
@@ -240,6 +240,35 @@ class CourseOverview(TimeStampedModel):
             course_overview = None
         return course_overview or cls.load_from_module_store(course_id)
 
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Load the CourseOverview objects of many courses at once.
+
+        The overviews that are already cached in the database are read with a
+        single query; the others are loaded from the modulestore as in
+        `get_from_id`.
+
+        Arguments:
+            course_ids (iterable[CourseKey]): the IDs of the course overviews
+                to be loaded.
+
+        Returns:
+            dict[CourseKey, CourseOverview]: overview of each requested course,
+                or None for courses that were not found or failed to load.
+        """
+        course_ids = set(course_ids)
+        course_overviews = {
+            course_overview.id: course_overview
+            for course_overview in cls.objects.filter(id__in=course_ids, version__gte=cls.VERSION)
+        }
+        for course_id in course_ids.difference(course_overviews):
+            try:
+                course_overviews[course_id] = cls.get_from_id(course_id)
+            except (cls.DoesNotExist, IOError):
+                course_overviews[course_id] = None
+        return course_overviews
+
     def clean_id(self, padding_char='='):
         """
         Returns a unique deterministic base32-encoded ID for the course.
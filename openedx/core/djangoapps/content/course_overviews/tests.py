@@ -297,6 +297,28 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
         with self.assertRaises(CourseOverview.DoesNotExist):
             CourseOverview.get_from_id(store.make_course_key('Non', 'Existent', 'Course'))
 
+    def test_get_from_ids(self):
+        """
+        Tests that get_from_ids loads cached overviews with one query, and
+        returns None for courses that don't exist.
+        """
+        courses = [CourseFactory.create(default_store=ModuleStoreEnum.Type.split) for __ in range(3)]
+        CourseOverview.get_from_id(courses[0].id)
+        CourseOverview.get_from_id(courses[1].id)
+        missing_course_key = self.store.make_course_key('Non', 'Existent', 'Course')
+
+        course_overviews = CourseOverview.get_from_ids(
+            [course.id for course in courses] + [missing_course_key]
+        )
+
+        self.assertIsNone(course_overviews.pop(missing_course_key))
+        self.assertEqual(
+            {course_id: overview.id for course_id, overview in course_overviews.iteritems()},
+            {course.id: course.id for course in courses},
+        )
+        with self.assertNumQueries(1):
+            CourseOverview.get_from_ids([course.id for course in courses])
+
     def test_get_errored_course(self):
         """
         Test that getting an ErrorDescriptor back from the module store causes
@@ -7,10 +7,13 @@ Module with family of classes for block structures.
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    _BlockDataColumns - Columnar data structure for all blocks' data
+        deserialized from the cache.
 """
 from collections import defaultdict
 from logging import getLogger
 
+from openedx.core.lib.cache_utils import zunpickle
 from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
 
 from .exceptions import TransformerException
@@ -266,6 +269,103 @@ class _BlockData(object):
         self.transformer_data = defaultdict(dict)
 
 
+class _BlockDataColumns(object):
+    """
+    Read-only data structure to encapsulate collected data for all
+    blocks of a block structure that was deserialized from the cache.
+
+    Rather than keeping a _BlockData object per block, the values of
+    each xBlock field (and of each transformer's block data) are kept
+    in a single column that is indexed by the block's integer index.
+    Columns are stored compressed and are only decoded the first time
+    they are read, so data for fields and transformers that are not
+    used by the current request is never unpickled.
+
+    Each decoded column is a tuple of (values, missing), where values
+    is a list of values ordered by block index and missing is a set
+    of indices of the blocks that have no value in that column.
+    """
+    def __init__(self, block_index, xblock_field_columns, transformer_block_columns):
+
+        # Map of a block's usage key to its index in the columns.
+        # dict {UsageKey: int}
+        self.block_index = block_index
+
+        # Map of xblock field name to its column, either encoded or
+        # decoded.
+        # dict {string: string or (list, set)}
+        self._xblock_field_columns = xblock_field_columns
+
+        # Map of transformer name to the columns of the transformer's
+        # block data, either encoded or decoded.
+        # dict {string: string or {string: (list, set)}}
+        self._transformer_block_columns = transformer_block_columns
+
+    def get_xblock_field(self, usage_key, field_name, default=None):
+        """
+        Returns the value of the given xBlock field for the given
+        block; returns default if not found.
+        """
+        index = self.block_index.get(usage_key)
+        if index is None or field_name not in self._xblock_field_columns:
+            return default
+        return self._get_value(self._decode(self._xblock_field_columns, field_name), index, default)
+
+    def get_transformer_block_field(self, usage_key, transformer_name, key, default=None):
+        """
+        Returns the value associated with the given key in the given
+        transformer's data for the given block; returns default if
+        not found.
+        """
+        index = self.block_index.get(usage_key)
+        if index is None or transformer_name not in self._transformer_block_columns:
+            return default
+        columns = self._decode(self._transformer_block_columns, transformer_name)
+        if key not in columns:
+            return default
+        return self._get_value(columns[key], index, default)
+
+    def get_transformer_block_data(self, usage_key, transformer_name):
+        """
+        Returns a new dict with the given transformer's data for the
+        given block.
+        """
+        index = self.block_index.get(usage_key)
+        if index is None or transformer_name not in self._transformer_block_columns:
+            return {}
+        return {
+            key: column[0][index]
+            for key, column in self._decode(self._transformer_block_columns, transformer_name).iteritems()
+            if index not in column[1]
+        }
+
+    def remove_block(self, usage_key):
+        """
+        Removes the given block so that none of its data is found.
+        """
+        self.block_index.pop(usage_key, None)
+
+    @staticmethod
+    def _decode(columns, name):
+        """
+        Decodes the named column in place, if not already decoded, and
+        returns it.
+        """
+        column = columns[name]
+        if isinstance(column, str):
+            column = columns[name] = zunpickle(column)
+        return column
+
+    @staticmethod
+    def _get_value(column, index, default):
+        """
+        Returns the value at the given index of the given decoded
+        column; returns default if the value is missing.
+        """
+        values, missing = column
+        return default if index in missing else values[index]
+
+
 class BlockStructureBlockData(BlockStructure):
     """
     Subclass of BlockStructure that is responsible for managing block
@@ -279,6 +379,13 @@ class BlockStructureBlockData(BlockStructure):
         # defaultdict {UsageKey: _BlockData}
         self._block_data_map = defaultdict(_BlockData)
 
+        # Columnar block data deserialized from the cache, if any.
+        # Data in _block_data_map takes precedence over this: a
+        # transformer's data for a block is copied into _block_data_map
+        # the first time it is updated.
+        # _BlockDataColumns or None
+        self._block_data_columns = None
+
         # Map of a transformer's name to its non-block-specific data.
         # defaultdict {string: dict}
         self._transformer_data = defaultdict(dict)
@@ -300,7 +407,11 @@ class BlockStructureBlockData(BlockStructure):
                 not found.
         """
         block_data = self._block_data_map.get(usage_key)
-        return block_data.xblock_fields.get(field_name, default) if block_data else default
+        if block_data and field_name in block_data.xblock_fields:
+            return block_data.xblock_fields[field_name]
+        elif self._block_data_columns is not None:
+            return self._block_data_columns.get_xblock_field(usage_key, field_name, default)
+        return default
 
     def get_transformer_data(self, transformer, key, default=None):
         """
@@ -351,6 +462,10 @@ class BlockStructureBlockData(BlockStructure):
             default (any type) - The value to return if a dictionary
                 entry is not found.
         """
+        block_data = self._block_data_map.get(usage_key)
+        is_updated = block_data is not None and transformer.name() in block_data.transformer_data
+        if not is_updated and self._block_data_columns is not None:
+            return self._block_data_columns.get_transformer_block_field(usage_key, transformer.name(), key, default)
         transformer_data = self.get_transformer_block_data(usage_key, transformer)
         return transformer_data.get(key, default)
 
@@ -372,7 +487,7 @@ class BlockStructureBlockData(BlockStructure):
                 given key for the given transformer's data for the
                 requested block.
         """
-        self._block_data_map[usage_key].transformer_data[transformer.name()][key] = value
+        self._get_updatable_transformer_block_data(usage_key, transformer)[key] = value
 
     def get_transformer_block_data(self, usage_key, transformer):
         """
@@ -392,10 +507,12 @@ class BlockStructureBlockData(BlockStructure):
         """
         default = {}
         block_data = self._block_data_map.get(usage_key)
-        if not block_data:
-            return default
+        if block_data and transformer.name() in block_data.transformer_data:
+            return block_data.transformer_data[transformer.name()]
+        elif self._block_data_columns is not None:
+            return self._block_data_columns.get_transformer_block_data(usage_key, transformer.name())
         else:
-            return block_data.transformer_data.get(transformer.name(), default)
+            return default
 
     def remove_transformer_block_field(self, usage_key, transformer, key):
         """
@@ -409,8 +526,8 @@ class BlockStructureBlockData(BlockStructure):
             transformer (BlockStructureTransformer) - The transformer
                 whose data entry is to be deleted.
         """
-        transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
-        transformer_block_data.pop(key, None)
+        if self.has_block(usage_key):
+            self._get_updatable_transformer_block_data(usage_key, transformer).pop(key, None)
 
     def remove_block(self, usage_key, keep_descendants):
         """
@@ -446,6 +563,8 @@ class BlockStructureBlockData(BlockStructure):
         # Remove block.
         self._block_relations.pop(usage_key, None)
         self._block_data_map.pop(usage_key, None)
+        if self._block_data_columns is not None:
+            self._block_data_columns.remove_block(usage_key)
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
@@ -512,6 +631,26 @@ class BlockStructureBlockData(BlockStructure):
 
         return self.get_transformer_data(transformer, TRANSFORMER_VERSION_KEY, 0)
 
+    def _get_updatable_transformer_block_data(self, usage_key, transformer):
+        """
+        Returns the given transformer's data dict for the block
+        identified by the given usage_key, copying it from the
+        deserialized block data columns on first update.
+
+        Arguments:
+            usage_key (UsageKey) - Usage key of the block whose
+                transformer data is to be updated.
+
+            transformer (BlockStructureTransformer) - The transformer
+                whose data is to be updated.
+        """
+        transformer_data = self._block_data_map[usage_key].transformer_data
+        if transformer.name() not in transformer_data and self._block_data_columns is not None:
+            transformer_data[transformer.name()] = self._block_data_columns.get_transformer_block_data(
+                usage_key, transformer.name()
+            )
+        return transformer_data[transformer.name()]
+
     def _add_transformer(self, transformer):
         """
         Adds the given transformer to the block structure by recording
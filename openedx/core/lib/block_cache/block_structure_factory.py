@@ -2,16 +2,41 @@
 Module for factory class for BlockStructure objects.
 """
 # pylint: disable=protected-access
+from array import array
+import cPickle as pickle
+from collections import defaultdict
 from logging import getLogger
+import zlib
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from .block_structure import BlockStructureBlockData, BlockStructureModulestoreData
+from .block_structure import (
+    BlockStructureBlockData,
+    BlockStructureModulestoreData,
+    _BlockDataColumns,
+    _BlockRelations,
+)
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
 
+# Prefix of the block structure data stored in the cache, followed by
+# the serialization format version and a ':'.  Data cached without
+# this prefix is in the original format: a compressed pickle of the
+# block structure's internal data.
+SERIALIZATION_PREFIX = 'blockstructure:'
+
+# Version of the format written by serialize_to_cache.  Increment this
+# whenever the format changes; data cached in any other version is
+# treated as a cache miss and recollected.
+SERIALIZATION_VERSION = 2
+
+# Array type code used for block indices in the serialized adjacency
+# lists.
+ADJACENCY_TYPECODE = 'I'
+
+
 class BlockStructureFactory(object):
     """
     Factory class for BlockStructure objects.
@@ -67,12 +92,16 @@ class BlockStructureFactory(object):
     @classmethod
     def serialize_to_cache(cls, block_structure, cache):
         """
-        Store a compressed and pickled serialization of the given
+        Store a compact, versioned serialization of the given
         block structure into the given cache.
 
         The key in the cache is 'root.key.<root_block_usage_key>'.
         The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        block relations, transformer data, and block data.  Blocks are
+        identified by integer indices, relations are stored as arrays
+        of indices, and block data is stored in separately compressed
+        columns, one per xBlock field and one per transformer, so that
+        only the columns read by a request are ever decoded.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
@@ -82,12 +111,7 @@ class BlockStructureFactory(object):
                 cache into which cacheable data of the block structure
                 is to be serialized.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure._transformer_data,
-            block_structure._block_data_map
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
+        zp_data_to_cache = cls._serialize(block_structure)
         cache.set(
             cls._encode_root_cache_key(block_structure.root_block_usage_key),
             zp_data_to_cache
@@ -145,11 +169,9 @@ class BlockStructureFactory(object):
             )
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
-        block_structure = BlockStructureBlockData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure._transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
+        block_structure = cls._deserialize(root_block_usage_key, zp_data_from_cache)
+        if block_structure is None:
+            return None
 
         # Verify that the cached data for all the given transformers are
         # for their latest versions.
@@ -188,6 +210,147 @@ class BlockStructureFactory(object):
         cache.delete(cls._encode_root_cache_key(root_block_usage_key))
         # TODO also remove all block data?
 
+    @classmethod
+    def _serialize(cls, block_structure):
+        """
+        Returns the serialization of the given collected block
+        structure, in the current serialization format version.
+        """
+        block_keys = list(block_structure.get_block_keys())
+        block_index = {block_key: index for index, block_key in enumerate(block_keys)}
+        block_relations = block_structure._block_relations
+        block_data_map = block_structure._block_data_map
+
+        # Gather the values of each xBlock field and of each key of each
+        # transformer's block data, keyed by block index.
+        xblock_field_values = defaultdict(dict)
+        transformer_block_values = defaultdict(lambda: defaultdict(dict))
+        for block_key, block_data in block_data_map.iteritems():
+            index = block_index.get(block_key)
+            if index is None:
+                continue
+            for field_name, value in block_data.xblock_fields.iteritems():
+                xblock_field_values[field_name][index] = value
+            for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+                for key, value in transformer_data.iteritems():
+                    transformer_block_values[transformer_name][key][index] = value
+
+        num_blocks = len(block_keys)
+        sections = {
+            'block_keys': zpickle(block_keys),
+            'children': cls._encode_adjacency(
+                [block_index[child] for child in block_relations[block_key].children]
+                for block_key in block_keys
+            ),
+            'parents': cls._encode_adjacency(
+                [block_index[parent] for parent in block_relations[block_key].parents]
+                for block_key in block_keys
+            ),
+            'transformer_data': zpickle(dict(block_structure._transformer_data)),
+            'xblock_fields': {
+                field_name: zpickle(cls._make_column(values, num_blocks))
+                for field_name, values in xblock_field_values.iteritems()
+            },
+            'transformer_block_data': {
+                transformer_name: zpickle({
+                    key: cls._make_column(values, num_blocks)
+                    for key, values in transformer_values.iteritems()
+                })
+                for transformer_name, transformer_values in transformer_block_values.iteritems()
+            },
+        }
+        return '{}{}:{}'.format(
+            SERIALIZATION_PREFIX,
+            SERIALIZATION_VERSION,
+            pickle.dumps(sections, pickle.HIGHEST_PROTOCOL),
+        )
+
+    @classmethod
+    def _deserialize(cls, root_block_usage_key, serialized_data):
+        """
+        Returns the block structure deserialized from the given data,
+        or None if the data is in an unsupported serialization format
+        version.
+        """
+        block_structure = BlockStructureBlockData(root_block_usage_key)
+
+        if not serialized_data.startswith(SERIALIZATION_PREFIX):
+            # Data cached before the format was versioned.
+            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            block_structure._block_relations = block_relations
+            block_structure._transformer_data = transformer_data
+            block_structure._block_data_map = block_data_map
+            return block_structure
+
+        version, _, data = serialized_data[len(SERIALIZATION_PREFIX):].partition(':')
+        if version != str(SERIALIZATION_VERSION):
+            logger.info(
+                "BlockStructure %r cached in serialization version %s, expected %s.",
+                root_block_usage_key,
+                version,
+                SERIALIZATION_VERSION,
+            )
+            return None
+
+        sections = pickle.loads(data)
+        block_keys = zunpickle(sections['block_keys'])
+        children = cls._decode_adjacency(sections['children'], block_keys)
+        parents = cls._decode_adjacency(sections['parents'], block_keys)
+
+        block_relations = defaultdict(_BlockRelations)
+        for index, block_key in enumerate(block_keys):
+            relations = block_relations[block_key]
+            relations.children = children[index]
+            relations.parents = parents[index]
+
+        block_structure._block_relations = block_relations
+        block_structure._transformer_data = defaultdict(dict, zunpickle(sections['transformer_data']))
+        block_structure._block_data_columns = _BlockDataColumns(
+            {block_key: index for index, block_key in enumerate(block_keys)},
+            sections['xblock_fields'],
+            sections['transformer_block_data'],
+        )
+        return block_structure
+
+    @staticmethod
+    def _make_column(values, num_blocks):
+        """
+        Returns a column, as expected by _BlockDataColumns, for the
+        given map of block index to value.
+        """
+        return (
+            [values.get(index) for index in xrange(num_blocks)],
+            set(index for index in xrange(num_blocks) if index not in values),
+        )
+
+    @staticmethod
+    def _encode_adjacency(adjacency_lists):
+        """
+        Encodes the given lists of block indices as a compressed pair
+        of arrays: the offset of each block's list followed by the
+        concatenation of all the lists.
+        """
+        offsets = array(ADJACENCY_TYPECODE, [0])
+        indices = array(ADJACENCY_TYPECODE)
+        for adjacency_list in adjacency_lists:
+            indices.extend(adjacency_list)
+            offsets.append(len(indices))
+        return zlib.compress(offsets.tostring()), zlib.compress(indices.tostring())
+
+    @staticmethod
+    def _decode_adjacency(encoded_adjacency, block_keys):
+        """
+        Decodes the given output of _encode_adjacency into a list of
+        lists of usage keys, ordered by block index.
+        """
+        offsets, indices = array(ADJACENCY_TYPECODE), array(ADJACENCY_TYPECODE)
+        offsets.fromstring(zlib.decompress(encoded_adjacency[0]))
+        indices.fromstring(zlib.decompress(encoded_adjacency[1]))
+        return [
+            [block_keys[index] for index in indices[offsets[position]:offsets[position + 1]]]
+            for position in xrange(len(block_keys))
+        ]
+
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
         """
@@ -6,7 +6,7 @@ from django.core.cache import get_cache
 from mock import patch
 from unittest import TestCase
 
-from ..block_cache import get_blocks
+from ..block_cache import get_blocks, update_block_cache
 from ..exceptions import TransformerException
 from .test_utils import (
     MockModulestoreFactory, MockCache, MockTransformer, ChildrenMapTestMixin
@@ -111,3 +111,16 @@ class TestBlockCache(TestCase, ChildrenMapTestMixin):
                 self.assertGreater(self.modulestore.get_items_call_count, 0)
             else:
                 self.assertEquals(self.modulestore.get_items_call_count, 0)
+
+    def test_update_block_cache(self, mock_available_transforms):
+        mock_available_transforms.return_value = {transformer.name(): transformer for transformer in self.transformers}
+
+        update_block_cache(self.mock_cache, self.modulestore, root_block_usage_key=0)
+        self.assertGreater(self.modulestore.get_items_call_count, 0)
+
+        self.modulestore.get_items_call_count = 0
+        block_structure = get_blocks(
+            self.mock_cache, self.modulestore, self.usage_info, root_block_usage_key=0, transformers=self.transformers
+        )
+        self.assert_block_structure(block_structure, self.children_map)
+        self.assertEquals(self.modulestore.get_items_call_count, 0)
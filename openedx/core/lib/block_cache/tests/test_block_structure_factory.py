@@ -5,6 +5,8 @@ Tests for block_structure_factory.py
 from mock import patch
 from unittest import TestCase
 
+from openedx.core.lib.cache_utils import zpickle
+
 from ..block_structure_factory import BlockStructureFactory
 from .test_utils import (
     MockCache, MockModulestoreFactory, MockTransformer, ChildrenMapTestMixin
@@ -112,3 +114,111 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
                 transformers=self.transformers
             )
         )
+
+    def test_cache_block_data(self):
+        cache = MockCache()
+        self.add_transformers()
+        for block_key in self.block_structure:
+            block_data = self.block_structure._block_data_map[block_key]
+            block_data.xblock_fields['display_name'] = 'block {}'.format(block_key)
+        BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+
+        from_cache_block_structure = BlockStructureFactory.create_from_cache(
+            root_block_usage_key=0,
+            cache=cache,
+            transformers=self.transformers,
+        )
+        for block_key in range(len(self.children_map)):
+            self.assertEquals(
+                from_cache_block_structure.get_xblock_field(block_key, 'display_name'),
+                'block {}'.format(block_key),
+            )
+            self.assertIsNone(from_cache_block_structure.get_xblock_field(block_key, 'unknown_field'))
+        self.assertEquals(
+            from_cache_block_structure.get_transformer_block_data(0, MockTransformer),
+            {'test': 'MockTransformer val'},
+        )
+        self.assertEquals(from_cache_block_structure.get_transformer_block_data(1, MockTransformer), {})
+        self.assertEquals(
+            from_cache_block_structure._get_transformer_data_version(MockTransformer),
+            MockTransformer.VERSION,
+        )
+
+    def test_cache_lazy_decode(self):
+        cache = MockCache()
+        self.add_transformers()
+        for block_key in self.block_structure:
+            self.block_structure._block_data_map[block_key].xblock_fields['display_name'] = block_key
+        BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+
+        from_cache_block_structure = BlockStructureFactory.create_from_cache(
+            root_block_usage_key=0,
+            cache=cache,
+            transformers=self.transformers,
+        )
+        with patch('openedx.core.lib.block_cache.block_structure.zunpickle') as mock_zunpickle:
+            from_cache_block_structure.get_children(0)
+            self.assertFalse(mock_zunpickle.called)
+
+        # Each column is decoded once, on first read.
+        self.assertEquals(from_cache_block_structure.get_xblock_field(1, 'display_name'), 1)
+        with patch('openedx.core.lib.block_cache.block_structure.zunpickle') as mock_zunpickle:
+            self.assertEquals(from_cache_block_structure.get_xblock_field(2, 'display_name'), 2)
+            self.assertFalse(mock_zunpickle.called)
+
+    def test_cache_update_block_data(self):
+        cache = MockCache()
+        self.add_transformers()
+        self.block_structure.set_transformer_block_field(0, MockTransformer, 'other', 'other val')
+        BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+
+        from_cache_block_structure = BlockStructureFactory.create_from_cache(
+            root_block_usage_key=0,
+            cache=cache,
+            transformers=self.transformers,
+        )
+        from_cache_block_structure.set_transformer_block_field(0, MockTransformer, 'new', 'new val')
+        from_cache_block_structure.remove_transformer_block_field(0, MockTransformer, 'other')
+        self.assertEquals(
+            from_cache_block_structure.get_transformer_block_data(0, MockTransformer),
+            {'test': 'MockTransformer val', 'new': 'new val'},
+        )
+        self.assertIsNone(from_cache_block_structure.get_transformer_block_field(0, MockTransformer, 'other'))
+
+        from_cache_block_structure.remove_block(1, keep_descendants=False)
+        self.assertIsNone(from_cache_block_structure.get_transformer_block_field(1, MockTransformer, 'test'))
+
+    def test_legacy_cache_format(self):
+        cache = MockCache()
+        self.add_transformers()
+        cache.set(
+            BlockStructureFactory._encode_root_cache_key(0),
+            zpickle((
+                self.block_structure._block_relations,
+                self.block_structure._transformer_data,
+                self.block_structure._block_data_map,
+            )),
+        )
+        from_cache_block_structure = BlockStructureFactory.create_from_cache(
+            root_block_usage_key=0,
+            cache=cache,
+            transformers=self.transformers,
+        )
+        self.assert_block_structure(from_cache_block_structure, self.children_map)
+        self.assertEquals(
+            from_cache_block_structure.get_transformer_block_field(0, MockTransformer, 'test'),
+            'MockTransformer val',
+        )
+
+    def test_unsupported_cache_format_version(self):
+        cache = MockCache()
+        self.add_transformers()
+        with patch('openedx.core.lib.block_cache.block_structure_factory.SERIALIZATION_VERSION', 1):
+            BlockStructureFactory.serialize_to_cache(self.block_structure, cache)
+        self.assertIsNone(
+            BlockStructureFactory.create_from_cache(
+                root_block_usage_key=0,
+                cache=cache,
+                transformers=self.transformers,
+            )
+        )